@@ -1,13 +1,17 @@
 from abc import ABC
 from abc import abstractmethod
+from itertools import chain
 
 import numpy as np
 import pandas as pd
 
 from asreview.data.record import Record
+from asreview.data.utils import convert_series_to_int
+from asreview.data.utils import convert_series_to_list
 from asreview.data.utils import convert_value_to_int
 from asreview.data.utils import convert_value_to_list
 from asreview.data.utils import standardize_included_label
+from asreview.data.utils import standardize_included_labels
 
 
 class BaseReader(ABC):
@@ -58,17 +62,95 @@ class BaseReader(ABC):
         "year": [convert_value_to_int],
     }
 
+    # Dictionary {cleaning function : vectorized cleaning function} with versions of
+    # the functions in `__cleaning_methods__` that act on a whole column at once.
+    # Cleaning functions without a vectorized version are applied to the individual
+    # values, so custom cleaning functions work without a vectorized version.
+    __vectorized_cleaning_methods__ = {
+        convert_value_to_list: convert_series_to_list,
+        convert_value_to_int: convert_series_to_int,
+        standardize_included_label: standardize_included_labels,
+    }
+
     # Fill missing values with this value. It should be a tuple with one entry which is
     # the value that will be used to fill all missing values. To disable filling the
     # missing values, put `None` instead of `(None,)`.
     __fillna_default__ = (None,)
 
+    # Number of rows per chunk when a reader supports reading the data in chunks, see
+    # `read_data_chunks`.
+    __chunksize__ = 10000
+
     @classmethod
     def read_records(cls, fp, dataset_id, record_cls=Record, *args, **kwargs):
-        df = cls.read_data(fp, *args, **kwargs)
-        df.replace([pd.NA, np.nan], cls.__fillna_default__[0], inplace=True)
-        df = cls.clean_data(df)
-        return cls.to_records(df, dataset_id=dataset_id, record_cls=record_cls)
+        return list(
+            chain.from_iterable(
+                cls.iter_records(fp, dataset_id, record_cls, *args, **kwargs)
+            )
+        )
+
+    @classmethod
+    def iter_records(cls, fp, dataset_id, record_cls=Record, *args, **kwargs):
+        """Read the records from a file in chunks.
+
+        Parameters
+        ----------
+        fp : Path
+            Filepath of the file to read.
+        dataset_id : str
+            Identifier of the dataset.
+        record_cls : asreview.data.record.Base, optional
+            Record class to use, by default Record
+
+        Yields
+        ------
+        list[Record]
+            List of records of a chunk of the data.
+        """
+        for df in cls.iter_data(fp, *args, **kwargs):
+            yield cls.to_records(df, dataset_id=dataset_id, record_cls=record_cls)
+
+    @classmethod
+    def iter_data(cls, fp, *args, **kwargs):
+        """Read and clean the data of a file in chunks.
+
+        Each chunk of raw data from `read_data_chunks` is cleaned before the next chunk
+        is read, so only one chunk is in memory at a time. The cleaned data can be
+        added to a data store directly with `DataStore.add_dataframe`.
+
+        Parameters
+        ----------
+        fp : Path
+            Filepath of the file to read.
+
+        Yields
+        ------
+        pd.DataFrame
+            Chunk of cleaned data.
+        """
+        for df in cls.read_data_chunks(fp, *args, **kwargs):
+            yield cls.clean_data(df)
+
+    @classmethod
+    def read_data_chunks(cls, fp, *args, **kwargs):
+        """Read the raw data from a file in chunks.
+
+        By default the data is read with `read_data` as a single chunk. Readers that
+        can read a file incrementally can override this method. The index of the
+        chunks should continue where the previous chunk ended, since it is used as the
+        row number of the records in the dataset.
+
+        Parameters
+        ----------
+        fp : Path
+            Filepath of the file to read.
+
+        Yields
+        ------
+        pd.DataFrame
+            Chunk of user input data that has not been cleaned yet.
+        """
+        yield cls.read_data(fp, *args, **kwargs)
 
     @classmethod
     @abstractmethod
@@ -115,7 +197,20 @@ class BaseReader(ABC):
         for column, cleaning_methods in cls.__cleaning_methods__.items():
             if column in df.columns:
                 for cleaning_method in cleaning_methods:
-                    df[column] = df[column].apply(cleaning_method)
+                    vectorized_method = cls.__vectorized_cleaning_methods__.get(
+                        cleaning_method
+                    )
+                    if vectorized_method is not None:
+                        df[column] = vectorized_method(df[column])
+                    else:
+                        # Cleaning functions have always received the missing values
+                        # filled with the default value.
+                        values = df[column]
+                        if cls.__fillna_default__ is not None:
+                            values = values.replace(
+                                [pd.NA, np.nan], cls.__fillna_default__[0]
+                            )
+                        df[column] = values.apply(cleaning_method)
         if cls.__fillna_default__ is not None:
             df.replace([pd.NA, np.nan], cls.__fillna_default__[0], inplace=True)
         return df
@@ -1,8 +1,14 @@
+import hashlib
 from io import StringIO
 from pathlib import Path
 
+import numpy as np
+
 from asreview.data.record import Record
-from asreview.data.utils import identify_record_groups
+from asreview.data.utils import DEFAULT_EXTRACTORS
+from asreview.data.utils import identify_groups
+from asreview.data.utils import identify_near_duplicate_groups
+from asreview.data.utils import minhash_signatures
 from asreview.database.database import Database
 from asreview.datasets import DatasetManager
 from asreview.extensions import load_extension
@@ -75,6 +81,16 @@ def _from_file(fp, reader=None, dataset_id=None, **kwargs):
     return reader.read_records(fp, dataset_id=dataset_id, **kwargs)
 
 
+def _iter_data_from_file(fp, reader=None, **kwargs):
+    """Read the cleaned data of a supported file format in chunks.
+
+    See `_from_file` for the parameters. Returns an iterator over DataFrames.
+    """
+    if reader is None:
+        reader = _get_reader(fp)
+    return reader.iter_data(fp, **kwargs)
+
+
 def _from_extension(name, reader=None, dataset_id=None, **kwargs):
     """Load a dataset from extension.
 
@@ -102,6 +118,103 @@ def _from_extension(name, reader=None, dataset_id=None, **kwargs):
     return reader.read_records(fp, dataset_id=dataset_id, **kwargs)
 
 
+def _iter_data_from_extension(name, reader=None, **kwargs):
+    """Read the cleaned data of a dataset from extension in chunks.
+
+    See `_from_extension` for the parameters. Returns an iterator over DataFrames.
+    """
+
+    dataset = DatasetManager().find(name)
+
+    if dataset.filepath:
+        fp = dataset.filepath
+    else:
+        # build dataset to temporary file
+        reader = dataset.reader()
+        fp = StringIO(dataset.to_file())
+
+    if reader is None:
+        reader = _get_reader(fp)
+    return reader.iter_data(fp, **kwargs)
+
+
+def _iter_data(name, **kwargs):
+    """Read the cleaned data of a file, URL, or plugin dataset in chunks.
+
+    See `load_records` for the parameters. Returns an iterator over DataFrames.
+    """
+
+    # check is file or URL
+    if _is_url(name) or Path(name).exists():
+        return _iter_data_from_file(name, **kwargs)
+
+    # check if dataset is plugin dataset
+    try:
+        return _iter_data_from_extension(name, **kwargs)
+    except ValueError:
+        pass
+
+    # Could not find dataset, return None.
+    raise FileNotFoundError(f"File, URL, or dataset does not exist: '{name}'")
+
+
+def _get_group_key(features):
+    """Get a compact key of the features used to identify groups of records."""
+    return hashlib.blake2b(repr(features).encode(), digest_size=16).digest()
+
+
+def _add_data(store, data_chunks, dataset_id=None, similarity_threshold=None):
+    """Add chunks of cleaned data to the data store and identify groups of records.
+
+    Only a compact key (and the MinHash signature, if near-duplicates are grouped) of
+    each record is kept in memory after a chunk is added to the data store, so the
+    memory usage does not depend on the size of the texts.
+
+    Parameters
+    ----------
+    store : asreview.database.store.DataStore
+        Data store to add the records to.
+    data_chunks : Iterable[pd.DataFrame]
+        Chunks of cleaned data to add, see `BaseReader.iter_data`.
+    dataset_id : str, optional
+        Identifier of the dataset. By default None.
+    similarity_threshold : float, optional
+        If given, also group near-duplicate records, see
+        `identify_record_groups`. By default None.
+    """
+    record_ids = []
+    keys = []
+    signatures = []
+    for df in data_chunks:
+        if len(df) == 0:
+            continue
+
+        record_ids.extend(store.add_dataframe(df, dataset_id=dataset_id))
+        text = df.reindex(columns=["title", "abstract"]).astype(object)
+        text = text.where(text.notna(), None)
+        features = [
+            tuple(feature_extractor(row) for feature_extractor in DEFAULT_EXTRACTORS)
+            for row in text.itertuples()
+        ]
+        keys.extend(_get_group_key(row_features) for row_features in features)
+        if similarity_threshold is not None:
+            signatures.append(
+                minhash_signatures("".join(row_features) for row_features in features)
+            )
+
+    groups = identify_groups(keys)
+    if similarity_threshold is not None and signatures:
+        groups = identify_near_duplicate_groups(
+            np.concatenate(signatures), similarity_threshold, groups=groups
+        )
+    store.set_groups(
+        [
+            (record_ids[group_id], record_ids[record_id])
+            for group_id, record_id in groups
+        ]
+    )
+
+
 def load_records(name, dataset_id=None, **kwargs):
     """Load records from file, URL, or plugin.
 
@@ -132,7 +245,14 @@ def load_records(name, dataset_id=None, **kwargs):
     raise FileNotFoundError(f"File, URL, or dataset does not exist: '{name}'")
 
 
-def load_dataset(name, dataset_id=None, db=None, record_cls=Record, **kwargs):
+def load_dataset(
+    name,
+    dataset_id=None,
+    db=None,
+    record_cls=Record,
+    similarity_threshold=None,
+    **kwargs,
+):
     """Load dataset from file, URL, or plugin.
 
     Parameters
@@ -147,8 +267,12 @@ def load_dataset(name, dataset_id=None, db=None, record_cls=Record, **kwargs):
         database is created. By default None.
     record_cls : Type[asreview.data.record.Base], optional
         Record type to use for the dataset records, by default Record
+    similarity_threshold : float, optional
+        If given, records with a similarity of at least this value are grouped as
+        near-duplicates, see `asreview.data.utils.identify_near_duplicate_groups`.
+        By default only records with identical title and abstract are grouped.
     kwargs : dict, optional
-        Keyword arguments passed to `load_records`.
+        Keyword arguments passed to the reader.
 
     Returns
     -------
@@ -160,10 +284,10 @@ def load_dataset(name, dataset_id=None, db=None, record_cls=Record, **kwargs):
     if dataset_id is None:
         dataset_id = str(name)
     db.create_tables()
-    records = load_records(
-        name=name, dataset_id=dataset_id, record_cls=record_cls, **kwargs
+    _add_data(
+        db.input,
+        _iter_data(name, **kwargs),
+        dataset_id=dataset_id,
+        similarity_threshold=similarity_threshold,
     )
-    db.input.add_records(records=records)
-    groups = identify_record_groups(records)
-    db.input.set_groups(groups)
     return db
@@ -116,6 +116,49 @@ class Base(DeclarativeBase, MappedAsDataclass):
             for column in cls.__mapper__.columns
         }
 
+    @classmethod
+    def validate_dataframe(cls, df):
+        """Validate the rows of a DataFrame as records.
+
+        This is used by `DataStore.add_dataframe` to validate data without storing
+        record objects. By default a record is created for each row, so that the
+        validations of the record class are applied. Record classes can overwrite this
+        method with column-wise validations for large datasets.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Data in which each column is a record column.
+
+        Returns
+        -------
+        pd.DataFrame
+            Data with the values as they are stored in the database.
+
+        Raises
+        ------
+        ValueError
+            If a row does not pass the validations of the record class.
+        """
+        rows = []
+        for idx, row in zip(df.index, df.to_dict("records")):
+            try:
+                record = cls(**row)
+            except ValueError as e:
+                raise ValueError(f"Error when reading row {idx} of dataset: {e}") from e
+            rows.append({column: getattr(record, column) for column in df.columns})
+        return pd.DataFrame(rows, index=df.index, columns=df.columns, dtype=object)
+
+
+def _raise_invalid_rows(s, invalid, message):
+    """Raise a ValueError for the first invalid value in a column."""
+    if invalid.any():
+        idx = invalid.idxmax()
+        raise ValueError(
+            f"Error when reading row {idx} of dataset: "
+            + message.format(key=s.name, value=s[idx])
+        )
+
 
 class Record(Base):
     __tablename__ = "record"
@@ -177,3 +220,100 @@ class Record(Base):
     @validates("year")
     def validate_optional_integer(self, key, value):
         return convert_value_to_int(value)
+
+    @classmethod
+    def validate_dataframe(cls, df):
+        """Validate the rows of a DataFrame as records, column by column.
+
+        The checks are the same as the validations of the record fields, but missing
+        values (None or NaN) are allowed in all optional columns.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Data in which each column is a record column.
+
+        Returns
+        -------
+        pd.DataFrame
+            Data with the values as they are stored in the database.
+
+        Raises
+        ------
+        ValueError
+            If a value does not pass the validations of the record class.
+        """
+        df = df.astype(object)
+
+        for key in ("title", "abstract", "doi", "url"):
+            if key not in df.columns:
+                continue
+            s = df[key]
+            missing = s.isna() | s.eq("")
+            if pd.api.types.infer_dtype(s[~missing], skipna=True) not in (
+                "string",
+                "empty",
+            ):
+                _raise_invalid_rows(
+                    s,
+                    ~missing & ~s.map(lambda value: isinstance(value, str)),
+                    "'{key}' should be a string or None, but is: {value}",
+                )
+            df[key] = s.where(~missing, None)
+
+        for key in ("authors", "keywords"):
+            if key not in df.columns:
+                continue
+            s = df[key]
+            missing = s.isna()
+            valid = missing | s.map(
+                lambda value: (
+                    isinstance(value, list)
+                    and all(isinstance(item, str) for item in value)
+                )
+            )
+            if not valid.all():
+                _raise_invalid_rows(
+                    s,
+                    ~missing & ~s.map(lambda value: isinstance(value, list)),
+                    "'{key}' should be a list or None, but is: {value}",
+                )
+                _raise_invalid_rows(s, ~valid, "'{key}' should be a list of strings")
+            df[key] = pd.Series(
+                [[] if m else value for m, value in zip(missing, s)],
+                index=df.index,
+                dtype=object,
+            )
+
+        if "included" in df.columns:
+            s = df["included"]
+            missing = s.isna()
+            _raise_invalid_rows(
+                s,
+                ~missing & ~s.isin([0, 1]),
+                "included should be one of 0, 1, or None. Not '{value}'",
+            )
+            df["included"] = pd.Series(
+                [None if m else int(v) for m, v in zip(missing, s)],
+                index=df.index,
+                dtype=object,
+            )
+
+        for key in ("dataset_row", "year"):
+            if key not in df.columns:
+                continue
+            s = df[key]
+            missing = s.isna()
+            numbers = pd.to_numeric(s, errors="coerce")
+            _raise_invalid_rows(
+                s,
+                ~missing & (numbers.isna() | (numbers % 1 != 0)),
+                "'{key}' should be an integer. Value: {value}",
+            )
+            df[key] = pd.Series(
+                [None if m else int(v) for m, v in zip(missing, numbers)],
+                index=df.index,
+                dtype=object,
+            )
+
+        return df
@@ -14,17 +14,18 @@
 
 __all__ = ["RISReader", "RISWriter"]
 
-import copy
 import io
 import json
 import re
+from itertools import islice
 from urllib.request import urlopen
 
 import pandas as pd
 import rispy
 
 from asreview.data.base import BaseReader
-from asreview.data.utils import convert_value_to_list
+from asreview.data.tabular import _detect_encoding
+from asreview.data.utils import convert_series_to_list
 from asreview.utils import _is_url
 
 RIS_NOTE_LABEL_MAPPING = {
@@ -68,6 +69,45 @@ def _remove_asreview_data_from_notes(note_list):
     ]
 
 
+def _read_url(url):
+    """Read the text of a RIS file from a URL."""
+    content = urlopen(url).read()
+    for encoding in ["utf-8", "utf-8-sig", "ISO-8859-1"]:
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+
+
+def _iter_ris_entries(lines):
+    """Parse the entries of a RIS file one by one.
+
+    The lines are split into entries on the end tag, and each entry is parsed
+    separately with `rispy.RisParser.parse_lines`.
+
+    Parameters
+    ----------
+    lines: Iterable[str]
+        Lines of the RIS file.
+
+    Yields
+    ------
+    dict:
+        Entry of the RIS file.
+    """
+    parser = rispy.RisParser(skip_unknown_tags=True)
+    entry_lines = []
+    for line in lines:
+        entry_lines.append(line)
+        text = parser.clean_text(line)
+        if parser.is_tag(text) and parser.get_tag(text) == parser.END_TAG:
+            yield from parser.parse_lines(entry_lines)
+            entry_lines = []
+
+    if entry_lines:
+        yield from parser.parse_lines(entry_lines)
+
+
 class RISReader(BaseReader):
     """RIS file reader."""
 
@@ -106,19 +146,79 @@ class RISReader(BaseReader):
             return note_list
 
     @classmethod
-    def _read_from_file(cls, fp, encoding="utf8"):
-        with open(fp, encoding=encoding) as bibliography_file:
-            return list(rispy.load(bibliography_file, skip_unknown_tags=True))
+    def _clean_entry(cls, entry):
+        """Strip the notes of an entry and parse the ASReview label from the notes."""
+        if "notes" in entry:
+            notes = cls._strip_zotero_p_tags(entry["notes"])
+            entry["included"] = _parse_label_from_notes(notes)
+            entry["notes"] = _remove_asreview_data_from_notes(notes)
+        return entry
 
     @classmethod
-    def _read_from_url(cls, fp, encoding="utf8"):
-        url_input = urlopen(fp)
+    def _iter_entries(cls, fp):
+        """Parse the entries of a RIS file one by one.
 
-        bibliography_file = io.StringIO(url_input.read().decode(encoding))
-        entries = list(rispy.load(bibliography_file, skip_unknown_tags=True))
-        bibliography_file.close()
+        Parameters
+        ----------
+        fp: str, pathlib.Path
+            File path or URL of the RIS file.
 
-        return entries
+        Yields
+        ------
+        dict:
+            Entry with the notes cleaned and the ASReview label parsed from the notes.
+        """
+        try:
+            if _is_url(fp):
+                with io.StringIO(_read_url(fp)) as bibliography_file:
+                    for entry in _iter_ris_entries(bibliography_file):
+                        yield cls._clean_entry(entry)
+            else:
+                yield from cls._iter_file_entries(fp)
+        except UnicodeDecodeError:
+            raise ValueError("Cannot find proper encoding for data file")
+        except Exception as e:
+            raise ValueError(f"Error reading RIS file: {e}")
+
+    @classmethod
+    def _iter_file_entries(cls, fp):
+        """Parse the entries of a local RIS file one by one.
+
+        If the file is not UTF-8 after the head of the file, the file is read again
+        as ISO-8859-1 from the first entry that wasn't yielded yet.
+        """
+        encoding = _detect_encoding(fp)
+        n_entries = 0
+        try:
+            with open(fp, encoding=encoding) as bibliography_file:
+                for entry in _iter_ris_entries(bibliography_file):
+                    yield cls._clean_entry(entry)
+                    n_entries += 1
+        except UnicodeDecodeError:
+            if encoding == "ISO-8859-1":
+                raise
+            with open(fp, encoding="ISO-8859-1") as bibliography_file:
+                entries = _iter_ris_entries(bibliography_file)
+                for entry in islice(entries, n_entries, None):
+                    yield cls._clean_entry(entry)
+
+    @classmethod
+    def _to_dataframe(cls, entries, start=0):
+        """Turn parsed entries into a dataframe, with the index starting at start."""
+        df = pd.DataFrame(entries, index=pd.RangeIndex(start, start + len(entries)))
+
+        if "notes" in df:
+            # Entries without notes get an empty list of notes.
+            df["notes"] = [
+                notes if isinstance(notes, list) else [] for notes in df["notes"]
+            ]
+
+        if "included" in df:
+            included = df.pop("included")
+            if not included.isna().all():
+                df["included"] = included.astype("Int64")
+
+        return df
 
     @classmethod
     def read_data(cls, fp):
@@ -141,41 +241,34 @@ class RISReader(BaseReader):
         ValueError
             File with unrecognized encoding is used as input.
         """
-        encodings = ["utf-8", "utf-8-sig", "ISO-8859-1"]
-        entries = None
-        for encoding in encodings:
-            try:
-                if _is_url(fp):
-                    entries = cls._read_from_url(fp, encoding=encoding)
-                    break
-                else:
-                    entries = cls._read_from_file(fp, encoding=encoding)
-                    break
-            except UnicodeDecodeError:
-                continue
-            except Exception as e:
-                raise ValueError(f"Error reading RIS file: {e}")
-
-        if entries is None:
-            raise ValueError("Cannot find proper encoding for data file")
+        return cls._to_dataframe(list(cls._iter_entries(fp)))
 
-        # Turn the entries dictionary into a Pandas dataframe
-        df = pd.DataFrame(entries)
+    @classmethod
+    def read_data_chunks(cls, fp, chunksize=None):
+        """Import dataset in chunks.
 
-        # Check if "notes" column is present
-        if "notes" in df:
-            # Strip Zotero XHTML <p> tags on "notes"
-            df["notes"] = df["notes"].apply(cls._strip_zotero_p_tags)
-            # Parse the labels from the notes if present.
-            labels = df["notes"].apply(_parse_label_from_notes)
-            if not labels.isna().all():
-                df["included"] = labels
-            df["notes"] = df["notes"].apply(_remove_asreview_data_from_notes)
+        The entries are parsed one by one, so only one chunk of entries is in memory
+        at a time. A chunk only has an `included` column if one of its entries has
+        an ASReview label, see `read_data`.
 
-        if "included" in df:
-            df["included"] = df["included"].astype("Int64")
+        Parameters
+        ----------
+        fp: str, pathlib.Path
+            File path to the RIS file.
+        chunksize: int
+            Number of entries per chunk. Default is `__chunksize__`.
 
-        return df
+        Yields
+        ------
+        pd.DataFrame:
+            Chunk of the entries.
+        """
+        chunksize = cls.__chunksize__ if chunksize is None else chunksize
+        entries = cls._iter_entries(fp)
+        start = 0
+        while chunk := list(islice(entries, chunksize)):
+            yield cls._to_dataframe(chunk, start=start)
+            start += len(chunk)
 
     @classmethod
     def clean_data(cls, df):
@@ -191,8 +284,8 @@ class RISReader(BaseReader):
             df["authors"] = None
         if "first_authors" not in df:
             df["first_authors"] = None
-        df["authors"] = df["authors"].apply(convert_value_to_list)
-        df["first_authors"] = df["first_authors"].apply(convert_value_to_list)
+        df["authors"] = convert_series_to_list(df["authors"])
+        df["first_authors"] = convert_series_to_list(df["first_authors"])
         df["authors"] = df["authors"] + df["first_authors"]
 
         return super().clean_data(df)
@@ -206,6 +299,9 @@ class RISWriter:
     caution = "Available only if you imported a RIS file when creating the project"
     write_format = ".ris"
 
+    # Number of records converted to RIS references at a time.
+    __chunksize__ = 10000
+
     @classmethod
     def write_data(cls, df, fp):
         """Export dataset.
@@ -227,53 +323,98 @@ class RISWriter:
             value `ASReview_relevant`, `ASReview_irrelevant` or `ASReview_not_seen`
             corresponding to the value `1`, `0` or `None` in that column.
         """
-        # Turn pandas DataFrame into records (list of dictionaries) for rispy
-        records = copy.deepcopy(df.to_dict("records"))
-
-        # Create an array for storing modified records
-        records_new = []
-
-        # Iterate over all available records
-        for rec in records:
-
-            def _isnull(v):
-                if isinstance(v, list):
-                    return v == []
-
-                return pd.isnull(v)
-
-            rec_copy = {}
-            rec_copy["notes"] = rec.pop("notes", [])
-            for key, val in rec.items():
-                if key == "asreview_label":
-                    rec_copy["notes"].insert(
-                        0, LABEL_RIS_NOTE_MAPPING[rec["asreview_label"]]
-                    )
-                elif _isnull(val):
-                    continue
-                elif key.startswith("asreview_"):
-                    rec_copy["notes"].append(f"{key}: {json.dumps(val)}")
-                else:
-                    rec_copy[key] = val
-            if rec_copy["notes"] == []:
-                rec_copy.pop("notes")
-
-            # Throw away columns that can not be exported to RIS.
-            rec_copy = {
-                key: val
-                for key, val in rec_copy.items()
-                if not key == "included" and not key.startswith("asreview_")
-            }
-            # Append the deepcopied and updated record to a new array
-            records_new.append(rec_copy)
-
         # From buffered dataframe
         if fp is None:
             # Write the whole content to buffer
-            return rispy.dumps(records_new)
+            return "".join(cls.write_data_chunks([df]))
 
         # From IO dataframe
         else:
-            # Write the whole content to a file
-            with open(fp, "w", encoding="utf8") as fp:
-                rispy.dump(records_new, fp)
+            cls.write_data_chunks([df], fp)
+
+    @classmethod
+    def write_data_chunks(cls, chunks, fp=None):
+        """Export dataset in chunks.
+
+        The records are converted to RIS references and written in parts of
+        `__chunksize__` records. See `write_data` for the conversion.
+
+        Parameters
+        ----------
+        chunks: Iterable[pd.DataFrame]
+            Chunks of the record data.
+        fp: str, pathlib.Path, NoneType
+            File path to the RIS file, or None for an iterator.
+
+        Returns
+        -------
+        Iterator[str]
+            If fp is None, the parts of the RIS file.
+        """
+        if fp is None:
+            return _iter_ris_chunks(chunks, cls.__chunksize__)
+
+        with open(fp, "w", encoding="utf8") as f:
+            for text in _iter_ris_chunks(chunks, cls.__chunksize__):
+                f.write(text)
+
+
+def _isnull(v):
+    if isinstance(v, list):
+        return v == []
+
+    return pd.isnull(v)
+
+
+def _to_reference(rec):
+    """Turn a record of the dataframe into a RIS reference for rispy."""
+    # The notes are copied, so the notes of the dataframe are not changed.
+    notes = rec.pop("notes", None)
+    rec_copy = {"notes": list(notes) if isinstance(notes, list) else []}
+    for key, val in rec.items():
+        if key == "asreview_label":
+            rec_copy["notes"].insert(0, LABEL_RIS_NOTE_MAPPING[rec["asreview_label"]])
+        elif _isnull(val):
+            continue
+        elif key.startswith("asreview_"):
+            rec_copy["notes"].append(f"{key}: {json.dumps(val)}")
+        else:
+            rec_copy[key] = val
+    if rec_copy["notes"] == []:
+        rec_copy.pop("notes")
+
+    # Throw away columns that can not be exported to RIS.
+    return {
+        key: val
+        for key, val in rec_copy.items()
+        if not key == "included" and not key.startswith("asreview_")
+    }
+
+
+class _RisWriter(rispy.RisWriter):
+    """RIS writer numbering the references from an offset."""
+
+    def __init__(self, offset=0, **kwargs):
+        super().__init__(**kwargs)
+        self.offset = offset
+
+    def set_header(self, count):
+        return super().set_header(self.offset + count)
+
+
+def _iter_ris_chunks(chunks, chunksize):
+    """Format chunks of data as RIS, in parts of at most chunksize records.
+
+    The references are numbered and separated as if they were written at once.
+    """
+    n_references = 0
+    for df in chunks:
+        for start in range(0, len(df), chunksize):
+            references = [
+                _to_reference(rec)
+                for rec in df.iloc[start : start + chunksize].to_dict("records")
+            ]
+            text = _RisWriter(offset=n_references).formats(references)
+            # Separate the part from the last reference of the previous part.
+            yield text if n_references == 0 else "\n" + text
+            n_references += len(references)
@@ -14,19 +14,69 @@
 
 __all__ = ["fuzzy_find"]
 
+import itertools
+import json
 import re
+import sqlite3
+from collections import Counter
+from collections import defaultdict
 from difflib import SequenceMatcher
 
 import numpy as np
+import pandas as pd
 
+from asreview.database.store import DataStore
+from asreview.database.store import _batched_in
+from asreview.database.store import unwrap_operational_errors
 from asreview.utils import _format_to_str
 
+SEARCH_COLUMNS = ["title", "authors", "keywords"]
+
+# The search index is stored next to the records in the database of the data store.
+# The tokens table contains the vocabulary of the records and the postings table the
+# record_ids containing each token. The characters table contains for each character c
+# and count n the tokens containing c at least n times. These are the only values
+# needed to compute the quick ratio of `difflib.SequenceMatcher`, so the fuzzy scores
+# can be computed without comparing the keywords with each token of the vocabulary.
+# The identifiers are stored as arrays of 64-bit integers. The state table contains
+# the last indexed record_id, so that records added later can be indexed incrementally.
+SEARCH_INDEX_TABLES = [
+    """CREATE TABLE IF NOT EXISTS search_tokens
+        (token_id INTEGER PRIMARY KEY,
+        token TEXT NOT NULL UNIQUE,
+        length INTEGER NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS search_postings
+        (token_id INTEGER PRIMARY KEY,
+        record_ids BLOB NOT NULL)""",
+    """CREATE TABLE IF NOT EXISTS search_characters
+        (character TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        token_ids BLOB NOT NULL,
+        PRIMARY KEY (character, count))""",
+    """CREATE TABLE IF NOT EXISTS search_index_state
+        (last_record_id INTEGER NOT NULL)""",
+]
+
+_TOKEN_RE = re.compile(r"['\w]+")
+_INDEX_DTYPE = np.dtype("<i8")
+
+
+def _to_bytes(ids):
+    return np.array(ids, dtype=_INDEX_DTYPE).tobytes()
+
+
+def _json_to_str(value):
+    # The tokens of a JSON encoded list of strings are the tokens of the strings,
+    # unless the strings contain escaped characters.
+    if value.startswith("[") and "\\" not in value:
+        return value
+    return _format_to_str(json.loads(value))
+
 
 def _create_inverted_index(match_strings):
     index = {}
-    word = re.compile(r"['\w]+")
     for i, match in enumerate(match_strings):
-        tokens = word.findall(match.lower())
+        tokens = _TOKEN_RE.findall(match.lower())
         for token in tokens:
             if token in index:
                 if index[token][-1] != i:
@@ -54,8 +104,7 @@ def _get_fuzzy_scores(keywords, match_strings, threshold=0.9):
     inv_index = _create_inverted_index(match_strings)
 
     n_match = len(match_strings)
-    word = re.compile(r"['\w]+")
-    key_list = word.findall(keywords.lower())
+    key_list = _TOKEN_RE.findall(keywords.lower())
 
     ratios = np.zeros(n_match)
     for key in key_list:
@@ -77,6 +126,248 @@ def _get_fuzzy_scores(keywords, match_strings, threshold=0.9):
     return (100 * ratios) / len(key_list)
 
 
+def _get_search_columns(store):
+    columns = [column for column in SEARCH_COLUMNS if column in store]
+    if "title" not in columns:
+        raise ValueError("Cannot search dataset without titles.")
+    return columns
+
+
+@unwrap_operational_errors
+def _update_search_index(store):
+    """Add the records of the data store that are not indexed yet to the search index.
+
+    The first call builds the search index of all records in the data store. Later
+    calls only index the records added since then, so the index of a project is built
+    once when the dataset is added.
+
+    Parameters
+    ----------
+    store: DataStore
+        The data store containing the records.
+
+    Raises
+    ------
+    sqlite3.OperationalError
+        If the search index is not up to date and the data store is read only.
+    """
+    columns = _get_search_columns(store)
+    table = store.record_cls.__table__
+
+    with store.engine.begin() as con:
+        has_index = con.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type='table' "
+            "AND name='search_index_state'"
+        ).scalar()
+        if has_index:
+            last_record_id = con.exec_driver_sql(
+                "SELECT MAX(last_record_id) FROM search_index_state"
+            ).scalar()
+        else:
+            last_record_id = None
+        if last_record_id is None:
+            last_record_id = -1
+
+        max_record_id = con.exec_driver_sql(
+            f"SELECT MAX(record_id) FROM {table.name}"
+        ).scalar()
+        if has_index and (max_record_id is None or max_record_id <= last_record_id):
+            return
+
+        for statement in SEARCH_INDEX_TABLES:
+            con.exec_driver_sql(statement)
+        if max_record_id is None:
+            return
+
+        records = pd.DataFrame(
+            con.exec_driver_sql(
+                f"SELECT record_id, {', '.join(columns)} FROM {table.name} "
+                "WHERE record_id > ? ORDER BY record_id",
+                (last_record_id,),
+            ).fetchall(),
+            columns=["record_id", *columns],
+        )
+        text = records["title"].fillna("")
+        for column in columns[1:]:
+            text += " " + records[column].map(_json_to_str, na_action="ignore").fillna(
+                ""
+            )
+
+        vocabulary = dict(
+            con.exec_driver_sql("SELECT token, token_id FROM search_tokens").fetchall()
+        )
+        n_tokens = len(vocabulary)
+
+        # Sort the (token, record_id) pairs by token and remove the duplicates.
+        tokens = text.str.lower().str.findall(_TOKEN_RE)
+        codes, uniques = pd.factorize(
+            np.fromiter(itertools.chain.from_iterable(tokens), dtype=object)
+        )
+        record_ids = np.repeat(
+            records["record_id"].to_numpy(dtype=np.int64), tokens.str.len()
+        )
+        codes, record_ids = np.divmod(
+            np.unique(codes.astype(np.int64) * (max_record_id + 1) + record_ids),
+            max_record_id + 1,
+        )
+        splits = np.flatnonzero(np.diff(codes)) + 1
+
+        postings = {}
+        if len(codes) > 0:
+            for token, ids in zip(
+                uniques[codes[np.r_[0, splits]]], np.split(record_ids, splits)
+            ):
+                token_id = vocabulary.setdefault(token, len(vocabulary))
+                postings[token_id] = ids.astype(_INDEX_DTYPE)
+
+        new_tokens = list(vocabulary.items())[n_tokens:]
+        characters = defaultdict(list)
+        for token, token_id in new_tokens:
+            for character, count in Counter(token).items():
+                for n in range(1, count + 1):
+                    characters[(character, n)].append(token_id)
+
+        if new_tokens:
+            con.exec_driver_sql(
+                "INSERT INTO search_tokens (token, token_id, length) VALUES (?, ?, ?)",
+                [(token, token_id, len(token)) for token, token_id in new_tokens],
+            )
+
+        # Append the new identifiers to the existing rows of the index.
+        existing_postings = dict(
+            _batched_in(
+                lambda batch: con.exec_driver_sql(
+                    "SELECT token_id, record_ids FROM search_postings "
+                    f"WHERE token_id IN ({', '.join(['?'] * len(batch))})",
+                    tuple(batch),
+                ).fetchall(),
+                [token_id for token_id in postings if token_id < n_tokens],
+            )
+        )
+        existing_characters = {
+            (character, n): token_ids
+            for character, n, token_ids in con.exec_driver_sql(
+                "SELECT character, count, token_ids FROM search_characters"
+            )
+        }
+        if postings:
+            con.exec_driver_sql(
+                "INSERT OR REPLACE INTO search_postings (token_id, record_ids) "
+                "VALUES (?, ?)",
+                [
+                    (
+                        token_id,
+                        existing_postings.get(token_id, b"") + record_ids.tobytes(),
+                    )
+                    for token_id, record_ids in postings.items()
+                ],
+            )
+        if characters:
+            con.exec_driver_sql(
+                "INSERT OR REPLACE INTO search_characters "
+                "(character, count, token_ids) VALUES (?, ?, ?)",
+                [
+                    (
+                        character,
+                        n,
+                        existing_characters.get((character, n), b"")
+                        + _to_bytes(token_ids),
+                    )
+                    for (character, n), token_ids in characters.items()
+                ],
+            )
+        con.exec_driver_sql("DELETE FROM search_index_state")
+        con.exec_driver_sql(
+            "INSERT INTO search_index_state (last_record_id) VALUES (?)",
+            (max_record_id,),
+        )
+
+
+def _get_fuzzy_scores_from_index(store, keywords, threshold=0.9):
+    """Rank the records of a data store with the search index.
+
+    The scores are the same as the scores of `_get_fuzzy_scores`. The quick ratio of a
+    keyword and a token is computed for all tokens at once from the number of
+    characters they have in common.
+
+    Parameters
+    ----------
+    store: DataStore
+        The data store containing the records. The search index should be up to date,
+        see `_update_search_index`.
+    keywords: str
+        Keywords that we are trying to find in the records.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of scores, where the position in the array is the record_id.
+    """
+    key_list = _TOKEN_RE.findall(keywords.lower())
+    table = store.record_cls.__tablename__
+
+    with store.engine.connect() as con:
+        n_records = con.exec_driver_sql(
+            f"SELECT COALESCE(MAX(record_id) + 1, 0) FROM {table}"
+        ).scalar()
+        n_tokens = con.exec_driver_sql(
+            "SELECT COALESCE(MAX(token_id) + 1, 0) FROM search_tokens"
+        ).scalar()
+
+        ratios = np.zeros(n_records)
+        for key in key_list:
+            matches = np.zeros(n_tokens, dtype=np.int64)
+            for character, count in Counter(key).items():
+                for (token_ids,) in con.exec_driver_sql(
+                    "SELECT token_ids FROM search_characters "
+                    "WHERE character = ? AND count <= ?",
+                    (character, count),
+                ):
+                    matches[np.frombuffer(token_ids, dtype=_INDEX_DTYPE)] += 1
+
+            # The quick ratio is at most 2 * matches / (matches + len(key)), so only
+            # the tokens with enough matching characters are candidates.
+            candidates = np.flatnonzero(
+                2.0 * matches / (matches + len(key)) >= threshold
+            ).tolist()
+            token_lengths = dict(
+                _batched_in(
+                    lambda batch: con.exec_driver_sql(
+                        "SELECT token_id, length FROM search_tokens "
+                        f"WHERE token_id IN ({', '.join(['?'] * len(batch))})",
+                        tuple(batch),
+                    ).fetchall(),
+                    candidates,
+                )
+            )
+
+            # Same computation as SequenceMatcher.quick_ratio.
+            token_ratios = {}
+            for token_id in candidates:
+                ratio = 2.0 * matches[token_id] / (token_lengths[token_id] + len(key))
+                if ratio >= threshold:
+                    token_ratios[token_id] = float(ratio)
+
+            postings = _batched_in(
+                lambda batch: con.exec_driver_sql(
+                    "SELECT token_id, record_ids FROM search_postings "
+                    f"WHERE token_id IN ({', '.join(['?'] * len(batch))})",
+                    tuple(batch),
+                ).fetchall(),
+                list(token_ratios),
+            )
+
+            cur_ratios = np.zeros(n_records)
+            for token_id, record_ids in postings:
+                record_ids = np.frombuffer(record_ids, dtype=_INDEX_DTYPE)
+                cur_ratios[record_ids] = np.maximum(
+                    cur_ratios[record_ids], token_ratios[token_id]
+                )
+            ratios += cur_ratios
+
+    return (100 * ratios) / len(key_list)
+
+
 def fuzzy_find(
     data,
     keywords,
@@ -90,6 +381,10 @@ def fuzzy_find(
     (for as much is available). Using the diflib package it creates
     a ranking based on token set matching.
 
+    If the data is a DataStore, the search uses the search index stored in the
+    database of the data store. The index is built on the first search if it doesn't
+    exist yet.
+
     Parameters
     ----------
     data: pd.DataFrame or DataStore
@@ -107,24 +402,36 @@ def fuzzy_find(
     Returns
     -------
     list
-        Sorted list of indexes that match best the keywords.
+        Sorted list of indexes that match best the keywords. For a DataStore, these
+        are the record identifiers.
     """
-    if "title" not in data:
-        raise ValueError("Cannot search dataset without titles.")
+    new_ranking = None
+    if isinstance(data, DataStore):
+        try:
+            _update_search_index(data)
+        except sqlite3.OperationalError:
+            # The index can't be written to a read only data store.
+            data = data[_get_search_columns(data)]
+        else:
+            new_ranking = _get_fuzzy_scores_from_index(data, keywords)
+
+    if new_ranking is None:
+        if "title" not in data:
+            raise ValueError("Cannot search dataset without titles.")
+
+        all_strings = data["title"].fillna("")
 
-    all_strings = data["title"].fillna("")
+        if "authors" in data:
+            all_strings += " " + data["authors"].map(_format_to_str).fillna("")
 
-    if "authors" in data:
-        all_strings += " " + data["authors"].map(_format_to_str).fillna("")
+        if "keywords" in data:
+            all_strings += " " + data["keywords"].map(_format_to_str).fillna("")
 
-    if "keywords" in data:
-        all_strings += " " + data["keywords"].map(_format_to_str).fillna("")
+        new_ranking = _get_fuzzy_scores(keywords, all_strings.values)
 
-    new_ranking = _get_fuzzy_scores(keywords, all_strings.values)
     sorted_idx = np.argsort(-new_ranking)
     best_idx = []
-    if exclude is None:
-        exclude = np.array([], dtype=int)
+    exclude = set() if exclude is None else set(exclude)
     for idx in sorted_idx:
         if idx in exclude:
             continue
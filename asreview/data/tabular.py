@@ -15,10 +15,19 @@
 __all__ = ["CSVReader"]
 
 
+import codecs
+import csv
+import io
+from pathlib import Path
+
 import pandas as pd
 
 from asreview.data.base import BaseReader
 from asreview.data.record import Record
+from asreview.utils import _is_url
+
+# Format of the dates in exported files.
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 
 class CSVReader(BaseReader):
@@ -33,6 +42,10 @@ class CSVReader(BaseReader):
         "text/plain": [".csv", ".tsv", ".tab"],
     }
 
+    # Columns for which pandas infers the data type when reading a local file. All
+    # other columns are read as strings.
+    __numeric_columns__ = ["included", "year"]
+
     @classmethod
     def read_data(cls, fp):
         """Import dataset.
@@ -47,14 +60,164 @@ class CSVReader(BaseReader):
         list:
             List with entries.
         """
-        for encoding in ["utf-8", "ISO-8859-1"]:
-            try:
-                return pd.read_csv(fp, sep=None, encoding=encoding, engine="python")
-            except UnicodeDecodeError:
-                # if unicode error, go to next encoding
-                continue
+        if not _is_local_file(fp):
+            return _read_csv_python_engine(fp)
+
+        encoding = _detect_encoding(fp)
+        sep = _sniff_delimiter(fp, encoding)
+        try:
+            return pd.read_csv(
+                fp, sep=sep, encoding=encoding, dtype=cls._get_dtype(fp, sep, encoding)
+            )
+        except UnicodeDecodeError:
+            # the file is not UTF-8 after the head of the file
+            return pd.read_csv(
+                fp,
+                sep=sep,
+                encoding="ISO-8859-1",
+                dtype=cls._get_dtype(fp, sep, "ISO-8859-1"),
+            )
+
+    @classmethod
+    def read_data_chunks(cls, fp, chunksize=None):
+        """Import dataset in chunks.
 
-        raise UnicodeDecodeError("The encoding of the file is not supported.")
+        The delimiter is detected from the first line of the file, after which the
+        file is read in chunks with the C engine of pandas. The chunks together are
+        equal to the output of `read_data`.
+
+        If the file is not UTF-8 after the head of the file, the file is read again
+        as ISO-8859-1 from the first row that wasn't yielded yet. The rows yielded
+        before are not decoded again, so they differ from the output of `read_data`
+        if they contain non-ASCII characters.
+
+        Parameters
+        ----------
+        fp: str, pathlib.Path
+            File path to the CSV file.
+        chunksize: int
+            Number of rows per chunk. Default is `__chunksize__`.
+
+        Yields
+        ------
+        pd.DataFrame:
+            Chunk of the entries.
+        """
+        if not _is_local_file(fp):
+            yield _read_csv_python_engine(fp)
+            return
+
+        chunksize = cls.__chunksize__ if chunksize is None else chunksize
+        encoding = _detect_encoding(fp)
+        sep = _sniff_delimiter(fp, encoding)
+
+        n_rows = 0
+        try:
+            for df in cls._read_csv_chunks(fp, sep, encoding, chunksize):
+                yield df
+                n_rows += len(df)
+        except UnicodeDecodeError:
+            if encoding == "ISO-8859-1":
+                raise
+            for df in cls._read_csv_chunks(fp, sep, "ISO-8859-1", chunksize):
+                if df.index[-1] >= n_rows:
+                    yield df[df.index >= n_rows]
+
+    @classmethod
+    def _read_csv_chunks(cls, fp, sep, encoding, chunksize):
+        with pd.read_csv(
+            fp,
+            sep=sep,
+            encoding=encoding,
+            dtype=cls._get_dtype(fp, sep, encoding),
+            chunksize=chunksize,
+        ) as reader:
+            yield from reader
+
+    @classmethod
+    def _get_dtype(cls, fp, sep, encoding):
+        """Data types of the columns of a local CSV file.
+
+        Text columns are read as strings, otherwise the data type of a column can
+        differ between chunks, for example when a chunk contains only numeric DOIs.
+        Pandas infers the data type of the columns in `__numeric_columns__`.
+        """
+        columns = pd.read_csv(fp, sep=sep, encoding=encoding, nrows=0).columns
+        numeric_columns = set(cls.__numeric_columns__)
+        for column in cls.__numeric_columns__:
+            numeric_columns.update(cls.__alternative_column_names__.get(column, []))
+        return {
+            col: str for col in columns if col.lower().strip() not in numeric_columns
+        }
+
+
+def _is_local_file(fp):
+    return isinstance(fp, (str, Path)) and not _is_url(fp) and Path(fp).is_file()
+
+
+def _read_csv_python_engine(fp):
+    """Read a CSV file from a URL or buffer, detecting the delimiter with pandas."""
+    for encoding in ["utf-8", "ISO-8859-1"]:
+        try:
+            if isinstance(fp, io.IOBase):
+                fp.seek(0)
+            return pd.read_csv(fp, sep=None, encoding=encoding, engine="python")
+        except UnicodeDecodeError:
+            # if unicode error, go to next encoding
+            continue
+
+    raise ValueError("The encoding of the file is not supported.")
+
+
+def _detect_encoding(fp, sample_size=2**20):
+    """Get the first encoding that can decode the head of the file.
+
+    Only the first `sample_size` bytes are decoded. A file that is not UTF-8 after
+    the sample raises a UnicodeDecodeError when it is read as UTF-8, after which the
+    readers fall back to ISO-8859-1.
+    """
+    with open(fp, "rb") as f:
+        sample = f.read(sample_size)
+
+    for encoding in ["utf-8", "ISO-8859-1"]:
+        try:
+            # a multibyte character can be cut off at the end of the sample
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+
+    raise ValueError("The encoding of the file is not supported.")
+
+
+def _sniff_delimiter(fp, encoding):
+    """Detect the delimiter from the first non-empty line of the file.
+
+    This is the same line the python engine of pandas uses to detect the delimiter
+    when reading a file with `sep=None`.
+    """
+    with open(fp, encoding=encoding, newline="") as f:
+        for line in f:
+            if line.strip():
+                return csv.Sniffer().sniff(line).delimiter
+
+    raise pd.errors.EmptyDataError("No columns to parse from file")
+
+
+def _iter_csv_chunks(chunks, sep):
+    for i, df in enumerate(chunks):
+        yield df.to_csv(sep=sep, index=True, header=i == 0, date_format=DATE_FORMAT)
+
+
+def _write_csv_chunks(chunks, fp, sep):
+    """Write chunks of data to a CSV file, or return an iterator if fp is None."""
+    if fp is None:
+        return _iter_csv_chunks(chunks, sep)
+
+    # The line endings are already in the text of the chunks.
+    with open(fp, "w", encoding="utf-8", newline="") as f:
+        for text in _iter_csv_chunks(chunks, sep):
+            f.write(text)
 
 
 class CSVWriter:
@@ -82,7 +245,28 @@ class CSVWriter:
         CSV file
             Dataframe of all available record data.
         """
-        return df.to_csv(fp, sep=sep, index=True, date_format="%Y-%m-%d %H:%M:%S")
+        return df.to_csv(fp, sep=sep, index=True, date_format=DATE_FORMAT)
+
+    @classmethod
+    def write_data_chunks(cls, chunks, fp=None, sep=","):
+        """Export dataset in chunks.
+
+        Parameters
+        ----------
+        chunks: Iterable[pandas.DataFrame]
+            Chunks of the record data, with the same columns. The header is written
+            with the first chunk.
+        fp: str, NoneType
+            Filepath or None for an iterator.
+        sep: str
+            Seperator of the file.
+
+        Returns
+        -------
+        Iterator[str]
+            If fp is None, the chunks in CSV format, one string per chunk.
+        """
+        return _write_csv_chunks(chunks, fp, sep)
 
 
 class ExcelReader(BaseReader):
@@ -181,4 +365,25 @@ class TSVWriter:
         TSV file
             Dataframe of all available record data.
         """
-        return df.to_csv(fp, sep=sep, index=True, date_format="%Y-%m-%d %H:%M:%S")
+        return df.to_csv(fp, sep=sep, index=True, date_format=DATE_FORMAT)
+
+    @classmethod
+    def write_data_chunks(cls, chunks, fp=None, sep="\t"):
+        """Export dataset in chunks.
+
+        Parameters
+        ----------
+        chunks: Iterable[pandas.DataFrame]
+            Chunks of the record data, with the same columns. The header is written
+            with the first chunk.
+        fp: str, NoneType
+            Filepath or None for an iterator.
+        sep: str
+            Seperator of the file.
+
+        Returns
+        -------
+        Iterator[str]
+            If fp is None, the chunks in TSV format, one string per chunk.
+        """
+        return _write_csv_chunks(chunks, fp, sep)
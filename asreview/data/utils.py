@@ -3,8 +3,10 @@ import unicodedata
 
 import numpy as np
 import pandas as pd
+import scipy.sparse as sp
 from rispy import LIST_TYPE_TAGS
 from rispy import TAG_KEY_MAPPING
+from scipy.sparse.csgraph import connected_components
 
 # When using a method like `pd.Series.replace` Pandas tries to infer the new data type
 # of the series after the replacement. In the future Pandas only does this if you
@@ -18,6 +20,12 @@ LIST_JOIN_CHAR = ";"
 RIS_LIST_COLUMNS = [TAG_KEY_MAPPING[list_type_tag] for list_type_tag in LIST_TYPE_TAGS]
 PANDAS_CSV_MAX_CELL_LIMIT = 131072
 
+# All ASCII characters except lowercase letters and digits. For ASCII text, deleting
+# these with `bytes.translate` is much faster than a regular expression.
+_NON_ALNUM_ASCII = bytes(
+    i for i in range(128) if not (chr(i).isdigit() or chr(i).islower())
+)
+
 
 def _clean_text(text):
     """Normalize text for duplicate detection.
@@ -32,26 +40,34 @@ def _clean_text(text):
     text = text.lower()
     # Keep only alphanumeric characters (removes punctuation, whitespace,
     # and combining marks left over from NFKD decomposition)
+    if text.isascii():
+        return text.encode("ascii").translate(None, _NON_ALNUM_ASCII).decode("ascii")
     text = re.sub(r"[^a-z0-9]", "", text)
     return text
 
 
 # Matches copyright/license notices that commonly appear at the end of abstracts.
-# Only applied to the last 300 characters to avoid false positives mid-text.
+# Only applied to the last 300 characters to avoid false positives mid-text. The
+# shared word boundary and the lookahead on the first letters are factored out of
+# the alternatives, which makes the search several times faster.
 _COPYRIGHT_RE = re.compile(
-    r"(?:"
     r"©"
-    r"|\bcopyright\b"
-    r"|\ball\s+rights\s+reserved\b"
-    r"|\bpublished\s+by\s+\w"
-    r"|\bcreative\s+commons\b"
-    r"|\bcc\s+by\b"
-    r"|\bcrown\s+copyright\b"
-    r"|\bopen\s+access\s+article\b"
-    r").*",
-    re.IGNORECASE | re.DOTALL,
+    r"|\b(?=[acop])(?:"
+    r"copyright\b"
+    r"|all\s+rights\s+reserved\b"
+    r"|published\s+by\s+\w"
+    r"|creative\s+commons\b"
+    r"|cc\s+by\b"
+    r"|crown\s+copyright\b"
+    r"|open\s+access\s+article\b"
+    r")",
+    re.IGNORECASE,
 )
 
+# Every match of `_COPYRIGHT_RE` contains one of these words. Checking for them is
+# much cheaper than the search, and most abstracts don't contain any of them.
+_COPYRIGHT_WORDS = ("©", "copyright", "rights", "published", "creative", "cc", "open")
+
 
 def _strip_copyright(text):
     """Strip copyright/license notices from the end of an abstract."""
@@ -59,6 +75,9 @@ def _strip_copyright(text):
         return text
     tail_start = max(0, len(text) - 300)
     tail = text[tail_start:]
+    tail_folded = tail.casefold()
+    if not any(word in tail_folded for word in _COPYRIGHT_WORDS):
+        return text
     m = _COPYRIGHT_RE.search(tail)
     if m:
         return text[: tail_start + m.start()].rstrip()
@@ -72,7 +91,7 @@ DEFAULT_EXTRACTORS = (
 )
 
 
-def duplicated(df, pid="doi"):
+def duplicated(df, pid="doi", similarity_threshold=None):
     """Return boolean Series denoting duplicate rows.
 
     Identify duplicates based on titles and abstracts and if available,
@@ -87,6 +106,10 @@ def duplicated(df, pid="doi"):
     pid: string
         Which persistent identifier to use for deduplication.
         Default is 'doi'.
+    similarity_threshold: float
+        If given, rows are also duplicates if the similarity of their titles and
+        abstracts with an earlier row is at least this value, see
+        `identify_near_duplicate_groups`. Default is None.
 
     Returns
     -------
@@ -137,6 +160,14 @@ def duplicated(df, pid="doi"):
     # save boolean series for duplicates based on titles/abstracts
     s_dups_text = (s.duplicated()) & (s.notnull())
 
+    if similarity_threshold is not None:
+        groups = identify_near_duplicate_groups(
+            minhash_signatures(s.fillna("")), similarity_threshold
+        )
+        s_dups_text |= pd.Series(
+            [group_id != index for group_id, index in groups], index=s.index
+        )
+
     # final boolean series for all duplicates
     if s_dups_pid is not None:
         s_dups = s_dups_pid | s_dups_text
@@ -193,17 +224,23 @@ def convert_value_to_int(value):
         )
 
 
+# Mapping of the label values in input data to the included labels.
+INCLUDED_LABEL_MAPPING = {
+    "": None,
+    "0": 0,
+    "1": 1,
+    "yes": 1,
+    "no": 0,
+    "y": 1,
+    "n": 0,
+}
+
+
 def standardize_included_label(value):
     replacement_dict = {
-        "": None,
         pd.NA: None,
         np.nan: None,
-        "0": 0,
-        "1": 1,
-        "yes": 1,
-        "no": 0,
-        "y": 1,
-        "n": 0,
+        **INCLUDED_LABEL_MAPPING,
     }
     if value in replacement_dict:
         return replacement_dict[value]
@@ -211,6 +248,93 @@ def standardize_included_label(value):
         return value
 
 
+def convert_series_to_list(s):
+    """Convert the values of a series to lists.
+
+    Vectorized version of `convert_value_to_list` for series of strings. Other
+    series are converted value by value.
+
+    Parameters
+    ----------
+    s : pd.Series
+        Series to convert.
+
+    Returns
+    -------
+    pd.Series
+        Series of lists.
+    """
+    types = s.map(type)
+    if types.eq(list).all():
+        return s
+
+    missing = s.isna()
+    if not (missing | types.eq(str)).all():
+        return s.apply(convert_value_to_list)
+
+    present = ~missing.to_numpy()
+    values = np.empty(len(s), dtype=object)
+    if present.any():
+        values[present] = s[present].str.split(LIST_JOIN_CHAR).to_numpy()
+    for i in np.flatnonzero(~present):
+        values[i] = []
+    return pd.Series(values, index=s.index, dtype=object)
+
+
+def convert_series_to_int(s):
+    """Convert the values of a series to integers.
+
+    Vectorized version of `convert_value_to_int`. If a value can't be converted, the
+    series is converted value by value to raise the same error.
+
+    Parameters
+    ----------
+    s : pd.Series
+        Series to convert.
+
+    Returns
+    -------
+    pd.Series
+        Series of integers and None for missing values.
+    """
+    missing = s.isna()
+    numbers = pd.to_numeric(s, errors="coerce")
+    invalid = ~missing & (numbers.isna() | (numbers % 1 != 0) | (numbers.abs() > 2**53))
+
+    # `int` only accepts strings of integers, `pd.to_numeric` also accepts floats
+    is_str = s.map(type).eq(str)
+    if is_str.any():
+        invalid |= is_str & ~s.where(is_str, "0").str.fullmatch(r"\s*[+-]?\d+\s*")
+
+    if invalid.any():
+        return s.apply(convert_value_to_int)
+
+    present = ~missing.to_numpy()
+    values = np.full(len(s), None, dtype=object)
+    values[present] = numbers.to_numpy()[present].astype(np.int64).astype(object)
+    return pd.Series(values, index=s.index, dtype=object)
+
+
+def standardize_included_labels(s):
+    """Standardize the included labels of a series.
+
+    Vectorized version of `standardize_included_label`.
+
+    Parameters
+    ----------
+    s : pd.Series
+        Series of labels.
+
+    Returns
+    -------
+    pd.Series
+        Series of standardized labels.
+    """
+    is_label = s.isin(list(INCLUDED_LABEL_MAPPING))
+    labels = s.astype(object).where(~is_label, s.map(INCLUDED_LABEL_MAPPING))
+    return labels.where(s.notna() & labels.notna(), None)
+
+
 def identify_groups(s):
     """
     Identify groups of duplicate values.
@@ -239,7 +363,227 @@ def identify_groups(s):
     return groups
 
 
-def identify_record_groups(records, feature_extractors=DEFAULT_EXTRACTORS):
+# Parameters of the MinHash signatures used for near-duplicate detection. The value
+# EMPTY_SIGNATURE is the signature of a text without shingles.
+DEFAULT_NUM_PERM = 64
+DEFAULT_SHINGLE_SIZE = 5
+EMPTY_SIGNATURE = np.iinfo(np.uint32).max
+
+_UINT64_MAX = np.iinfo(np.uint64).max
+_SHINGLE_PRIME = np.uint64(0x100000001B3)
+_DENSIFY_OFFSET = 0x9E3779B97F4A7C15
+
+
+def _mix64(h):
+    """Finalizer of MurmurHash3, spreads the bits of 64-bit hashes in place."""
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xFF51AFD7ED558CCD)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xC4CEB9FE1A85EC53)
+    h ^= h >> np.uint64(33)
+    return h
+
+
+def minhash_signatures(
+    texts, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE
+):
+    """Compute MinHash signatures of texts.
+
+    The signatures are computed with one permutation hashing: each shingle (a
+    substring of `shingle_size` characters) is hashed once, and the hash is assigned
+    to one of `num_perm` bins. The signature contains the minimum hash of each bin.
+    Empty bins are filled with the value of the next non-empty bin. The fraction of
+    equal values in the signatures of two texts is an estimate of the Jaccard
+    similarity of their shingles.
+
+    Parameters
+    ----------
+    texts : Iterable[str]
+        Texts to compute the signatures of, for example cleaned titles and abstracts.
+    num_perm : int, optional
+        Length of the signatures, should be a power of two. Default is 64.
+    shingle_size : int, optional
+        Number of characters of the shingles. Texts shorter than this consist of a
+        single shingle. Default is 5.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array of shape (n_texts, num_perm) with dtype uint32. All values of the
+        signature of an empty text are equal to `EMPTY_SIGNATURE`.
+    """
+    if num_perm < 1 or num_perm & (num_perm - 1):
+        raise ValueError(f"num_perm should be a power of two, got {num_perm}")
+    if shingle_size < 1:
+        raise ValueError(f"shingle_size should be positive, got {shingle_size}")
+
+    # Compute the signatures in batches to limit the memory usage.
+    texts = list(texts)
+    batch_size = 1000
+    return np.concatenate(
+        [
+            _minhash_signatures_batch(texts[i : i + batch_size], num_perm, shingle_size)
+            for i in range(0, len(texts), batch_size)
+        ]
+        or [np.empty((0, num_perm), dtype=np.uint32)]
+    )
+
+
+def _minhash_signatures_batch(texts, num_perm, shingle_size):
+    encoded = [text.encode("utf-8") for text in texts]
+    lengths = np.array([len(text) for text in encoded], dtype=np.int64)
+    n_texts = len(encoded)
+
+    buffer = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    text_index = np.repeat(np.arange(n_texts), lengths)
+    position = np.arange(len(buffer))
+
+    # Hash the shingle starting at each position. Only the shingles within a text are
+    # kept. A text shorter than the shingle size consists of a single shingle.
+    padded = np.concatenate([buffer, np.zeros(shingle_size, dtype=np.uint64)])
+    hashes = np.zeros(len(buffer), dtype=np.uint64)
+    for offset in range(shingle_size):
+        hashes = hashes * _SHINGLE_PRIME + padded[offset : offset + len(buffer)] + 1
+
+    remaining = ends[text_index] - position
+    is_shingle = (remaining >= shingle_size) | (position == starts[text_index])
+    short = np.flatnonzero(is_shingle & (remaining < shingle_size))
+    short_hashes = np.zeros(len(short), dtype=np.uint64)
+    for offset in range(shingle_size):
+        short_hashes = np.where(
+            offset < remaining[short],
+            short_hashes * _SHINGLE_PRIME + padded[short + offset] + 1,
+            short_hashes,
+        )
+    hashes[short] = short_hashes
+
+    hashes = _mix64(hashes[is_shingle])
+    text_index = text_index[is_shingle]
+
+    # The highest bits of the hash determine the bin.
+    bin_bits = np.uint64(64 - int(num_perm).bit_length() + 1)
+    bins = (hashes >> bin_bits).astype(np.int64) if num_perm > 1 else 0
+    signatures = np.full(n_texts * num_perm, _UINT64_MAX, dtype=np.uint64)
+    np.minimum.at(signatures, text_index * num_perm + bins, hashes)
+    signatures = signatures.reshape(n_texts, num_perm)
+
+    # Densify the signatures by filling each empty bin with the next non-empty bin.
+    empty = signatures == _UINT64_MAX
+    empty &= ~empty.all(axis=1, keepdims=True)
+    shifted = signatures
+    offset = 0
+    while empty.any():
+        offset = (offset + _DENSIFY_OFFSET) % 2**64
+        shifted = np.roll(shifted, -1, axis=1)
+        fill = empty & (shifted != _UINT64_MAX)
+        signatures[fill] = shifted[fill] + np.uint64(offset)
+        empty &= ~fill
+
+    result = (signatures & np.uint64(EMPTY_SIGNATURE)).astype(np.uint32)
+    result[lengths == 0] = EMPTY_SIGNATURE
+    return result
+
+
+def _get_lsh_parameters(threshold, num_perm):
+    """Get the number of bands and rows of the LSH index for a similarity threshold.
+
+    The probability that two signatures with similarity s share a band is
+    1 - (1 - s^rows)^bands. The number of bands and rows are chosen to minimize the
+    weighted sum of the probability of a false positive (s < threshold) and a false
+    negative (s >= threshold). Since false positives are removed by comparing the
+    signatures, false negatives get a higher weight.
+    """
+    s = np.linspace(0, 1, 1001)
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        p = 1 - (1 - s**rows) ** bands
+        error = np.mean(np.where(s < threshold, 0.25 * p, 0.75 * (1 - p)))
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+def identify_near_duplicate_groups(signatures, threshold=0.8, groups=None):
+    """Identify groups of near-duplicate items from their MinHash signatures.
+
+    Candidate pairs are found with locality-sensitive hashing: the signatures are
+    split in bands, and items with an identical band are compared. Candidate pairs
+    with an estimated Jaccard similarity of at least `threshold` are near-duplicates.
+    Items are in the same group if they are connected by near-duplicate pairs.
+
+    Parameters
+    ----------
+    signatures : numpy.ndarray
+        MinHash signatures of the items, see `minhash_signatures`. Items with an
+        empty signature are never near-duplicates.
+    threshold : float, optional
+        Minimal estimated Jaccard similarity of near-duplicate items. Default is 0.8.
+    groups : list[tuple[int, int]], optional
+        Groups that should be merged with the near-duplicate groups, in the format
+        of the output of `identify_groups`. Default is None.
+
+    Returns
+    -------
+    list[tuple[int, int]]
+        A list where each element corresponds to an item and is a tuple:
+        (smallest_index_in_group, current_index).
+    """
+    if not 0 < threshold <= 1:
+        raise ValueError(f"threshold should be in (0, 1], got {threshold}")
+
+    n_items, num_perm = signatures.shape
+    bands, rows = _get_lsh_parameters(threshold, num_perm)
+    index = np.flatnonzero((signatures != EMPTY_SIGNATURE).any(axis=1))
+
+    # For each band, pair each item with the first item with the same band.
+    candidates = []
+    for band in range(bands):
+        keys = np.zeros(len(index), dtype=np.uint64)
+        for row in range(band * rows, (band + 1) * rows):
+            keys = keys * _SHINGLE_PRIME + signatures[index, row]
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        is_first = np.r_[True, keys[1:] != keys[:-1]]
+        first = order[
+            np.maximum.accumulate(np.where(is_first, np.arange(len(keys)), 0))
+        ]
+        candidates.append(index[first[~is_first]] * n_items + index[order[~is_first]])
+    candidates = np.unique(np.concatenate(candidates)) if candidates else []
+    left, right = np.divmod(candidates, n_items)
+
+    # Keep the candidate pairs with an estimated similarity above the threshold.
+    is_similar = np.zeros(len(left), dtype=bool)
+    batch_size = max(1, 2**24 // num_perm)
+    for i in range(0, len(left), batch_size):
+        batch = slice(i, i + batch_size)
+        is_similar[batch] = (
+            np.mean(signatures[left[batch]] == signatures[right[batch]], axis=1)
+            >= threshold
+        )
+    left, right = left[is_similar], right[is_similar]
+
+    if groups:
+        group_left, group_right = np.array(groups, dtype=np.int64).T
+        left = np.concatenate([left, group_left])
+        right = np.concatenate([right, group_right])
+
+    graph = sp.coo_matrix(
+        (np.ones(len(left), dtype=np.int8), (left, right)), shape=(n_items, n_items)
+    )
+    _, labels = connected_components(graph, directed=False)
+    roots = np.full(labels.max() + 1 if n_items else 0, n_items)
+    np.minimum.at(roots, labels, np.arange(n_items))
+    return list(zip(roots[labels].tolist(), range(n_items)))
+
+
+def identify_record_groups(
+    records, feature_extractors=DEFAULT_EXTRACTORS, similarity_threshold=None
+):
     """Identify groups of duplicate records.
 
     Parameters
@@ -248,21 +592,29 @@ def identify_record_groups(records, feature_extractors=DEFAULT_EXTRACTORS):
         Records in which to identify groups.
     feature_extractors : Sequence[Callable[[Record], Hashable], optional
         List of functions that extract a feature from a record.
+    similarity_threshold : float, optional
+        If given, records are also grouped if the MinHash estimate of the Jaccard
+        similarity of their concatenated features is at least this value, see
+        `identify_near_duplicate_groups`. Default is None.
 
     Returns
     -------
     list[tuple[int, int]]
         A list of tuples `(group_id, record_id)`, where two records get the same value
-        for `group_id` if they have identical features.
+        for `group_id` if they have identical (or similar) features.
     """
-    groups = identify_groups(
-        map(
-            lambda record: tuple(
-                feature_extractor(record) for feature_extractor in feature_extractors
-            ),
-            records,
+    features = [
+        tuple(feature_extractor(record) for feature_extractor in feature_extractors)
+        for record in records
+    ]
+    groups = identify_groups(features)
+    if similarity_threshold is not None:
+        signatures = minhash_signatures(
+            "".join(map(str, record_features)) for record_features in features
+        )
+        groups = identify_near_duplicate_groups(
+            signatures, similarity_threshold, groups=groups
         )
-    )
     index_to_id = [record.record_id for record in records]
     return [
         (index_to_id[group_id], index_to_id[record_id])
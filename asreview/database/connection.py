@@ -0,0 +1,201 @@
+"""Connections to the SQLite database of a project.
+
+All `DataStore` and `Database` objects of the same database file share a bounded pool
+of SQLite connections, instead of opening and closing a connection for every query.
+Each connection is configured with the pragmas in `DEFAULT_PRAGMAS` when it is opened:
+the database uses write-ahead logging, so readers don't block the writer and the
+writer doesn't block readers.
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import NullPool
+from sqlalchemy import QueuePool
+from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy.exc import DisconnectionError
+
+from asreview.database import snapshot
+
+# Pragmas applied to every new connection. The journal mode is stored in the database
+# file, the other pragmas only apply to the connection.
+# See: https://www.sqlite.org/pragma.html
+DEFAULT_PRAGMAS = {
+    # Readers and the writer don't block each other.
+    "journal_mode": "WAL",
+    # In WAL mode, a commit doesn't wait for the disk. A power loss can roll back the
+    # last transactions, but can't corrupt the database.
+    "synchronous": "NORMAL",
+    # Cache of 64 MiB per connection (negative values are in KiB).
+    "cache_size": -65536,
+    # Read the first 256 MiB of the database file via a memory map.
+    "mmap_size": 268435456,
+}
+
+# Pragmas that can't be applied to in-memory or read-only databases.
+_FILE_ONLY_PRAGMAS = {"journal_mode", "mmap_size"}
+_WRITE_ONLY_PRAGMAS = {"journal_mode"}
+
+# Number of idle connections kept open per database file.
+POOL_SIZE = 5
+# Number of connections that can be opened on top of the pool size.
+MAX_OVERFLOW = 20
+# Number of seconds to wait for a connection if all connections are in use.
+POOL_TIMEOUT = 30
+# Number of database files with a connection pool. The pool of the least recently used
+# database is closed when this number is exceeded.
+MAX_POOLS = 16
+
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def _get_file_id(fp):
+    """Get an identifier of the file at the file path, or None if there is no file."""
+    try:
+        stat = os.stat(fp)
+    except OSError:
+        return None
+    return stat.st_dev, stat.st_ino
+
+
+def _connect(conn_uri, pragmas, in_memory=False, read_only=False):
+    """Open a SQLite connection and apply the pragmas.
+
+    Parameters
+    ----------
+    conn_uri : str
+        SQLite connection URI, see `asreview.database.store._build_conn_uri`.
+    pragmas : dict
+        Mapping {pragma name: value}.
+    in_memory : bool, optional
+        Whether the database is an in-memory database.
+    read_only : bool, optional
+        Whether the database is opened in read only mode.
+
+    Returns
+    -------
+    sqlite3.Connection
+        Connection to the SQLite database.
+    """
+    # The connection is created by one thread and can be used by another thread after
+    # it is returned to the pool. It is never used by two threads at the same time.
+    conn = sqlite3.connect(conn_uri, uri=True, check_same_thread=False)
+    for name, value in pragmas.items():
+        if in_memory and name in _FILE_ONLY_PRAGMAS:
+            continue
+        if read_only and name in _WRITE_ONLY_PRAGMAS:
+            continue
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def _create_engine(conn_uri, fp, pragmas, in_memory=False, read_only=False):
+    def creator():
+        return _connect(conn_uri, pragmas, in_memory=in_memory, read_only=read_only)
+
+    if in_memory:
+        # In-memory databases are owned by a single object, which disposes the engine
+        # when it is closed.
+        return create_engine("sqlite://", creator=creator, poolclass=NullPool)
+
+    engine = create_engine(
+        "sqlite://",
+        creator=creator,
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        pool_timeout=POOL_TIMEOUT,
+        # reuse the most recently used connection, which has the warmest page cache
+        pool_use_lifo=True,
+    )
+
+    # A pooled connection keeps pointing to the old file if the database file is
+    # removed without calling `dispose` first, for example when a project is deleted
+    # and imported again. Such connections are closed when they are taken from the
+    # pool.
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        connection_record.info["file_id"] = _get_file_id(fp)
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if connection_record.info.get("file_id") != _get_file_id(fp):
+            raise DisconnectionError("The database file has changed")
+
+    return engine
+
+
+def get_engine(conn_uri, fp, pragmas=None, in_memory=False, read_only=False):
+    """Get the SQLAlchemy engine of a database.
+
+    Engines of database files are shared: the same connection URI and pragmas give the
+    same engine and thus the same connection pool.
+
+    Parameters
+    ----------
+    conn_uri : str
+        SQLite connection URI, see `asreview.database.store._build_conn_uri`.
+    fp : str | Path
+        Location of the database file.
+    pragmas : dict, optional
+        Pragmas to apply to new connections. Values are added to or override the values
+        in `DEFAULT_PRAGMAS`. Default is None.
+    in_memory : bool, optional
+        Whether the database is an in-memory database. In-memory databases get an
+        engine without connection pool, which is not shared.
+    read_only : bool, optional
+        Whether the database is opened in read only mode.
+
+    Returns
+    -------
+    sqlalchemy.engine.Engine
+        The engine of the database.
+    """
+    pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+
+    if in_memory:
+        return _create_engine(conn_uri, fp, pragmas, in_memory=True)
+
+    key = (conn_uri, tuple(sorted(pragmas.items())))
+    with _engines_lock:
+        if key in _engines:
+            _engines.move_to_end(key)
+            return _engines[key][1]
+
+        engine = _create_engine(conn_uri, fp, pragmas, read_only=read_only)
+        _engines[key] = (os.path.abspath(fp), engine)
+
+        while len(_engines) > MAX_POOLS:
+            # Connections that are in use stay open until they are returned.
+            _, (_, old_engine) = _engines.popitem(last=False)
+            old_engine.dispose()
+
+    return engine
+
+
+def dispose(fp=None):
+    """Close the pooled connections to a database file.
+
+    Close the connections before removing or moving a database file, for example when
+    a project is deleted. Connections that are in use are closed when they are
+    returned. The column snapshots of the database file are discarded as well, see
+    `asreview.database.snapshot`.
+
+    Parameters
+    ----------
+    fp : str | Path, optional
+        Location of the database file, or of a directory containing database files.
+        If None, the connections to all database files are closed. Default is None.
+    """
+    snapshot.clear(fp)
+    fp = None if fp is None else os.path.abspath(fp)
+
+    with _engines_lock:
+        for key, (engine_fp, engine) in list(_engines.items()):
+            if fp is None or engine_fp == fp or engine_fp.startswith(fp + os.sep):
+                del _engines[key]
+                engine.dispose()
@@ -1,17 +1,20 @@
+import itertools
 import json
 import sqlite3
 import time
 from functools import cached_property
 
+import numpy as np
 import pandas as pd
 
 from asreview.data.record import Record
+from asreview.database.store import RECORD_VERSION_TABLE
 from asreview.database.store import DataStore
 from asreview.database.store import _build_conn_uri
 
 __all__ = ["Database"]
 
-CURRENT_DATABASE_VERSION = 3
+CURRENT_DATABASE_VERSION = 5
 
 MODEL_COLUMNS = [
     "classifier",
@@ -41,6 +44,32 @@ RESULTS_TABLE_COLUMNS_PANDAS_DTYPES = {
     "user_id": "Int64",
 }
 
+# Secondary indexes of the results tables, {index name: (table, column, unique)}.
+RESULTS_INDEXES = {
+    "idx_last_ranking_record_id": ("last_ranking", "record_id", True),
+    "idx_last_ranking_ranking": ("last_ranking", "ranking", False),
+    "idx_results_label": ("results", "label", False),
+    "idx_results_querier": ("results", "querier", False),
+}
+
+# In-place upgrades of the database schema, {version: method upgrading the database
+# to the next version}. Older databases are upgraded by the project migration, see
+# `asreview.project.migration`.
+SCHEMA_UPGRADES = {
+    3: "_upgrade_v3_v4",
+    4: "_upgrade_v4_v5",
+}
+
+# Counts of the results table kept in the results_stats table, {column: condition on a
+# row of the results table}. Only the base records of the groups are counted.
+RESULTS_STATS_COUNTS = {
+    "n_included": "{row}.querier IS NOT NULL AND {row}.label IS 1",
+    "n_excluded": "{row}.querier IS NOT NULL AND {row}.label IS 0",
+    "n_prior_included": "{row}.querier IS NULL AND {row}.label IS 1",
+    "n_prior_excluded": "{row}.querier IS NULL AND {row}.label IS 0",
+    "n_pending": "{row}.label IS NULL",
+}
+
 RANKING_TABLE_COLUMNS_PANDAS_DTYPES = {
     "record_id": "Int64",
     "ranking": "Int64",
@@ -109,7 +138,7 @@ class Database:
         Return the version number of the database.
     """
 
-    def __init__(self, fp=":memory:", record_cls=Record, read_only=False):
+    def __init__(self, fp=":memory:", record_cls=Record, read_only=False, pragmas=None):
         """Initialize the Database.
 
         Parameters
@@ -122,6 +151,10 @@ class Database:
             Whether to open the database in read only mode. If the database is opened in
             read only mode and an attempt to write to the database is made, an
             `sqlite3.OperationalError` will be raised.
+        pragmas : dict, optional
+            SQLite pragmas to apply to new connections, in addition to or instead of
+            the values in `asreview.database.connection.DEFAULT_PRAGMAS`. Default is
+            None.
         """
         if fp == ":memory:" and read_only:
             raise ValueError("Can't open an in-memory database in read only mode")
@@ -134,7 +167,11 @@ class Database:
         self._conn_uri = _build_conn_uri(fp, read_only)
 
         self.input = DataStore(
-            conn_uri=self._conn_uri, record_cls=record_cls, read_only=read_only
+            fp,
+            conn_uri=self._conn_uri,
+            record_cls=record_cls,
+            read_only=read_only,
+            pragmas=pragmas,
         )
 
         if self._in_memory:
@@ -143,6 +180,8 @@ class Database:
             # This connection acts as an anchor that keeps the database alive
             # for the lifetime of this object.
             self._conn
+        elif not read_only:
+            self._upgrade()
 
     def __enter__(self):
         return self
@@ -153,16 +192,23 @@ class Database:
     def __del__(self):
         self.close()
 
+    @cached_property
+    def _pool_conn(self):
+        return self.input.engine.raw_connection()
+
     @cached_property
     def _conn(self):
         """Get a connection to the SQLite database.
 
+        The connection is taken from the connection pool of the database and returned
+        to the pool when the database is closed.
+
         Returns
         -------
         sqlite3.Connection
             Connection to the SQLite database.
         """
-        return sqlite3.connect(self._conn_uri, uri=True)
+        return self._pool_conn.driver_connection
 
     def close(self):
         """Close the database and release all resources.
@@ -173,10 +219,37 @@ class Database:
         if self._closed:
             return
         self._closed = True
-        self.input.engine.dispose()
-        if "_conn" in self.__dict__:
-            self._conn.close()
-            del self.__dict__["_conn"]
+        if "_pool_conn" in self.__dict__:
+            self._pool_conn.close()
+            del self.__dict__["_pool_conn"]
+            self.__dict__.pop("_conn", None)
+        if self._in_memory:
+            self.input.engine.dispose()
+
+    def checkpoint(self):
+        """Write the changes in the write-ahead log to the database file.
+
+        Call this method before copying the database file, so that the copy contains
+        all data. The write-ahead log file is emptied.
+        """
+        self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def backup(self, fp):
+        """Copy the database to a file with the online backup of SQLite.
+
+        The copy is a consistent snapshot of the database, including the changes in
+        the write-ahead log. The database can be read and written while it is copied.
+
+        Parameters
+        ----------
+        fp : str | Path
+            Path of the copy. An existing database at this path is overwritten.
+        """
+        target = sqlite3.connect(fp)
+        try:
+            self._conn.backup(target)
+        finally:
+            target.close()
 
     @property
     def user_version(self):
@@ -214,17 +287,7 @@ class Database:
                             user_id INTEGER)"""
         )
 
-        cur.execute(
-            """CREATE TABLE last_ranking
-                            (record_id INTEGER UNIQUE,
-                            ranking INT,
-                            classifier TEXT,
-                            querier TEXT,
-                            balancer TEXT,
-                            feature_extractor TEXT,
-                            training_set INTEGER,
-                            time FLOAT)"""
-        )
+        self._create_last_ranking_table(cur)
 
         cur.execute(
             """CREATE TABLE decision_changes
@@ -234,12 +297,64 @@ class Database:
                             user_id INTEGER)"""
         )
 
+        self._create_indexes(cur)
         self._conn.commit()
 
         self._set_results_changes_triggers()
+        self._create_results_stats()
+
+    def _create_last_ranking_table(self, cur, table="last_ranking"):
+        cur.execute(
+            f"""CREATE TABLE {table}
+                            (record_id INTEGER,
+                            ranking INT,
+                            classifier TEXT,
+                            querier TEXT,
+                            balancer TEXT,
+                            feature_extractor TEXT,
+                            training_set INTEGER,
+                            time FLOAT)"""
+        )
+
+    def _create_indexes(self, cur):
+        for name, (table, column, unique) in RESULTS_INDEXES.items():
+            cur.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+                f"ON {table} ({column})"
+            )
+
+    def _upgrade(self):
+        """Upgrade the schema of the database to the current version.
+
+        Databases without tables (user version 0) and databases that are already at
+        the current version are left as they are.
+        """
+        while (version := self.user_version) in SCHEMA_UPGRADES:
+            getattr(self, SCHEMA_UPGRADES[version])()
+            self.user_version = version + 1
+
+    def _upgrade_v3_v4(self):
+        """Add the indexes of the results tables.
+
+        Replacing the last ranking with `pandas.DataFrame.to_sql` dropped the
+        constraints of the last_ranking table, so the table is created again.
+        """
+        columns = ", ".join(RANKING_TABLE_COLUMNS_PANDAS_DTYPES)
+        self._replace_last_ranking(
+            self._conn.execute(
+                f"SELECT {columns} FROM last_ranking ORDER BY ranking"
+            ).fetchall()
+        )
+
+    def _upgrade_v4_v5(self):
+        """Add the results_stats table and its triggers."""
+        self._create_results_stats()
 
     def _is_valid(self):
-        if self.user_version != CURRENT_DATABASE_VERSION:
+        if (
+            self.user_version != CURRENT_DATABASE_VERSION
+            and self.user_version not in SCHEMA_UPGRADES
+        ):
             raise ValueError(
                 f"Database version {self.user_version} is not supported. "
                 "See migration guide."
@@ -318,10 +433,180 @@ class Database:
         """)
         con.commit()
 
+    def _create_results_stats(self):
+        """Create the results_stats table and the triggers that keep it up to date.
+
+        The table has a single row with the counts in `RESULTS_STATS_COUNTS`, which
+        the triggers update on each change of the results table. The row also holds
+        the version of the records it was computed for: if the groups of the records
+        change, the counts are computed again by `get_results_stats`.
+        """
+        columns = ", ".join(f"{col} INTEGER" for col in RESULTS_STATS_COUNTS)
+        is_base_new = self._is_group_base_sql("NEW")
+
+        def delta(sign, row):
+            return ", ".join(
+                f"{col} = {col} {sign} ({cond.format(row=row)})"
+                for col, cond in RESULTS_STATS_COUNTS.items()
+            )
+
+        update = ", ".join(
+            f"{col} = {col} + ({cond.format(row='NEW')}) - ({cond.format(row='OLD')})"
+            for col, cond in RESULTS_STATS_COUNTS.items()
+        )
+
+        with self._conn as con:
+            con.execute(
+                f"CREATE TABLE IF NOT EXISTS results_stats "
+                f"(record_version TEXT, {columns})"
+            )
+            con.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_results_stats_insert
+                AFTER INSERT ON results
+                FOR EACH ROW
+                WHEN {is_base_new}
+                BEGIN
+                    UPDATE results_stats SET {delta("+", "NEW")};
+                END
+            """)
+            con.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_results_stats_update
+                AFTER UPDATE OF label, querier ON results
+                FOR EACH ROW
+                WHEN {is_base_new}
+                BEGIN
+                    UPDATE results_stats SET {update};
+                END
+            """)
+            con.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_results_stats_delete
+                AFTER DELETE ON results
+                FOR EACH ROW
+                WHEN {self._is_group_base_sql("OLD")}
+                BEGIN
+                    UPDATE results_stats SET {delta("-", "OLD")};
+                END
+            """)
+
+    def _get_record_version(self):
+        try:
+            row = self._conn.execute(
+                f"SELECT version FROM {RECORD_VERSION_TABLE}"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return None if row is None else row[0]
+
+    def _count_results_stats(self):
+        """Count the results in `RESULTS_STATS_COUNTS` with a scan of the results."""
+        counts = ", ".join(
+            f"COALESCE(SUM({cond.format(row='results')}), 0)"
+            for cond in RESULTS_STATS_COUNTS.values()
+        )
+        return self._conn.execute(
+            f"SELECT {counts} FROM results WHERE {self._is_group_base_sql('results')}"
+        ).fetchone()
+
+    def _refresh_results_stats(self, record_version):
+        """Compute the counts of the results_stats table again.
+
+        Returns
+        -------
+        tuple
+            The counts in `RESULTS_STATS_COUNTS`.
+        """
+        if self.read_only:
+            return self._count_results_stats()
+
+        placeholders = ", ".join("?" * (len(RESULTS_STATS_COUNTS) + 1))
+        with self._conn as con:
+            # Block writers, so that no result is added while counting.
+            con.execute("BEGIN IMMEDIATE")
+            counts = self._count_results_stats()
+            con.execute("DELETE FROM results_stats")
+            con.execute(
+                f"INSERT INTO results_stats VALUES ({placeholders})",
+                (record_version, *counts),
+            )
+        return counts
+
+    def get_results_stats(self):
+        """Get the numbers of labeling decisions.
+
+        The counts are kept up to date in the results_stats table, so they don't
+        depend on the size of the results table. Only the base record of each group
+        is counted, like in `get_results_table`.
+
+        Returns
+        -------
+        dict
+            Dictionary with the following counts:
+
+            - n_included, n_excluded: records labeled as relevant or irrelevant,
+              without the priors.
+            - n_prior_included, n_prior_excluded: priors labeled as relevant or
+              irrelevant.
+            - n_pending: pending records.
+            - n_since_last_relevant: records labeled as irrelevant since the last
+              record labeled as relevant, without the priors. If no record is labeled
+              as relevant, all records labeled as irrelevant are counted.
+        """
+        record_version = self._get_record_version()
+        columns = ", ".join(RESULTS_STATS_COUNTS)
+
+        try:
+            row = self._conn.execute(
+                f"SELECT record_version, {columns} FROM results_stats"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            # database without results_stats table, opened in read only mode
+            counts = self._count_results_stats()
+        else:
+            if row is None or row[0] != record_version:
+                counts = self._refresh_results_stats(record_version)
+            else:
+                counts = row[1:]
+
+        stats = dict(zip(RESULTS_STATS_COUNTS, map(int, counts)))
+
+        def is_labeled(table, label):
+            return (
+                f"{table}.querier IS NOT NULL AND {table}.label = {label} "
+                f"AND {self._is_group_base_sql(table)}"
+            )
+
+        # The index on the label is ordered by rowid, so only the records labeled
+        # since the last relevant record are read.
+        stats["n_since_last_relevant"] = self._conn.execute(
+            f"""SELECT COUNT(*) FROM results
+            WHERE {is_labeled("results", 0)}
+            AND rowid > COALESCE((
+                SELECT rowid FROM results AS last_relevant
+                WHERE {is_labeled("last_relevant", 1)}
+                ORDER BY rowid DESC
+                LIMIT 1
+            ), 0)"""
+        ).fetchone()[0]
+
+        return stats
+
     @property
     def record_table_name(self):
         return self.input.record_cls.__tablename__
 
+    def _is_group_base_sql(self, table):
+        """SQL condition that the record of a row is the base record of its group.
+
+        The base record of a group is not a duplicate of another record. The condition
+        looks up the record by its primary key, instead of scanning the record table
+        for all group ids.
+        """
+        return f"""EXISTS (
+            SELECT 1 FROM {self.record_table_name} AS group_record
+            WHERE group_record.record_id = {table}.record_id
+            AND group_record.duplicate_of IS NULL
+        )"""
+
     @property
     def exist_new_labeled_records(self):
         """Return True if there are new labeled records.
@@ -352,6 +637,89 @@ class Database:
 
         results.to_sql("results", self._conn, if_exists="append", index=False)
 
+    def _add_checkpoint(self, results, state):
+        """Append results and store the state of a simulation.
+
+        The results are appended to the results table and the state replaces the
+        previous state of the simulation in a single transaction, so the cost of
+        a checkpoint depends on the number of new results only.
+
+        Parameters
+        ----------
+        results: pd.DataFrame
+            The new results since the previous checkpoint.
+        state: bytes
+            The serialized state of the simulation.
+        """
+        columns = list(RESULTS_TABLE_COLUMNS_PANDAS_DTYPES)
+        if not set(results.columns) == set(columns):
+            raise ValueError(f"Columns of the results dataframe should be {columns}.")
+
+        rows = results[columns].astype(object)
+        rows = rows.where(rows.notna(), None).itertuples(index=False, name=None)
+
+        with self._conn as con:
+            con.execute(
+                """CREATE TABLE IF NOT EXISTS simulation_checkpoint
+                                (n_results INTEGER,
+                                state BLOB,
+                                time FLOAT)"""
+            )
+            con.executemany(
+                f"INSERT INTO results ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                rows,
+            )
+            con.execute("DELETE FROM simulation_checkpoint")
+            con.execute(
+                "INSERT INTO simulation_checkpoint VALUES (?, ?, ?)",
+                (
+                    con.execute("SELECT COUNT(*) FROM results").fetchone()[0],
+                    state,
+                    time.time(),
+                ),
+            )
+
+    def _get_checkpoint(self):
+        """Get the results and state of the last checkpoint of a simulation.
+
+        Returns
+        -------
+        tuple[pd.DataFrame, bytes] | None
+            The results table and the serialized state of the simulation, or None
+            if there is no checkpoint.
+        """
+        cur = self._conn.cursor()
+        table = cur.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE type='table' AND name='simulation_checkpoint'"
+        ).fetchone()
+        if table is None:
+            return None
+
+        checkpoint = cur.execute(
+            "SELECT n_results, state FROM simulation_checkpoint"
+        ).fetchone()
+        if checkpoint is None:
+            return None
+
+        results = pd.read_sql_query(
+            "SELECT * FROM results ORDER BY rowid",
+            self._conn,
+            dtype=RESULTS_TABLE_COLUMNS_PANDAS_DTYPES,
+        )
+        if len(results) != checkpoint[0]:
+            raise ValueError(
+                "The results table does not match the simulation checkpoint."
+            )
+
+        return results, checkpoint[1]
+
+    def _delete_checkpoint(self):
+        """Remove the checkpoint of a simulation."""
+        with self._conn as con:
+            con.execute("DROP TABLE IF EXISTS simulation_checkpoint")
+
     def _replace_last_ranking_from_df(self, last_ranking):
         if not set(last_ranking.columns) == set(RANKING_TABLE_COLUMNS_PANDAS_DTYPES):
             raise ValueError(
@@ -359,10 +727,61 @@ class Database:
                 f"{list(RANKING_TABLE_COLUMNS_PANDAS_DTYPES.keys())}."
             )
 
-        last_ranking.to_sql(
-            "last_ranking", self._conn, if_exists="replace", index=False
+        columns = list(RANKING_TABLE_COLUMNS_PANDAS_DTYPES)
+        rows = last_ranking[columns].astype(object)
+        self._replace_last_ranking(
+            rows.where(rows.notna(), None).itertuples(index=False, name=None)
         )
 
+    def _replace_last_ranking(self, rows):
+        """Replace the rows of the last_ranking table.
+
+        The rows are first written to a temporary table, which doesn't lock the
+        database. A single transaction then copies the rows to a new last_ranking
+        table, drops the old table and builds the indexes. Bulk copying and building
+        the indexes afterwards is much faster than inserting the rows one by one into
+        an indexed table, so other connections wait for the write lock only briefly.
+        Readers see either the old or the new ranking.
+
+        Parameters
+        ----------
+        rows: iterable[tuple]
+            The rows of the new ranking in ranking order, with a value for each
+            column in `RANKING_TABLE_COLUMNS_PANDAS_DTYPES`.
+        """
+        columns = ", ".join(RANKING_TABLE_COLUMNS_PANDAS_DTYPES)
+        placeholders = ", ".join("?" * len(RANKING_TABLE_COLUMNS_PANDAS_DTYPES))
+
+        con = self._conn
+        try:
+            con.execute("DROP TABLE IF EXISTS temp.last_ranking_shadow")
+            self._create_last_ranking_table(con.cursor(), "temp.last_ranking_shadow")
+            with con:
+                con.executemany(
+                    f"INSERT INTO temp.last_ranking_shadow ({columns}) "
+                    f"VALUES ({placeholders})",
+                    rows,
+                )
+
+            # Python's sqlite3 doesn't start a transaction for DDL statements
+            with con:
+                con.execute("BEGIN IMMEDIATE")
+                con.execute("DROP TABLE IF EXISTS main.last_ranking_shadow")
+                self._create_last_ranking_table(
+                    con.cursor(), "main.last_ranking_shadow"
+                )
+                con.execute(
+                    f"INSERT INTO main.last_ranking_shadow ({columns}) "
+                    f"SELECT {columns} FROM temp.last_ranking_shadow ORDER BY rowid"
+                )
+                con.execute("DROP TABLE main.last_ranking")
+                con.execute(
+                    "ALTER TABLE main.last_ranking_shadow RENAME TO last_ranking"
+                )
+                self._create_indexes(con.cursor())
+        finally:
+            con.execute("DROP TABLE IF EXISTS temp.last_ranking_shadow")
+
     def add_last_ranking(
         self,
         ranked_record_ids,
@@ -393,18 +812,20 @@ class Database:
             Number of labeled records available at the time of training.
         """
 
-        pd.DataFrame(
-            {
-                "record_id": ranked_record_ids,
-                "ranking": range(len(ranked_record_ids)),
-                "classifier": classifier,
-                "querier": querier,
-                "balancer": balancer,
-                "feature_extractor": feature_extractor,
-                "training_set": training_set,
-                "time": time.time(),
-            }
-        ).to_sql("last_ranking", self._conn, if_exists="replace", index=False)
+        record_ids = np.asarray(ranked_record_ids, dtype=np.int64).tolist()
+        training_set = None if training_set is None else int(training_set)
+        self._replace_last_ranking(
+            zip(
+                record_ids,
+                range(len(record_ids)),
+                itertools.repeat(classifier),
+                itertools.repeat(querier),
+                itertools.repeat(balancer),
+                itertools.repeat(feature_extractor),
+                itertools.repeat(training_set),
+                itertools.repeat(time.time()),
+            )
+        )
 
     def get_last_ranking_table(self):
         """Get the ranking from the state.
@@ -654,9 +1075,7 @@ class Database:
             if not pending:
                 sql_where.append("label is not NULL")
             if not groups:
-                sql_where.append(
-                    f"record_id IN ( SELECT group_id FROM {self.record_table_name})"
-                )
+                sql_where.append(self._is_group_base_sql("results"))
             sql_where_str = "WHERE " + " AND ".join(sql_where)
         else:
             sql_where_str = ""
@@ -681,6 +1100,99 @@ class Database:
             df_results["tags"] = df_results["tags"].map(json.loads, na_action="ignore")
         return df_results
 
+    def get_labeled_results(
+        self,
+        label=None,
+        priors_only=False,
+        has_note=False,
+        latest_first=False,
+        limit=None,
+        offset=0,
+        after=None,
+    ):
+        """Get a page of the labeled records from the results table.
+
+        Only the base record of each group is returned, like in `get_results_table`.
+
+        Parameters
+        ----------
+        label: int, optional
+            Only return the records with this label. By default, all labeled records
+            are returned.
+        priors_only: bool
+            Only return the records containing the prior knowledge.
+        has_note: bool
+            Only return the records with a note.
+        latest_first: bool
+            Return the records in reverse labeling order.
+        limit: int, optional
+            Maximum number of records to return. By default, all records are
+            returned.
+        offset: int
+            Number of records to skip.
+        after: int, optional
+            Only return the records after this position, in the order of the
+            records. Pass the last position of a page to get the next page, which
+            doesn't skip the records of the previous pages one by one like `offset`.
+
+        Returns
+        -------
+        tuple[pd.DataFrame, int]
+            Dataframe with the results on the page, with their position in the
+            results table as index, and the total number of records matching the
+            filters.
+        """
+        sql_where = [
+            "label IS NOT NULL" if label is None else "label = :label",
+            self._is_group_base_sql("results"),
+        ]
+        if priors_only:
+            sql_where.append("querier IS NULL")
+        if has_note:
+            sql_where.append("note IS NOT NULL")
+        sql_where_str = " AND ".join(sql_where)
+
+        sql_page_str = sql_where_str
+        if after is not None:
+            sql_page_str += f" AND rowid {'<' if latest_first else '>'} :after"
+
+        df_results = pd.read_sql_query(
+            f"""SELECT rowid AS position, * FROM results
+            WHERE {sql_page_str}
+            ORDER BY rowid {"DESC" if latest_first else "ASC"}
+            LIMIT :limit OFFSET :offset""",
+            self._conn,
+            params={
+                "label": label,
+                "after": None if after is None else int(after),
+                "limit": -1 if limit is None else limit,
+                "offset": offset,
+            },
+            index_col="position",
+            dtype=RESULTS_TABLE_COLUMNS_PANDAS_DTYPES,
+        )
+        df_results["tags"] = df_results["tags"].map(json.loads, na_action="ignore")
+
+        if limit is None and offset == 0 and after is None:
+            return df_results, len(df_results)
+
+        if has_note:
+            count = self._conn.execute(
+                f"SELECT COUNT(*) FROM results WHERE {sql_where_str}",
+                {"label": label},
+            ).fetchone()[0]
+        else:
+            # count the records with the counts of get_results_stats
+            names = {1: "included", 0: "excluded"}
+            names = names.values() if label is None else [names[label]]
+
+            stats = self.get_results_stats()
+            count = sum(stats[f"n_prior_{name}"] for name in names)
+            if not priors_only:
+                count += sum(stats[f"n_{name}"] for name in names)
+
+        return df_results, count
+
     def get_priors(self):
         """Get the record ids of the priors.
 
@@ -696,9 +1208,7 @@ class Database:
             SELECT * FROM results
             WHERE results.querier is NULL
             AND results.label is not NULL
-            AND record_id IN (
-                SELECT group_id FROM {self.record_table_name}
-            )
+            AND {self._is_group_base_sql("results")}
             ORDER BY rowid
             """,
             self._conn,
@@ -723,11 +1233,11 @@ class Database:
         return pd.read_sql_query(
             f"""SELECT record_id, last_ranking.ranking
                 FROM last_ranking
+                JOIN {self.record_table_name} USING (record_id)
                 LEFT JOIN results
                 USING (record_id)
-                WHERE results.record_id is null AND last_ranking.record_id IN (
-                    SELECT group_id FROM {self.record_table_name}
-                )
+                WHERE results.record_id is null
+                AND {self.record_table_name}.duplicate_of IS NULL
                 ORDER BY ranking
                 """,
             self._conn,
@@ -753,9 +1263,7 @@ class Database:
         if groups:
             sql_group_filter = ""
         else:
-            sql_group_filter = (
-                f"AND record_id IN (SELECT group_id FROM {self.record_table_name})"
-            )
+            sql_group_filter = f"AND {self.record_table_name}.duplicate_of IS NULL"
 
         return pd.read_sql_query(
             f"""SELECT record_id, last_ranking.ranking
@@ -782,9 +1290,8 @@ class Database:
         pd.DataFrame
             DataFrame with pending results records.
         """
-        query = f"""SELECT * FROM results WHERE label is null AND record_id IN (
-            SELECT group_id FROM {self.record_table_name}
-        )"""
+        query = f"""SELECT * FROM results WHERE label is null
+            AND {self._is_group_base_sql("results")}"""
         params = None
         if user_id is not None:
             query += " AND user_id=?"
@@ -0,0 +1,115 @@
+"""Column snapshots of the data stores.
+
+Reading columns of a data store with `DataStore.__getitem__` reads the whole record
+table. The columns are therefore kept in memory, shared by all `DataStore` objects of
+the same database file, until the records are changed.
+
+Each write to the record table stores a new random version in the database, see
+`asreview.database.store.DataStore`. A snapshot belongs to a single version: the
+columns of a snapshot are discarded when the version in the database is different.
+The arrays of the columns are read only, so the columns can be shared without copying.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+# Number of database files with a snapshot in memory. The snapshot of the least
+# recently used database file is discarded when this number is exceeded.
+MAX_SNAPSHOTS = 4
+
+_snapshots = OrderedDict()
+_snapshots_lock = threading.Lock()
+
+
+def _freeze(series):
+    """Make the arrays of a pandas Series read only."""
+    array = series.array
+    if hasattr(array, "_mask"):
+        # Masked arrays, like the arrays of the nullable integer types.
+        arrays = [array._data, array._mask]
+    else:
+        arrays = [series.to_numpy(copy=False)]
+
+    for values in arrays:
+        values.flags.writeable = False
+    return series
+
+
+def get_columns(fp, table, version, columns):
+    """Get the columns of a snapshot.
+
+    Parameters
+    ----------
+    fp : str | Path
+        Location of the database file.
+    table : str
+        Name of the record table.
+    version : str
+        Current version of the records in the database.
+    columns : list[str]
+        Names of the columns.
+
+    Returns
+    -------
+    dict[str, pd.Series]
+        Mapping {column name: column} of the columns in the snapshot. Columns that
+        are not in the snapshot are left out. If the snapshot doesn't belong to the
+        version, the mapping is empty.
+    """
+    key = (os.path.abspath(fp), table)
+    with _snapshots_lock:
+        if key not in _snapshots:
+            return {}
+        snapshot_version, snapshot = _snapshots[key]
+        if snapshot_version != version:
+            del _snapshots[key]
+            return {}
+
+        _snapshots.move_to_end(key)
+        return {column: snapshot[column] for column in columns if column in snapshot}
+
+
+def add_columns(fp, table, version, columns):
+    """Add columns to the snapshot of a database file.
+
+    Parameters
+    ----------
+    fp : str | Path
+        Location of the database file.
+    table : str
+        Name of the record table.
+    version : str
+        Version of the records the columns were read from.
+    columns : dict[str, pd.Series]
+        Mapping {column name: column}. The arrays of the columns are made read only.
+    """
+    key = (os.path.abspath(fp), table)
+    columns = {name: _freeze(column) for name, column in columns.items()}
+    with _snapshots_lock:
+        if key in _snapshots and _snapshots[key][0] == version:
+            _snapshots[key][1].update(columns)
+            _snapshots.move_to_end(key)
+        else:
+            _snapshots[key] = (version, columns)
+            _snapshots.move_to_end(key)
+
+        while len(_snapshots) > MAX_SNAPSHOTS:
+            _snapshots.popitem(last=False)
+
+
+def clear(fp=None):
+    """Discard the snapshots of a database file.
+
+    Parameters
+    ----------
+    fp : str | Path, optional
+        Location of the database file, or of a directory containing database files.
+        If None, all snapshots are discarded. Default is None.
+    """
+    fp = None if fp is None else os.path.abspath(fp)
+
+    with _snapshots_lock:
+        for key in list(_snapshots):
+            if fp is None or key[0] == fp or key[0].startswith(fp + os.sep):
+                del _snapshots[key]
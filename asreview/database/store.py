@@ -1,23 +1,30 @@
+import dataclasses
 import functools
-import sqlite3
+import json
 from collections import defaultdict
 from uuid import uuid4
 
 import numpy as np
 import pandas as pd
-from sqlalchemy import NullPool
-from sqlalchemy import create_engine
 from sqlalchemy import event
 from sqlalchemy import select
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.types import JSON
 
 from asreview.data.record import Base
 from asreview.data.record import Record
+from asreview.database import snapshot
+from asreview.database.connection import get_engine
 
 CURRENT_DATASTORE_VERSION = 0
 
+# Table with the version of the records in the data store. Each write to the record
+# table stores a new random version, so that the columns kept in memory by
+# `asreview.database.snapshot` can be checked with a single query.
+RECORD_VERSION_TABLE = "record_version"
+
 # SQLite max SQL variables limit (since 3.32.0, 2020).
 # See: https://www.sqlite.org/limits.html#max_variable_number
 SQLITE_MAX_VARIABLE_NUMBER = 32766
@@ -178,6 +185,8 @@ class DataStore:
     Data input always happens via the record class. This means that if you want to add
     data to the data store, you will first need to clean it, make sure it has the
     correct columns and make sure it passes the validations defined in the record class.
+    Large datasets can be added as a DataFrame with `add_dataframe`, which applies the
+    validations of the record class column-wise instead of creating record objects.
 
     Getting data from the store can happen in rows or in columns. If you read rows, you
     will get record objects as response. If you read columns, you will get pandas
@@ -188,7 +197,13 @@ class DataStore:
     the database."""
 
     def __init__(
-        self, fp=":memory:", record_cls=Record, read_only=False, conn_uri=None
+        self,
+        fp=":memory:",
+        record_cls=Record,
+        read_only=False,
+        conn_uri=None,
+        pragmas=None,
+        column_cache=True,
     ):
         """Initialize the data store.
 
@@ -210,6 +225,15 @@ class DataStore:
             are ignored for URI construction and this URI is used directly. This is
             useful when embedding the DataStore inside a `Database` that already owns
             the connection URI.
+        pragmas : dict, optional
+            SQLite pragmas to apply to new connections, in addition to or instead of
+            the values in `asreview.database.connection.DEFAULT_PRAGMAS`. Default is
+            None.
+        column_cache : bool, optional
+            Whether to keep the columns read with `__getitem__` and `get_df` in memory
+            until the records are changed, see `asreview.database.snapshot`. The
+            columns are shared with the other data stores of the same database file.
+            In-memory data stores don't keep columns in memory. Default is True.
         """
         if conn_uri is None and fp == ":memory:" and read_only:
             raise ValueError("Can't open an in-memory database in read only mode")
@@ -219,16 +243,17 @@ class DataStore:
         self._conn_uri = (
             conn_uri if conn_uri is not None else _build_conn_uri(fp, read_only)
         )
-        self._in_memory = conn_uri is not None or fp == ":memory:"
-
-        # I'm using NullPool here, indicating that the engine should not use a
-        # connection pool, but just create and dispose of a connection every time a
-        # request comes. This makes it very easy dispose of the engine, but is less
-        # efficient.
-        self.engine = create_engine(
-            "sqlite://",
-            creator=lambda: sqlite3.connect(self._conn_uri, uri=True),
-            poolclass=NullPool,
+        self._in_memory = fp == ":memory:" or "mode=memory" in self._conn_uri
+        self.column_cache = column_cache and not self._in_memory
+
+        # The engines of database files share a connection pool per file, see
+        # `asreview.database.connection`.
+        self.engine = get_engine(
+            self._conn_uri,
+            fp,
+            pragmas=pragmas,
+            in_memory=self._in_memory,
+            read_only=read_only,
         )
 
         # I put expire_on_commit=False, so that after you put records in the database,
@@ -281,6 +306,91 @@ class DataStore:
 
         with self.Session() as session, session.begin():
             session.add_all(records)
+            self._set_record_version(session.connection())
+
+    @unwrap_operational_errors
+    def add_dataframe(self, df, dataset_id=None):
+        """Add the rows of a DataFrame to the data store as records.
+
+        This is a faster alternative to `add_records` for large datasets. No record
+        objects are created: the data is validated column-wise with
+        `record_cls.validate_dataframe` and inserted with a single `executemany` in
+        one transaction.
+
+        Parameters
+        ----------
+        df : pd.DataFrame | pyarrow.Table
+            Cleaned data, for example the output of `BaseReader.clean_data`. Columns
+            that are not record columns are ignored. If there is no `dataset_row`
+            column, the index is used as `dataset_row`.
+        dataset_id : str, optional
+            Identifier of the dataset, used if there is no `dataset_id` column. By
+            default None.
+
+        Returns
+        -------
+        list[int]
+            The record_id of each row of the DataFrame.
+
+        Raises
+        ------
+        ValueError
+            If a value does not pass the validations of the record class.
+        """
+        if hasattr(df, "to_pandas"):
+            df = df.to_pandas()
+        if len(df) == 0:
+            return []
+
+        # Only the fields that are passed when creating a record are inserted. The
+        # record_id is assigned below and the duplicate_of column is set by
+        # `set_groups`, so that the duplicate chains are normalized.
+        fields = [field for field in dataclasses.fields(self.record_cls) if field.init]
+        df = df[[field.name for field in fields if field.name in df.columns]].copy()
+        if "dataset_row" not in df.columns:
+            df = df.assign(dataset_row=df.index)
+        if "dataset_id" not in df.columns:
+            df = df.assign(dataset_id=dataset_id)
+
+        # Fill the missing columns with the default values of the record class.
+        table = self.record_cls.__table__
+        for field in fields:
+            if field.name in df.columns:
+                continue
+            if field.default_factory is not dataclasses.MISSING:
+                df[field.name] = [field.default_factory() for _ in range(len(df))]
+            else:
+                df[field.name] = None
+
+        df = self.record_cls.validate_dataframe(df)
+
+        for column in df.columns:
+            # Like the ORM, insert the default value of a column instead of None.
+            default = table.c[column].default
+            if default is not None and default.is_scalar:
+                df[column] = df[column].where(df[column].notna(), default.arg)
+
+            # The values are passed to sqlite3 directly, without the type processing
+            # of SQLAlchemy, so serialize the JSON columns here.
+            if isinstance(table.c[column].type, JSON):
+                encode = json.JSONEncoder().encode
+                df[column] = [encode(value) for value in df[column]]
+
+        columns = ", ".join(f'"{c}"' for c in ["record_id", *df.columns])
+        placeholders = ", ".join(["?"] * (len(df.columns) + 1))
+
+        with self.engine.begin() as con:
+            start = con.exec_driver_sql(
+                f"SELECT COALESCE(MAX(record_id) + 1, 0) FROM {table.name}"
+            ).scalar()
+
+            record_ids = list(range(start, start + len(df)))
+            con.exec_driver_sql(
+                f"INSERT INTO {table.name} ({columns}) VALUES ({placeholders})",
+                list(zip(record_ids, *(df[c].tolist() for c in df.columns))),
+            )
+            self._set_record_version(con)
+        return record_ids
 
     @unwrap_operational_errors
     def delete_record(self, record_id):
@@ -297,6 +407,7 @@ class DataStore:
                     f"DataStore does not contain a record with record_id {record_id}"
                 )
             session.delete(record)
+            self._set_record_version(session.connection())
 
     def __len__(self):
         with self.Session() as session:
@@ -311,7 +422,14 @@ class DataStore:
         if isinstance(item, str):
             columns = [item]
         else:
-            columns = item
+            columns = list(item)
+        df = self._read_columns(columns)
+        if isinstance(item, str):
+            return df[item]
+        else:
+            return df
+
+    def _read_sql_columns(self, con, columns):
         # Always order by record_id. Without ORDER BY, SQLite can return rows in
         # different orders across separate single-column queries (depending on which
         # index the planner picks). Code that positionally joins two such queries,
@@ -320,16 +438,87 @@ class DataStore:
         table = self.record_cls.__tablename__
         select_cols = ", ".join(f'"{c}"' for c in columns)
         dtype = {c: t for c, t in self.pandas_dtype_mapping.items() if c in columns}
+        return pd.read_sql_query(
+            f"SELECT {select_cols} FROM {table} ORDER BY record_id",
+            con,
+            dtype=dtype,
+        )
+
+    def _read_columns(self, columns):
+        """Read columns of the record table, ordered by record_id.
+
+        If the column cache is enabled, only the columns that are not in the snapshot
+        of the current version of the records are read from the database. The arrays
+        of the columns are shared with the snapshot and are read only.
+
+        Parameters
+        ----------
+        columns : list[str]
+            Names of the columns.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        table = self.record_cls.__tablename__
         with self.engine.connect() as con:
-            df = pd.read_sql_query(
-                f"SELECT {select_cols} FROM {table} ORDER BY record_id",
-                con,
-                dtype=dtype,
-            )
-        if isinstance(item, str):
-            return df[item]
-        else:
-            return df
+            if not self.column_cache:
+                return self._read_sql_columns(con, columns)
+
+            # Read the version and the columns in the same read transaction, so that
+            # the columns belong to the version.
+            con.exec_driver_sql("BEGIN")
+            version = self._get_record_version(con)
+            if version is not None:
+                cached = snapshot.get_columns(self.fp, table, version, columns)
+                missing = [c for c in columns if c not in cached]
+                if missing:
+                    df = self._read_sql_columns(con, missing)
+                    new_columns = {c: df[c] for c in missing}
+                    snapshot.add_columns(self.fp, table, version, new_columns)
+                    cached.update(new_columns)
+                return pd.DataFrame({c: cached[c] for c in columns}, copy=False)
+
+            df = self._read_sql_columns(con, columns)
+
+        # The records were added without a version, for example by an older version
+        # of ASReview. The columns can be kept in memory from the next read on.
+        if not self.read_only:
+            with self.engine.begin() as con:
+                self._set_record_version(con, replace=False)
+        return df
+
+    def _get_record_version(self, con):
+        try:
+            return con.exec_driver_sql(
+                f"SELECT version FROM {RECORD_VERSION_TABLE}"
+            ).scalar()
+        except OperationalError:
+            return None
+
+    def _set_record_version(self, con, replace=True):
+        """Store a new version of the records.
+
+        Call this in each transaction that writes to the record table.
+
+        Parameters
+        ----------
+        con : sqlalchemy.engine.Connection
+            Connection to the database.
+        replace : bool, optional
+            Whether to replace the current version. If False, the version is only
+            stored if there is no version yet. Default is True.
+        """
+        con.exec_driver_sql(
+            f"CREATE TABLE IF NOT EXISTS {RECORD_VERSION_TABLE} (version TEXT NOT NULL)"
+        )
+        if replace:
+            con.exec_driver_sql(f"DELETE FROM {RECORD_VERSION_TABLE}")
+        con.exec_driver_sql(
+            f"INSERT INTO {RECORD_VERSION_TABLE} (version) SELECT ? "
+            f"WHERE NOT EXISTS (SELECT 1 FROM {RECORD_VERSION_TABLE})",
+            (uuid4().hex,),
+        )
 
     def __contains__(self, item):
         return item in self.columns
@@ -395,16 +584,34 @@ class DataStore:
             for record_id in group:
                 record_to_group[record_id] = group_id
 
-        with self.Session() as session, session.begin():
-            record_ids = list(record_to_group.keys())
-            records = _batched_in(
-                lambda batch: session.scalars(
-                    select(Record).where(Record.record_id.in_(batch))
-                ).all(),
-                record_ids,
+        if not record_to_group:
+            return
+
+        # Update the records in bulk, without loading them into the session. The
+        # duplicate chains are already normalized, since every record points to
+        # the root of its group. Roots are only written if they point to a record.
+        table = self.record_cls.__tablename__
+        with self.engine.begin() as con:
+            con.exec_driver_sql(
+                f"UPDATE {table} SET duplicate_of = NULL "
+                "WHERE record_id = ? AND duplicate_of IS NOT NULL",
+                [
+                    (record_id,)
+                    for record_id, group_id in record_to_group.items()
+                    if group_id == record_id
+                ],
             )
-            for record in records:
-                record.duplicate_of = record_to_group[record.record_id]
+            duplicates = [
+                (group_id, record_id)
+                for record_id, group_id in record_to_group.items()
+                if group_id != record_id
+            ]
+            if duplicates:
+                con.exec_driver_sql(
+                    f"UPDATE {table} SET duplicate_of = ? WHERE record_id = ?",
+                    duplicates,
+                )
+            self._set_record_version(con)
 
     def get_groups(self, record_id=None):
         """Get the record groups.
@@ -443,9 +650,6 @@ class DataStore:
         -------
         pd.DataFrame
         """
-        with self.engine.connect() as con:
-            return pd.read_sql_query(
-                f"SELECT * FROM {self.record_cls.__tablename__} ORDER BY record_id",
-                con,
-                dtype=self.pandas_dtype_mapping,
-            )
+        return self._read_columns(
+            [column.name for column in self.record_cls.__table__.columns]
+        )
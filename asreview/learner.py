@@ -20,6 +20,8 @@ from dataclasses import field
 from typing import Any
 from typing import Optional
 
+import numpy as np
+
 from asreview.extensions import load_extension
 from asreview.utils import _read_config_file
 
@@ -63,6 +65,7 @@ class ActiveLearningCycleData:
     feature_extractor_param: Optional[dict[str, Any]] = field(default_factory=dict)
     stopper_param: Optional[dict[str, Any]] = field(default_factory=dict)
     n_query: int = 1
+    incremental: bool = False
 
 
 class ActiveLearningCycle:
@@ -88,6 +91,10 @@ class ActiveLearningCycle:
         The stopping criteria. Default is None.
     n_query: int, callable
         The number of instances to query at once. Default is 1.
+    incremental: bool
+        Update the classifier with the newly labeled records instead of fitting
+        it from scratch, if the classifier supports this (classifiers with a
+        ``fit_incremental`` method). Default is False.
 
     """
 
@@ -99,6 +106,7 @@ class ActiveLearningCycle:
         feature_extractor=None,
         stopper=None,
         n_query=1,
+        incremental=False,
     ):
         self.querier = querier
         self.classifier = classifier
@@ -106,6 +114,7 @@ class ActiveLearningCycle:
         self.feature_extractor = feature_extractor
         self.stopper = stopper
         self.n_query = n_query
+        self.incremental = incremental
 
     def get_n_query(self, results, labels):
         """Get the number of records to query at each step in the active learning.
@@ -147,7 +156,7 @@ class ActiveLearningCycle:
         """
         return self.feature_extractor.fit_transform(X)
 
-    def fit(self, X, y):
+    def fit(self, X, y, record_ids=None):
         """Fit the classifier to the data.
 
         Parameters
@@ -156,22 +165,60 @@ class ActiveLearningCycle:
             The instances to fit.
         y: np.array
             The labels of the instances.
+        record_ids: np.array
+            The record ids of the instances. Used in incremental mode to find the
+            instances the classifier was already fitted on. Default is None.
         """
         if self.balancer is None:
             sample_weight = None
         else:
             sample_weight = self.balancer.compute_sample_weight(y)
 
-        self.classifier.fit(X, y, sample_weight=sample_weight)
+        if self.incremental and hasattr(self.classifier, "fit_incremental"):
+            self.classifier.fit_incremental(
+                X,
+                y,
+                sample_weight=sample_weight,
+                n_fitted=self._get_n_fitted(record_ids, y),
+            )
+        else:
+            self.classifier.fit(X, y, sample_weight=sample_weight)
+
+        if self.incremental and record_ids is not None:
+            self._fitted_record_ids = np.array(record_ids)
+            self._fitted_labels = np.array(y)
+
         return self
 
-    def rank(self, X):
+    def _get_n_fitted(self, record_ids, y):
+        """Number of leading instances the classifier was fitted on before.
+
+        The classifier can only be updated if the previous training set is a
+        prefix of the current one, with the same labels.
+        """
+        if record_ids is None or not hasattr(self, "_fitted_record_ids"):
+            return 0
+
+        n_fitted = len(self._fitted_record_ids)
+        if (
+            n_fitted > len(record_ids)
+            or not np.array_equal(self._fitted_record_ids, record_ids[:n_fitted])
+            or not np.array_equal(self._fitted_labels, y[:n_fitted])
+        ):
+            return 0
+
+        return n_fitted
+
+    def rank(self, X, n=None):
         """Rank the instances in X.
 
         Parameters
         ----------
         X: np.array
             The instances to rank.
+        n: int
+            The number of instances to rank. If None, all instances are ranked.
+            Default is None.
 
         Returns
         -------
@@ -180,11 +227,11 @@ class ActiveLearningCycle:
         """
 
         if self.classifier is None:
-            return self.querier.query(X)
+            return self._query(X, n)
 
         try:
             proba = self.classifier.predict_proba(X)
-            return self.querier.query(proba[:, 1])
+            return self._query(proba[:, 1], n)
         except AttributeError:
             try:
                 scores = self.classifier.decision_function(X)
@@ -192,7 +239,7 @@ class ActiveLearningCycle:
                 if "proba" in self.querier.get_params(deep=False):
                     self.querier.set_params(proba=False)
 
-                return self.querier.query(scores)
+                return self._query(scores, n)
 
             except AttributeError:
                 raise AttributeError(
@@ -200,6 +247,15 @@ class ActiveLearningCycle:
                     "decision function for this classifier."
                 )
 
+    def _query(self, p, n=None):
+        if n is None:
+            return self.querier.query(p)
+
+        if hasattr(self.querier, "query_top"):
+            return self.querier.query_top(p, n)
+
+        return self.querier.query(p)[:n]
+
     def stop(self, results, data):
         """Check if the stopping criteria is met.
 
@@ -274,6 +330,7 @@ class ActiveLearningCycle:
             feature_extractor=feature_model,
             stopper=stopper_model,
             n_query=cycle_meta_data.n_query,
+            incremental=cycle_meta_data.incremental,
         )
 
     @classmethod
@@ -315,6 +372,7 @@ class ActiveLearningCycle:
             if self.stopper is not None
             else None,
             n_query=self.n_query,
+            incremental=self.incremental,
         )
 
     def to_file(self, fp):
@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
 from sklearn.ensemble import RandomForestClassifier as SKRandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.naive_bayes import MultinomialNB
@@ -25,6 +26,23 @@ __all__ = [
 ]
 
 
+def _get_class_weight(y, sample_weight=None):
+    """Get the sample weight of each class.
+
+    Returns None if the sample weights are not constant within the classes.
+    """
+    if sample_weight is None:
+        return {c: 1.0 for c in np.unique(y)}
+
+    class_weight = {}
+    for c in np.unique(y):
+        weights = sample_weight[y == c]
+        if not np.allclose(weights, weights[0]):
+            return None
+        class_weight[c] = weights[0]
+    return class_weight
+
+
 class SVM(LinearSVC):
     """Support vector machine classifier.
 
@@ -57,6 +75,54 @@ class NaiveBayes(MultinomialNB):
     name = "nb"
     label = "Naive Bayes"
 
+    def fit_incremental(self, X, y, sample_weight=None, n_fitted=0):
+        """Update the classifier with the instances after the first n_fitted.
+
+        The counts of the previous fit are rescaled to the current sample weight
+        of each class before the new instances are added with ``partial_fit``.
+        This is equal to a full fit if the sample weights are constant within
+        each class, like the weights of the balancers. Otherwise, the classifier
+        is fitted on all instances.
+
+        Parameters
+        ----------
+        X: np.array
+            All instances, of which the first n_fitted were fitted before.
+        y: np.array
+            The labels of the instances.
+        sample_weight: np.array
+            The sample weights of the instances. Default is None.
+        n_fitted: int
+            The number of leading instances fitted before. Default is 0.
+        """
+        y = np.asarray(y)
+        class_weight = _get_class_weight(y, sample_weight)
+
+        if (
+            n_fitted == 0
+            or class_weight is None
+            or getattr(self, "_class_weight", None) is None
+            or not np.array_equal(self.classes_, np.unique(y))
+        ):
+            self.fit(X, y, sample_weight=sample_weight)
+        elif n_fitted < len(y):
+            scale = np.array(
+                [class_weight[c] / self._class_weight[c] for c in self.classes_]
+            )
+            self.feature_count_ *= scale[:, np.newaxis]
+            self.class_count_ *= scale
+
+            self.partial_fit(
+                X[n_fitted:],
+                y[n_fitted:],
+                sample_weight=None
+                if sample_weight is None
+                else sample_weight[n_fitted:],
+            )
+
+        self._class_weight = class_weight
+        return self
+
 
 class Logistic(LogisticRegression):
     """Logistic regression classifier.
@@ -67,3 +133,24 @@ class Logistic(LogisticRegression):
 
     name = "logistic"
     label = "Logistic regression"
+
+    def fit_incremental(self, X, y, sample_weight=None, n_fitted=0):
+        """Fit the classifier, starting from the coefficients of the previous fit.
+
+        Parameters
+        ----------
+        X: np.array
+            All instances, of which the first n_fitted were fitted before.
+        y: np.array
+            The labels of the instances.
+        sample_weight: np.array
+            The sample weights of the instances. Default is None.
+        n_fitted: int
+            The number of leading instances fitted before. Default is 0.
+        """
+        warm_start = self.warm_start
+        self.warm_start = n_fitted > 0 and hasattr(self, "coef_")
+        try:
+            return self.fit(X, y, sample_weight=sample_weight)
+        finally:
+            self.warm_start = warm_start
@@ -0,0 +1,403 @@
+# Copyright 2019-2025 The ASReview Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Content-addressed cache for feature matrices.
+
+Feature matrices are stored under a key computed from the feature extractor
+(class and parameters) and the contents of the input columns. The same
+dataset with the same feature extraction settings always maps to the same
+key, so the feature matrix can be reused across simulations and projects.
+"""
+
+__all__ = [
+    "FeatureMatrixCache",
+    "get_feature_extractor_key",
+    "load_feature_matrix",
+    "save_feature_matrix",
+]
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+DEFAULT_MAX_SIZE = 5 * 2**30
+SUFFIXES = (".npy", ".csr", ".npz")
+
+
+def _default_cache_path():
+    """Get the location of the shared feature matrix cache.
+
+    Overwrite this location by specifying the ASREVIEW_CACHE_PATH environment
+    variable.
+    """
+    if os.environ.get("ASREVIEW_CACHE_PATH", None):
+        return Path(os.environ["ASREVIEW_CACHE_PATH"], "feature_matrices")
+
+    return Path("~", ".cache", "asreview", "feature_matrices").expanduser()
+
+
+def _write_feature_matrix(feature_matrix, fp):
+    """Write a feature matrix to a new file, see `save_feature_matrix`."""
+    fp = Path(fp)
+
+    if sp.issparse(feature_matrix):
+        fp = fp.with_name(fp.name + ".csr")
+        feature_matrix = sp.csr_matrix(feature_matrix)
+
+        # store in canonical format, scipy sorts the indices of the matrix in
+        # place otherwise, which fails on read-only memory maps
+        if not feature_matrix.has_canonical_format:
+            feature_matrix = feature_matrix.copy()
+            feature_matrix.sum_duplicates()
+
+        fp.mkdir()
+        np.save(Path(fp, "data.npy"), feature_matrix.data)
+        np.save(Path(fp, "indices.npy"), feature_matrix.indices)
+        np.save(Path(fp, "indptr.npy"), feature_matrix.indptr)
+        np.save(Path(fp, "shape.npy"), np.array(feature_matrix.shape))
+    elif isinstance(feature_matrix, np.ndarray):
+        fp = fp.with_name(fp.name + ".npy")
+        np.save(fp, feature_matrix)
+    elif isinstance(feature_matrix, list):
+        fp = fp.with_name(fp.name + ".npy")
+        np.save(fp, np.array(feature_matrix))
+    else:
+        raise ValueError("Unsupported feature matrix type")
+
+    return fp
+
+
+def save_feature_matrix(feature_matrix, fp):
+    """Save a feature matrix to a file.
+
+    Dense feature matrices are stored as uncompressed `.npy` files. Sparse
+    feature matrices are stored in a `.csr` directory with the data, indices and
+    indptr arrays of the CSR matrix as separate `.npy` files. Both layouts can be
+    memory-mapped by `load_feature_matrix`.
+
+    The feature matrix is written to a temporary file first and then moved to
+    the file path, replacing an existing feature matrix with the same name.
+
+    Parameters
+    ----------
+    feature_matrix: numpy.ndarray, scipy.sparse.csr_matrix, list
+        The feature matrix to save.
+    fp: Path
+        File path without suffix.
+
+    Returns
+    -------
+    Path
+        The file path with the suffix of the stored format.
+    """
+    fp = Path(fp)
+
+    with tempfile.TemporaryDirectory(dir=fp.parent) as tmpdir:
+        fp_tmp = _write_feature_matrix(feature_matrix, Path(tmpdir, fp.name))
+        fp = fp.with_name(fp_tmp.name)
+
+        # a directory can't replace a directory, move the old feature matrix
+        # to the temporary directory first
+        if fp.is_dir():
+            os.replace(fp, Path(tmpdir, "old"))
+        os.replace(fp_tmp, fp)
+
+    return fp
+
+
+def load_feature_matrix(fp, mmap_mode="r"):
+    """Load a feature matrix from a file.
+
+    Parameters
+    ----------
+    fp: Path
+        File path of the feature matrix.
+    mmap_mode: str
+        Memory-map mode of the arrays, see `numpy.load`. Memory-mapped feature
+        matrices share the page cache between processes instead of holding a
+        private copy each. Feature matrices in the compressed `.npz` format are
+        always read into memory. Default is "r".
+
+    Returns
+    -------
+    numpy.ndarray, scipy.sparse.csr_matrix:
+        (Sparse) feature matrix.
+    """
+    fp = Path(fp)
+
+    if fp.suffix == ".csr":
+        shape = np.load(Path(fp, "shape.npy"), allow_pickle=False)
+        return sp.csr_matrix(
+            tuple(
+                np.load(
+                    Path(fp, f"{name}.npy"), mmap_mode=mmap_mode, allow_pickle=False
+                )
+                for name in ("data", "indices", "indptr")
+            ),
+            shape=tuple(shape),
+            copy=False,
+        )
+    elif fp.suffix == ".npz":
+        return sp.load_npz(fp)
+    elif fp.suffix == ".npy":
+        return np.load(fp, mmap_mode=mmap_mode, allow_pickle=False)
+    else:
+        raise ValueError("Unsupported file extension")
+
+
+def _get_size(fp):
+    """Get the size of a feature matrix file or directory in bytes."""
+    if fp.is_dir():
+        return sum(x.stat().st_size for x in fp.iterdir())
+    return fp.stat().st_size
+
+
+def _remove(fp):
+    """Remove a feature matrix file or directory."""
+    if fp.is_dir():
+        shutil.rmtree(fp)
+    else:
+        fp.unlink(missing_ok=True)
+
+
+def get_feature_extractor_key(feature_extractor):
+    """Get a key for the class and parameters of a feature extractor.
+
+    Parameters
+    ----------
+    feature_extractor: BaseEstimator
+        The feature extractor.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-256 hash of the feature extractor settings.
+    """
+    cls = type(feature_extractor)
+    params = json.dumps(
+        feature_extractor.get_params(deep=False), sort_keys=True, default=str
+    )
+
+    h = hashlib.sha256()
+    h.update(f"{cls.__module__}.{cls.__qualname__}".encode())
+    h.update(params.encode())
+    return h.hexdigest()
+
+
+def _is_deterministic(feature_extractor):
+    """Check if the feature extractor gives the same feature matrix on every fit.
+
+    A feature extractor with a `random_state` parameter of None, or a step with
+    such a parameter, can give a different feature matrix on every fit.
+    """
+    params = feature_extractor.get_params(deep=True)
+    return all(
+        value is not None
+        for name, value in params.items()
+        if name == "random_state" or name.endswith("__random_state")
+    )
+
+
+def _hash_input(h, X, columns=None):
+    """Update the hash with the contents of the input data."""
+    if isinstance(X, pd.DataFrame):
+        if columns is None or not set(columns).issubset(X.columns):
+            columns = list(X.columns)
+
+        h.update(str(len(X)).encode())
+        for column in columns:
+            h.update(str(column).encode())
+            h.update(
+                pd.util.hash_pandas_object(X[column].astype(str), index=False)
+                .to_numpy()
+                .tobytes()
+            )
+    else:
+        X = np.ascontiguousarray(X)
+        h.update(str(X.shape).encode())
+        h.update(str(X.dtype).encode())
+        h.update(X.tobytes())
+
+
+class FeatureMatrixCache:
+    """Content-addressed cache for feature matrices.
+
+    The feature matrices are stored as files in the cache directory. When the
+    total size of the cache exceeds the maximum size, the least recently used
+    feature matrices are removed.
+
+    Parameters
+    ----------
+    path: str, Path
+        Directory of the cache. Default is the value of the ASREVIEW_CACHE_PATH
+        environment variable or ~/.cache/asreview.
+    max_size: int
+        Maximum size of the cache in bytes. Default is 5 GiB.
+    """
+
+    def __init__(self, path=None, max_size=DEFAULT_MAX_SIZE):
+        self.path = Path(path) if path is not None else _default_cache_path()
+        self.max_size = max_size
+
+    def key(self, feature_extractor, X):
+        """Get the cache key of the feature matrix.
+
+        The key is based on the class and parameters of the feature extractor and
+        the contents of the input data. If the feature extractor has a `columns`
+        attribute, only those columns of the input data are used.
+
+        Parameters
+        ----------
+        feature_extractor: BaseEstimator
+            The feature extractor.
+        X: pandas.DataFrame, numpy.ndarray
+            The input data of the feature extractor.
+
+        Returns
+        -------
+        str
+            Hexadecimal SHA-256 hash.
+        """
+        h = hashlib.sha256()
+        h.update(get_feature_extractor_key(feature_extractor).encode())
+        _hash_input(h, X, getattr(feature_extractor, "columns", None))
+        return h.hexdigest()
+
+    def _find(self, key):
+        for suffix in SUFFIXES:
+            fp = Path(self.path, key + suffix)
+            if fp.exists():
+                return fp
+        return None
+
+    def _list(self):
+        if not self.path.is_dir():
+            return []
+        return [fp for fp in self.path.iterdir() if fp.suffix in SUFFIXES]
+
+    def get(self, key):
+        """Get a feature matrix from the cache.
+
+        Parameters
+        ----------
+        key: str
+            The cache key of the feature matrix.
+
+        Returns
+        -------
+        numpy.ndarray, scipy.sparse.csr_matrix, None:
+            The feature matrix, or None if not in the cache.
+        """
+        fp = self._find(key)
+        if fp is None:
+            return None
+
+        try:
+            feature_matrix = load_feature_matrix(fp)
+            # mark the feature matrix as recently used
+            os.utime(fp)
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+
+        return feature_matrix
+
+    def put(self, key, feature_matrix):
+        """Add a feature matrix to the cache.
+
+        Parameters
+        ----------
+        key: str
+            The cache key of the feature matrix.
+        feature_matrix: numpy.ndarray, scipy.sparse.csr_matrix
+            The feature matrix to store.
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file first, so that other processes never read a
+        # partially written feature matrix
+        with tempfile.TemporaryDirectory(dir=self.path) as tmpdir:
+            fp_tmp = _write_feature_matrix(feature_matrix, Path(tmpdir, key))
+            try:
+                os.replace(fp_tmp, Path(self.path, fp_tmp.name))
+            except OSError:
+                # another process stored the same feature matrix concurrently
+                if self._find(key) is None:
+                    raise
+
+        self.evict()
+
+    def fit_transform(self, feature_extractor, X):
+        """Get the feature matrix from the cache or compute it.
+
+        On a cache hit, the feature extractor is not fitted. Use the returned
+        feature matrix instead of calling `transform` on the feature extractor.
+        Feature extractors with a `random_state` of None are not deterministic,
+        their feature matrix is always computed and never cached.
+
+        Parameters
+        ----------
+        feature_extractor: BaseEstimator
+            The feature extractor.
+        X: pandas.DataFrame, numpy.ndarray
+            The input data of the feature extractor.
+
+        Returns
+        -------
+        numpy.ndarray, scipy.sparse.csr_matrix:
+            The feature matrix.
+        """
+        if not _is_deterministic(feature_extractor):
+            return feature_extractor.fit_transform(X)
+
+        key = self.key(feature_extractor, X)
+
+        feature_matrix = self.get(key)
+        if feature_matrix is None:
+            feature_matrix = feature_extractor.fit_transform(X)
+            self.put(key, feature_matrix)
+
+        return feature_matrix
+
+    def evict(self):
+        """Remove the least recently used feature matrices above the maximum size."""
+        files = []
+        for fp in self._list():
+            try:
+                files.append((fp.stat().st_mtime, _get_size(fp), fp))
+            except FileNotFoundError:
+                continue
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, fp in sorted(files, key=lambda x: x[0]):
+            if total_size <= self.max_size:
+                break
+            try:
+                _remove(fp)
+            except OSError:
+                # the feature matrix is in use, for example memory-mapped on
+                # Windows
+                continue
+            total_size -= size
+
+    def clear(self):
+        """Remove all feature matrices from the cache."""
+        for fp in self._list():
+            _remove(fp)
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import numpy as np
+
 __all__ = ["QueryMixin"]
 
 
@@ -34,3 +36,24 @@ class QueryMixin:
             order.
         """
         raise NotImplementedError
+
+    def query_top(self, p, k):
+        """Rank only the top k instances of the feature matrix.
+
+        Query strategies can override this method with a faster implementation
+        when only the first records of the ranking are needed. The result should
+        be equal to ``query(p)[:k]``.
+
+        Arguments
+        ---------
+        p: numpy.ndarray
+            The probability of inclusion for each record in the feature matrix.
+        k: int
+            The number of instances to rank.
+
+        Returns
+        -------
+        numpy.ndarray
+            The row indices of the k highest ranked instances in ranked order.
+        """
+        return np.asarray(self.query(p))[:k]
@@ -35,24 +35,156 @@ def _random_array(n, random_state=None):
     return row_indices
 
 
-def _mix_indices(query_idx_1, query_idx_2, mix_probability=0.95, random_state=None):
-    query_idx_mix = []
-    i = 0
-    j = 0
-
-    while i < len(query_idx_1) and j < len(query_idx_2):
-        if check_random_state(random_state).rand() < mix_probability:
-            query_idx_mix.append(query_idx_1[i])
-            i = i + 1
-        else:
-            query_idx_mix.append(query_idx_2[j])
-            j = j + 1
+def _argsort_top(x, n=None):
+    """Stable argsort of x, optionally restricted to the n smallest values.
+
+    The result is equal to ``np.argsort(x, kind="stable")[:n]``, but only the
+    candidates for the first n positions are sorted. This is O(len(x)) instead of
+    O(len(x) log(len(x))) for small n.
+    """
+    if n is None or n >= len(x):
+        return np.argsort(x, kind="stable")
+
+    if n <= 0:
+        return np.array([], dtype=np.intp)
+
+    kth = np.partition(x, n - 1)[n - 1]
+    if np.isnan(kth):
+        return np.argsort(x, kind="stable")[:n]
+
+    # all values tied with the kth value are candidates, the stable sort over the
+    # candidates (in index order) breaks the ties the same way as the full sort
+    candidates = np.flatnonzero(x <= kth)
+    return candidates[np.argsort(x[candidates], kind="stable")][:n]
 
-    indexes = np.unique(query_idx_mix, return_index=True)[1]
-    return [query_idx_mix[i] for i in sorted(indexes)]
 
+def _draw_from_first(n_1, n_2, mix_probability, random_state):
+    """Draw from which of two rankings each index of the mixed ranking is taken.
 
-class Random(QueryMixin, BaseEstimator):
+    The draws stop when one of the rankings is exhausted. The random state is
+    advanced by exactly the number of draws, as if the draws were made one by one,
+    so the random numbers drawn after the mixing don't depend on where it stopped.
+
+    Arguments
+    ---------
+    n_1: int
+        Length of the first ranking.
+    n_2: int
+        Length of the second ranking.
+    mix_probability: float
+        The probability of taking the next index from the first ranking.
+    random_state: int, RandomState
+        Random state for the choice between the rankings.
+
+    Returns
+    -------
+    np.array:
+        Boolean array, True if the index is taken from the first ranking.
+    """
+    if n_1 == 0 or n_2 == 0:
+        return np.array([], dtype=bool)
+
+    random_state = check_random_state(random_state)
+    state = random_state.get_state()
+
+    # one of the rankings is exhausted after at most n_1 + n_2 - 1 draws
+    from_first = random_state.rand(n_1 + n_2 - 1) < mix_probability
+    i = np.cumsum(from_first)
+    j = np.arange(1, len(from_first) + 1) - i
+    n_draws = np.flatnonzero((i == n_1) | (j == n_2))[0] + 1
+
+    random_state.set_state(state)
+    random_state.rand(n_draws)
+    return from_first[:n_draws]
+
+
+def _mix_indices(
+    query_idx_1,
+    query_idx_2,
+    mix_probability=0.95,
+    random_state=None,
+    n=None,
+    size=None,
+):
+    """Mix two rankings into a single ranking.
+
+    At each position, the next index of the first ranking is taken with
+    probability ``mix_probability``, otherwise the next index of the second
+    ranking. The mixing stops when one of the rankings is exhausted, after which
+    duplicate indices are removed (keeping the first occurrence).
+
+    Arguments
+    ---------
+    query_idx_1: np.array
+        The first ranking.
+    query_idx_2: np.array
+        The second ranking.
+    mix_probability: float
+        The probability of taking the next index from the first ranking.
+    random_state: int, RandomState
+        Random state for the choice between the rankings.
+    n: int
+        Only return the first n unique indices of the mixed ranking. Default
+        None returns all indices.
+    size: int
+        Length of the full rankings, if the rankings are only the first indices of
+        the full rankings. The random numbers are drawn as for mixing the full
+        rankings, so a RandomState is left in the same state as without n. Default
+        None uses the length of the rankings.
+
+    Returns
+    -------
+    np.array:
+        The mixed ranking.
+    """
+    query_idx_1 = np.asarray(query_idx_1)
+    query_idx_2 = np.asarray(query_idx_2)
+    n_1, n_2 = len(query_idx_1), len(query_idx_2)
+
+    from_first = _draw_from_first(
+        n_1 if size is None else size,
+        n_2 if size is None else size,
+        mix_probability,
+        random_state,
+    )
+
+    if n_1 == 0 or n_2 == 0:
+        return query_idx_1[:0]
+
+    # every index drawn after k draws is one of at least ceil(k / 2) unique
+    # indices, so 2n draws are enough to find n unique indices
+    if n is not None:
+        from_first = from_first[: 2 * n]
+
+    # position in each ranking after every draw, stop when one is exhausted
+    i = np.cumsum(from_first)
+    j = np.arange(1, len(from_first) + 1) - i
+    exhausted = np.flatnonzero((i == n_1) | (j == n_2))
+    if len(exhausted) > 0:
+        from_first, i, j = (x[: exhausted[0] + 1] for x in (from_first, i, j))
+
+    query_idx_mix = np.where(
+        from_first,
+        query_idx_1[np.maximum(i - 1, 0)],
+        query_idx_2[np.maximum(j - 1, 0)],
+    )
+
+    first_index = np.sort(np.unique(query_idx_mix, return_index=True)[1])
+    return query_idx_mix[first_index[:n]]
+
+
+class _TopQueryMixin(QueryMixin):
+    """Mixin for query strategies that can rank only the first n instances.
+
+    The `query` method of these query strategies takes the number of instances to
+    rank as second argument.
+    """
+
+    def query_top(self, p, k):
+        return self.query(p, n=k)
+
+
+class Random(_TopQueryMixin, BaseEstimator):
     """Random query strategy.
 
     Choose the samples to be included at random.
@@ -64,25 +196,25 @@ class Random(QueryMixin, BaseEstimator):
     def __init__(self, random_state=None):
         self.random_state = random_state
 
-    def query(self, p):
+    def query(self, p, n=None):
         """Query instances.
 
         Arguments
         ---------
         p: np.array
             The probabilities of the instances.
-        random_state: int, RandomState
-            Random state for shuffling the indices.
+        n: int
+            Number of instances to return. Default None returns all instances.
 
         Returns
         -------
         np.array:
             The indices of the instances to be queried.
         """
-        return _random_array(len(p), random_state=self.random_state)
+        return _random_array(len(p), random_state=self.random_state)[:n]
 
 
-class TopDown(QueryMixin, BaseEstimator):
+class TopDown(_TopQueryMixin, BaseEstimator):
     """Top-down query strategy.
 
     Query the records in a top-down fashion.
@@ -91,23 +223,28 @@ class TopDown(QueryMixin, BaseEstimator):
     name = "top_down"
     label = "Top-down"
 
-    def query(self, p):
+    def query(self, p, n=None):
         """Query instances.
 
         Arguments
         ---------
-        p: np.array
-            The probabilities of the instances.
+        p: np.array, scipy.sparse.csr_matrix
+            The probabilities of the instances, or the feature matrix if there
+            is no classifier.
+        n: int
+            Number of instances to return. Default None returns all instances.
 
         Returns
         -------
         np.array:
             The indices of the instances to be queried.
         """
-        return np.arange(len(p))
+        if n is None:
+            return np.arange(p.shape[0])
+        return np.arange(min(n, p.shape[0]))
 
 
-class Uncertainty(QueryMixin, BaseEstimator):
+class Uncertainty(_TopQueryMixin, BaseEstimator):
     """Uncertainty query strategy.
 
     Choose the most uncertain samples according to the model (i.e. closest to
@@ -123,13 +260,15 @@ class Uncertainty(QueryMixin, BaseEstimator):
         self.u = u
         self.proba = proba
 
-    def query(self, p):
+    def query(self, p, n=None):
         """Query instances.
 
         Arguments
         ---------
         p: np.array
             The probabilities of the instances.
+        n: int
+            Number of instances to return. Default None returns all instances.
 
         Returns
         -------
@@ -145,12 +284,12 @@ class Uncertainty(QueryMixin, BaseEstimator):
             u = self.u
 
         try:
-            return np.argsort(np.abs(p - u), kind="stable")
+            return _argsort_top(np.abs(p - u), n)
         except TypeError:
             raise TypeError("Probabilities or decision functions should be provided")
 
 
-class Max(QueryMixin, BaseEstimator):
+class Max(_TopQueryMixin, BaseEstimator):
     """Maximum query strategy.
 
     Choose the most likely samples to be included according to the model.
@@ -159,14 +298,14 @@ class Max(QueryMixin, BaseEstimator):
     name = "max"
     label = "Maximum"
 
-    def query(self, p):
+    def query(self, p, n=None):
         try:
-            return np.argsort(-p, kind="stable")
+            return _argsort_top(-p, n)
         except TypeError:
             raise TypeError("Probabilities or decision functions should be provided")
 
 
-class HybridMaxUncertainty(QueryMixin, BaseEstimator):
+class HybridMaxUncertainty(_TopQueryMixin, BaseEstimator):
     """95% Maximum and 5% Uncertainty query strategy.
 
     A mix of maximum and random query strategies with a mix ratio of 0.95.
@@ -184,16 +323,18 @@ class HybridMaxUncertainty(QueryMixin, BaseEstimator):
         self.proba = proba
         self.random_state = random_state
 
-    def query(self, p):
+    def query(self, p, n=None):
         return _mix_indices(
-            Max().query(p),
-            Uncertainty(u=self.u, proba=self.proba).query(p),
+            Max().query(p, n=n),
+            Uncertainty(u=self.u, proba=self.proba).query(p, n=n),
             self.probability,
             self.random_state,
+            n=n,
+            size=len(p),
         )
 
 
-class HybridMaxRandom(QueryMixin, BaseEstimator):
+class HybridMaxRandom(_TopQueryMixin, BaseEstimator):
     """95% Maximum and 5% Random query strategy.
 
     A mix of maximum and random query strategies with a mix ratio of 0.95.
@@ -217,10 +358,12 @@ class HybridMaxRandom(QueryMixin, BaseEstimator):
         self.probability = probability
         self.random_state = random_state
 
-    def query(self, p):
+    def query(self, p, n=None):
         return _mix_indices(
-            Max().query(p),
-            _random_array(len(p), self.random_state),
+            Max().query(p, n=n),
+            _random_array(len(p), self.random_state)[:n],
             self.probability,
             self.random_state,
+            n=n,
+            size=len(p),
         )
@@ -23,6 +23,7 @@ This can be based on the properties of the results table or the input dataset.
 
 """
 
+import numpy as np
 import pandas as pd
 
 from sklearn.base import BaseEstimator
@@ -104,7 +105,7 @@ class LastRelevant(BaseEstimator):
             True if the review should be stopped, False otherwise.
         """
 
-        if sum(data) == sum(results["label"]):
+        if np.sum(data) == np.sum(results["label"]):
             return True
 
         return False
@@ -160,8 +161,8 @@ class NLabeled(BaseEstimator):
         if isinstance(self.n, tuple):
             n_relevant, n_irrelevant = self.n
             if (
-                sum(results["label"] == 1) >= n_relevant
-                and sum(results["label"] == 0) >= n_irrelevant
+                np.sum(results["label"] == 1) >= n_relevant
+                and np.sum(results["label"] == 0) >= n_irrelevant
             ):
                 return True
 
@@ -257,7 +258,7 @@ class NConsecutiveIrrelevant(BaseEstimator):
             True if the review should be stopped, False otherwise.
         """
 
-        if len(results) > self.n and sum(results["label"].iloc[-self.n :]) == 0:
+        if len(results) > self.n and np.sum(results["label"].iloc[-self.n :]) == 0:
             return True
 
         return False
@@ -17,32 +17,37 @@ __all__ = [
     "ProjectNotFoundError",
 ]
 
+import fnmatch
 import functools
 import json
+import os
 import shutil
 import tempfile
 import time
 import traceback
 import warnings
 import zipfile
+import zlib
 from dataclasses import asdict
 from pathlib import Path
 from urllib.request import urlretrieve
 from uuid import uuid4
 
 import jsonschema
-import numpy as np
-import scipy.sparse as sp
 from filelock import FileLock
 
-from asreview.data.loader import _from_file
+from asreview.data.loader import _add_data
 from asreview.data.loader import _get_reader
-from asreview.data.utils import identify_record_groups
+from asreview.data.loader import _iter_data_from_file
+from asreview.data.search import _update_search_index
+from asreview.database.connection import dispose
 from asreview.database.database import Database
 from asreview.datasets import DatasetManager
 from asreview.learner import ActiveLearningCycle
 from asreview.learner import ActiveLearningCycleData
 from asreview.models import get_ai_config
+from asreview.models.feature_cache import load_feature_matrix
+from asreview.models.feature_cache import save_feature_matrix
 from asreview.project.exceptions import ProjectError
 from asreview.project.exceptions import ProjectNotFoundError
 from asreview.project.migration import detect_version
@@ -86,6 +91,82 @@ def is_project(project_dir):
     return True
 
 
+def _check_simulation_labels(data_chunks):
+    """Check that the chunks of data of a simulation dataset are fully labeled.
+
+    Internals of the records are leaking out here. We are checking for a specific
+    column and a specific value. If the presence of the field `included` is
+    necessary in the input data, we should move it from `Record` to the `Base`
+    class, so that all record implementations have it.
+    """
+    has_labeled = False
+    has_unlabeled = False
+    for df in data_chunks:
+        if "included" in df.columns:
+            labeled = df["included"].notna()
+            has_labeled |= bool(labeled.any())
+            has_unlabeled |= not labeled.all()
+        elif len(df) > 0:
+            has_unlabeled = True
+
+        if has_labeled and has_unlabeled:
+            raise ValueError(
+                "Dataset for simulation mode must be fully labeled - "
+                "got records with missing labels"
+            )
+
+        yield df
+
+    if not has_labeled:
+        raise ValueError(
+            "Dataset for simulation mode must have labels for all records - "
+            "got dataset without any labels"
+        )
+
+
+# Files and folders of the project folder that are not exported.
+EXPORT_IGNORE_PATTERNS = ("tmp", "*.lock", "*.db-wal", "*.db-shm")
+
+# Files are stored in the project file without compression if the first part of the
+# file doesn't shrink below this ratio, such as dense feature matrices and files that
+# are compressed already.
+_COMPRESSION_SAMPLE_SIZE = 1 << 20
+_MIN_COMPRESSION_RATIO = 0.9
+
+
+def _iter_project_files(project_path):
+    """Iterate over the folders and files to export, in a fixed order.
+
+    Yields
+    ------
+    tuple[Path, str]
+        Path of the folder or file and its name in the archive.
+    """
+    for dirpath, dirnames, filenames in os.walk(project_path):
+        ignored = set()
+        for pattern in EXPORT_IGNORE_PATTERNS:
+            ignored.update(fnmatch.filter(dirnames + filenames, pattern))
+
+        # os.walk doesn't descend into the folders removed from dirnames
+        dirnames[:] = sorted(name for name in dirnames if name not in ignored)
+        for name in dirnames + sorted(set(filenames) - ignored):
+            fp = Path(dirpath, name)
+            yield fp, fp.relative_to(project_path).as_posix()
+
+
+def _compress_type(fp):
+    """Get the compression method of a file in the project file."""
+    if fp.is_dir():
+        return zipfile.ZIP_STORED
+
+    with open(fp, "rb") as f:
+        sample = f.read(_COMPRESSION_SAMPLE_SIZE)
+
+    if len(zlib.compress(sample, 1)) > _MIN_COMPRESSION_RATIO * len(sample):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
 class Project:
     """Project class for ASReview project files.
 
@@ -201,6 +282,7 @@ class Project:
                     json.dump(config, f)
 
         except Exception as err:
+            dispose(project_path)
             shutil.rmtree(project_path)
             raise err
 
@@ -249,7 +331,9 @@ class Project:
         self.config = config
         return config
 
-    def add_dataset(self, fp, dataset_id=None, file_writer=None):
+    def add_dataset(
+        self, fp, dataset_id=None, file_writer=None, similarity_threshold=None
+    ):
         """Add a dataset to the project file.
 
         Parameters
@@ -257,6 +341,10 @@ class Project:
         fp: str, Path
             Filepath to the dataset. It will be copied to the correct location in the
             project file.
+        similarity_threshold: float
+            If given, records with a similarity of at least this value are grouped as
+            near-duplicates, see `asreview.data.utils.identify_near_duplicate_groups`.
+            Default is None.
         """
         if dataset_id is None:
             dataset_id = uuid4().hex
@@ -284,31 +372,17 @@ class Project:
             dataset.to_file(save_fp)
         file_name = save_fp.name
 
-        records = _from_file(save_fp, dataset_id=dataset_id)
-
-        # Internals of the records are leaking out here. We are checking for a specific
-        # field and a specific value. If the presence of the field `included` is
-        # necessary in the input data, we should move it from `Record` to the `Base`
-        # class, so that all record implementations have it.
-        if self.config["mode"] == self.MODE_SIMULATE and (
-            all([r.included is None for r in records])
-        ):
-            raise ValueError(
-                "Dataset for simulation mode must have labels for all records - "
-                "got dataset without any labels"
-            )
+        data_chunks = _iter_data_from_file(save_fp)
+        if self.config["mode"] == self.MODE_SIMULATE:
+            data_chunks = _check_simulation_labels(data_chunks)
 
-        if self.config["mode"] == self.MODE_SIMULATE and (
-            any([r.included is None for r in records])
-        ):
-            raise ValueError(
-                "Dataset for simulation mode must be fully labeled - "
-                "got records with missing labels"
-            )
-
-        self.db.input.add_records(records=records)
-        groups = identify_record_groups(records)
-        self.db.input.set_groups(groups)
+        _add_data(
+            self.db.input,
+            data_chunks,
+            dataset_id=dataset_id,
+            similarity_threshold=similarity_threshold,
+        )
+        _update_search_index(self.db.input)
 
         # This config update assumes that the project only has one dataset.
         self.update_config(
@@ -355,7 +429,7 @@ class Project:
         except Exception:
             return []
 
-    def add_feature_matrix(self, feature_matrix, name):
+    def add_feature_matrix(self, feature_matrix, name, key=None):
         """Add feature matrix to project file.
 
         Parameters
@@ -364,29 +438,28 @@ class Project:
             The feature matrix to add to the project file.
         name: str
             Name of the feature extractor.
+        key: str
+            Key of the settings of the feature extractor, see
+            `asreview.models.feature_cache`. Default is None.
         """
         file_name = f"{name}_feature_matrix"
-        file_path = Path(self.project_path, self.PATH_FEATURE_MATRICES, file_name)
-
-        if sp.issparse(feature_matrix):
-            sp.save_npz(str(file_path), feature_matrix)
-            file_name += ".npz"
-        elif isinstance(feature_matrix, np.ndarray):
-            np.save(file_path, feature_matrix)
-            file_name += ".npy"
-        elif isinstance(feature_matrix, list):
-            np.save(file_path, np.array(feature_matrix))
-            file_name += ".npy"
-        else:
-            raise ValueError("Unsupported feature matrix type")
+        if key is not None:
+            file_name = f"{name}_{key[:16]}_feature_matrix"
+
+        file_path = save_feature_matrix(
+            feature_matrix,
+            Path(self.project_path, self.PATH_FEATURE_MATRICES, file_name),
+        )
 
         # Add the feature matrix to the project config.
         config = self.config
 
         feature_matrix_config = {
             "id": name,
-            "filename": file_name,
+            "filename": file_path.name,
         }
+        if key is not None:
+            feature_matrix_config["key"] = key
 
         # Add container for feature matrices.
         if "feature_matrices" not in config:
@@ -396,13 +469,17 @@ class Project:
 
         self.config = config
 
-    def get_feature_matrix(self, name):
+    def get_feature_matrix(self, name, key=None):
         """Get the feature matrix from the project file.
 
         Parameters
         ----------
         name : str
             Name of the feature extractor for which to get the cached matrix.
+        key : str
+            Key of the settings of the feature extractor. If None, the most
+            recently added feature matrix of the feature extractor is returned.
+            Default is None.
 
         Returns
         -------
@@ -410,25 +487,22 @@ class Project:
             (Sparse) feature matrix.
         """
         feature_matrix_config = [
-            x for x in self.config["feature_matrices"] if x["id"] == name
+            x
+            for x in self.config["feature_matrices"]
+            if x["id"] == name and (key is None or x.get("key") == key)
         ]
 
         if len(feature_matrix_config) == 0:
             raise ValueError("Feature matrix not found")
 
-        file_path = Path(
-            self.project_path,
-            self.PATH_FEATURE_MATRICES,
-            feature_matrix_config[0]["filename"],
+        return load_feature_matrix(
+            Path(
+                self.project_path,
+                self.PATH_FEATURE_MATRICES,
+                feature_matrix_config[-1]["filename"],
+            )
         )
 
-        if file_path.suffix == ".npz":
-            return sp.load_npz(str(file_path))
-        elif file_path.suffix == ".npy":
-            return np.load(file_path, allow_pickle=False)
-        else:
-            raise ValueError("Unsupported file extension")
-
     @property
     def review(self):
         return self.config.get("review")
@@ -497,27 +571,41 @@ class Project:
         return self.config.get("review", {}).get("model", {}).get("current_value")
 
     def export(self, export_fp):
-        if Path(export_fp).suffix != ".asreview":
+        """Export the project to a project file.
+
+        The files are written from the project folder to the archive one by one. The
+        database is exported from a snapshot made with the online backup of SQLite,
+        which includes the changes in the write-ahead log.
+
+        Parameters
+        ----------
+        export_fp : str | Path
+            Path of the project file, with the extension .asreview.
+        """
+        export_fp = Path(export_fp)
+
+        if export_fp.suffix != ".asreview":
             raise ValueError("Export file should have .asreview extension.")
 
-        if Path(export_fp) == Path(self.project_path):
+        if export_fp == Path(self.project_path):
             raise ValueError("export_fp should not be identical to project path.")
 
-        export_fp_tmp = Path(export_fp).with_suffix(".asreview.zip")
+        export_fp_tmp = export_fp.with_suffix(".asreview.zip")
+        db_fp_tmp = export_fp.with_suffix(".asreview.db")
 
-        # copy the source tree, but ignore pickle files
-        shutil.copytree(
-            self.project_path,
-            export_fp_tmp,
-            ignore=shutil.ignore_patterns("tmp", "*.lock"),
-        )
+        try:
+            with zipfile.ZipFile(export_fp_tmp, "w", zipfile.ZIP_DEFLATED) as zip_obj:
+                for fp, arcname in _iter_project_files(self.project_path):
+                    if arcname == self.PATH_DB:
+                        self.db.backup(db_fp_tmp)
+                        fp = db_fp_tmp
 
-        # create the archive
-        shutil.make_archive(export_fp_tmp, "zip", root_dir=export_fp_tmp)
+                    zip_obj.write(fp, arcname, compress_type=_compress_type(fp))
 
-        # remove the unzipped folder and move zip
-        shutil.rmtree(export_fp_tmp)
-        shutil.move(f"{export_fp_tmp}.zip", export_fp)
+            export_fp_tmp.replace(export_fp)
+        finally:
+            export_fp_tmp.unlink(missing_ok=True)
+            db_fp_tmp.unlink(missing_ok=True)
 
     @classmethod
     def load(
@@ -527,7 +615,14 @@ class Project:
         safe_import=False,
         reset_model_if_not_found=False,
     ):
-        with tempfile.TemporaryDirectory() as tmpdir:
+        project_path = Path(project_path)
+        project_path.mkdir(parents=True, exist_ok=True)
+
+        # The project is extracted to a hidden folder next to the projects, which is
+        # renamed to the project folder when the project is ready.
+        tmpdir = Path(tempfile.mkdtemp(prefix=".import-", dir=project_path))
+
+        try:
             try:
                 # Unzip the project file
                 with zipfile.ZipFile(asreview_file, "r") as zip_obj:
@@ -582,8 +677,19 @@ class Project:
                 with open(Path(tmpdir, cls.PATH_CONFIG), "w") as f:
                     json.dump(project_config, f)
 
-            shutil.copytree(tmpdir, Path(project_path, project_config["id"]))
-        return cls(Path(project_path, project_config["id"]))
+            project_fp = Path(project_path, project_config["id"])
+            if project_fp.exists():
+                raise FileExistsError(f"Project folder {project_fp} already exists.")
+
+            # close the connections to the database before moving it
+            dispose(tmpdir)
+            tmpdir.rename(project_fp)
+        except BaseException:
+            dispose(tmpdir)
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            raise
+
+        return cls(project_fp)
 
     def get_review_error(self):
         if self.error_path.exists():
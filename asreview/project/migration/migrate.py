@@ -1,9 +1,9 @@
 import json
 import logging
 import shutil
-import tempfile
 from pathlib import Path
 
+from asreview.database.connection import dispose
 from asreview.project.migration.v1v2 import _migrate as _migrate_v1v2
 from asreview.project.migration.v2v3 import _migrate as _migrate_v2v3
 from asreview.project.migration.v2v3 import _validate as _validate_v2v3
@@ -98,34 +98,38 @@ def _migrate_project_one_version(folder, current_version):
     else:
         raise ValueError("Invalid current version.")
 
-    with tempfile.TemporaryDirectory() as tmpdir:
-        shutil.copytree(
-            folder,
-            Path(tmpdir) / "tmp_project",
-            ignore=shutil.ignore_patterns("*.lock"),
-        )
+    # The project is migrated in a copy next to the project folder, so that the
+    # migrated project can be renamed to the project folder. The original project
+    # is moved into the migrated project.
+    tmp_project = folder.with_name(folder.name + ".migrate")
+    legacy = tmp_project / f"legacy_v{current_version}"
 
-        shutil.copytree(
-            folder,
-            Path(tmpdir) / "tmp_project" / f"legacy_v{current_version}",
-            ignore=shutil.ignore_patterns("*.lock"),
-        )
+    shutil.rmtree(tmp_project, ignore_errors=True)
+    shutil.copytree(folder, tmp_project, ignore=shutil.ignore_patterns("*.lock"))
+
+    # close the connections to the databases before moving them
+    dispose(folder)
+    try:
+        folder.rename(legacy)
+    except Exception:
+        shutil.rmtree(tmp_project)
+        raise
 
+    try:
         logging.info(
             f"Upgrading project {folder} from v{current_version} to v{current_version + 1}."
         )
-        migrate(Path(tmpdir) / "tmp_project")
+        migrate(tmp_project)
         if validate is not None:
-            validate(Path(tmpdir) / "tmp_project")
-
-        backup = folder.with_name(folder.name + ".backup")
-        shutil.move(folder, backup)
-        try:
-            shutil.move(Path(tmpdir) / "tmp_project", folder)
-        except Exception:
-            shutil.move(backup, folder)
-            raise
-        shutil.rmtree(backup)
+            validate(tmp_project)
+
+        dispose(tmp_project)
+        tmp_project.rename(folder)
+    except Exception:
+        dispose(tmp_project)
+        legacy.rename(folder)
+        shutil.rmtree(tmp_project)
+        raise
 
 
 def _is_empty_v2(folder, current_version):
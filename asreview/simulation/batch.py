@@ -0,0 +1,229 @@
+# Copyright 2019-2025 The ASReview Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Run simulations for a grid of configurations, seeds and prior knowledge.
+
+The feature matrix is computed once per feature extraction setting and stored
+in a temporary directory. The simulations run in a process pool and open the
+stored feature matrices memory-mapped, so all processes share them.
+"""
+
+__all__ = []
+
+import itertools
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from asreview.learner import ActiveLearningCycle
+from asreview.metrics import loss
+from asreview.metrics import ndcg
+from asreview.models.feature_cache import get_feature_extractor_key
+from asreview.models.feature_cache import load_feature_matrix
+from asreview.models.feature_cache import save_feature_matrix
+from asreview.models.queriers import TopDown
+from asreview.models.stoppers import IsFittable
+from asreview.simulation.simulate import Simulate
+
+
+def _get_metrics(results, n_records):
+    """Compute the loss and NDCG of the labels of a simulation.
+
+    The labels of the prior knowledge are left out and the unlabeled records are
+    added as irrelevant, like in the simulation output.
+    """
+    labels = results.loc[results["training_set"].notna(), "label"].tolist()
+    labels_padded = labels + [0] * (n_records - len(results))
+
+    try:
+        return loss(labels_padded), ndcg(labels_padded)
+    except ValueError:
+        return None, None
+
+
+def _run_simulation(run):
+    """Run a single simulation of the batch.
+
+    Parameters
+    ----------
+    run: dict
+        Settings of the simulation, see `simulate_batch`.
+
+    Returns
+    -------
+    dict:
+        Summary of the simulation.
+    """
+    if run["fp_feature_matrix"] is None:
+        fm = run["X"]
+    else:
+        fm = load_feature_matrix(run["fp_feature_matrix"])
+
+    np.random.seed(run["seed"])
+
+    cycles = [
+        ActiveLearningCycle(
+            querier=TopDown(),
+            stopper=IsFittable(),
+        ),
+        ActiveLearningCycle.from_meta(run["cycle_data"]),
+    ]
+
+    sim = Simulate(
+        fm,
+        run["labels"],
+        cycles,
+        stopper=run["stopper"],
+        skip_transform=True,
+        print_progress=False,
+    )
+    if len(run["prior_idx"]) > 0:
+        sim.label(run["prior_idx"])
+    sim.review()
+
+    results = sim._results
+    if run["fp_results"] is not None:
+        results.to_csv(run["fp_results"], index=False)
+
+    run_loss, run_ndcg = _get_metrics(results, len(run["labels"]))
+
+    return {
+        "run": run["run"],
+        "config": run["config"],
+        "classifier": run["cycle_data"].classifier,
+        "querier": run["cycle_data"].querier,
+        "balancer": run["cycle_data"].balancer,
+        "feature_extractor": run["cycle_data"].feature_extractor,
+        "seed": run["seed"],
+        "priors": run["priors"],
+        "n_labeled": len(results),
+        "n_relevant_found": int(results["label"].sum()),
+        "loss": run_loss,
+        "ndcg": run_ndcg,
+        "results": None if run["fp_results"] is None else run["fp_results"].name,
+    }
+
+
+def simulate_batch(
+    X,
+    labels,
+    cycle_data,
+    seeds=(None,),
+    priors=((),),
+    stopper=None,
+    output=None,
+    n_jobs=None,
+    feature_cache=None,
+):
+    """Run simulations for all combinations of configurations, seeds and priors.
+
+    Parameters
+    ----------
+    X: pandas.DataFrame
+        The input data of the feature extractors.
+    labels: numpy.ndarray, pandas.Series, list
+        The labels to use for the simulations.
+    cycle_data: list[ActiveLearningCycleData]
+        The active learning cycle configurations to simulate.
+    seeds: list[int]
+        The global random seeds of the simulations. Default is a single
+        simulation without seed.
+    priors: list[list[int]]
+        The sets of prior knowledge (row numbers) of the simulations. Default is
+        a single simulation without prior knowledge.
+    stopper: int, BaseStopper
+        The stopping mechanism of the simulations, see `Simulate`. Default is None.
+    output: str, Path
+        Directory to store the results of each simulation and the summary table
+        in. If None, the results are not stored. Default is None.
+    n_jobs: int
+        The number of simulations to run in parallel. If None, the number of
+        processors of the machine is used. Default is None.
+    feature_cache: FeatureMatrixCache
+        Cache to get the feature matrices from or store them in. If None, the
+        feature matrices are always computed. Default is None.
+
+    Returns
+    -------
+    pandas.DataFrame:
+        Summary table with a row for each simulation, including the loss and
+        NDCG of the simulation.
+    """
+    labels = np.asarray(labels)
+
+    if output is not None:
+        output = Path(output)
+        output.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # compute each feature matrix once and share it between the simulations
+        fp_feature_matrices = []
+        feature_matrices = {}
+        for data in cycle_data:
+            if data.feature_extractor is None:
+                fp_feature_matrices.append(None)
+                continue
+
+            feature_extractor = ActiveLearningCycle.from_meta(data).feature_extractor
+            key = get_feature_extractor_key(feature_extractor)
+
+            if key not in feature_matrices:
+                if feature_cache is not None:
+                    fm = feature_cache.fit_transform(feature_extractor, X)
+                else:
+                    fm = feature_extractor.fit_transform(X)
+
+                feature_matrices[key] = save_feature_matrix(fm, Path(tmpdir, key))
+
+            fp_feature_matrices.append(feature_matrices[key])
+
+        # only pass the input data to simulations without feature extraction
+        X_values = X.values if isinstance(X, pd.DataFrame) else X
+
+        runs = []
+        for i, ((config, data), seed, (prior, prior_idx)) in enumerate(
+            itertools.product(enumerate(cycle_data), seeds, enumerate(priors))
+        ):
+            runs.append(
+                {
+                    "run": i,
+                    "config": config,
+                    "cycle_data": data,
+                    "fp_feature_matrix": fp_feature_matrices[config],
+                    "X": X_values if fp_feature_matrices[config] is None else None,
+                    "labels": labels,
+                    "seed": seed,
+                    "priors": prior,
+                    "prior_idx": list(prior_idx),
+                    "stopper": stopper,
+                    "fp_results": None
+                    if output is None
+                    else Path(output, f"run_{i}.csv"),
+                }
+            )
+
+        if n_jobs == 1:
+            summary = [_run_simulation(run) for run in runs]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                summary = list(executor.map(_run_simulation, runs))
+
+    summary = pd.DataFrame(summary)
+    if output is not None:
+        summary.to_csv(Path(output, "summary.csv"), index=False)
+
+    return summary
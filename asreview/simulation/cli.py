@@ -18,6 +18,7 @@ import contextlib
 import logging
 import re
 import shutil
+from dataclasses import replace
 from pathlib import Path
 
 import numpy as np
@@ -27,12 +28,14 @@ from asreview import load_dataset
 from asreview.datasets import DatasetManager
 from asreview.learner import ActiveLearningCycle
 from asreview.learner import ActiveLearningCycleData
+from asreview.models.feature_cache import FeatureMatrixCache
 from asreview.models.models import get_ai_config
 from asreview.models.queriers import TopDown
 from asreview.models.stoppers import IsFittable
 from asreview.models.stoppers import LastRelevant
 from asreview.models.stoppers import NLabeled
 from asreview.project.api import Project
+from asreview.simulation.batch import simulate_batch
 from asreview.simulation.simulate import Simulate
 from asreview.utils import _format_to_str
 from asreview.utils import _read_config_file
@@ -47,6 +50,17 @@ def _set_log_verbosity(verbose):
         logging.getLogger().setLevel(logging.DEBUG)
 
 
+def _get_feature_cache(path):
+    """Get the feature matrix cache of the --feature-cache option.
+
+    Returns None if the option is not used. Without a path, the cache is stored
+    in ASREVIEW_CACHE_PATH or ~/.cache/asreview.
+    """
+    if path is None:
+        return None
+    return FeatureMatrixCache(path or None)
+
+
 def _convert_id_to_idx(db, record_id):
     """Convert record_id to row number."""
 
@@ -108,6 +122,52 @@ def _print_record(record, use_cli_colors=True):
     print(f"\n{header:-<60}\n{title}{authors}{abstract}")
 
 
+def _get_dataset_filename(dataset):
+    """Get a name for the dataset."""
+    if re.match(r"^([a-zA-Z0-9_-]+)\:([a-zA-Z0-9_-]+)$", dataset):
+        return DatasetManager().find(dataset).filename
+
+    return Path(dataset).name
+
+
+def _sample_prior_idx(labels, n_prior_included, n_prior_excluded, prior_seed):
+    """Sample prior knowledge from the included and excluded records.
+
+    Returns
+    -------
+    numpy.ndarray:
+        Row numbers of the sampled included records followed by the sampled
+        excluded records.
+    """
+    prior_idx = []
+
+    if n_prior_included > 0:
+        r = check_random_state(prior_seed)
+
+        included_idx = np.where(labels == 1)[0]
+        if len(included_idx) < n_prior_included:
+            raise ValueError(
+                f"Number of included priors requested ({n_prior_included})"
+                f" is bigger than number of included records "
+                f"({len(included_idx)})."
+            )
+        prior_idx.append(r.choice(included_idx, n_prior_included, replace=False))
+
+    if n_prior_excluded > 0:
+        r = check_random_state(prior_seed)
+
+        excluded_idx = np.where(labels == 0)[0]
+        if len(excluded_idx) < n_prior_excluded:
+            raise ValueError(
+                f"Number of excluded priors requested ({n_prior_excluded})"
+                f" is bigger than number of excluded records "
+                f"({len(excluded_idx)})."
+            )
+        prior_idx.append(r.choice(excluded_idx, n_prior_excluded, replace=False))
+
+    return np.concatenate(prior_idx) if prior_idx else np.array([], dtype=int)
+
+
 def _cli_simulate(argv):
     # parse arguments
     parser = _simulate_parser()
@@ -119,12 +179,7 @@ def _cli_simulate(argv):
     if args.output and Path(args.output).exists():
         raise ValueError("Project path already exists.")
 
-    # Get a name for the dataset
-    if re.match(r"^([a-zA-Z0-9_-]+)\:([a-zA-Z0-9_-]+)$", args.dataset):
-        ds = DatasetManager().find(args.dataset)
-        filename = ds.filename
-    else:
-        filename = Path(args.dataset).name
+    filename = _get_dataset_filename(args.dataset)
 
     # set the seeds
     np.random.seed(args.seed)
@@ -138,19 +193,32 @@ def _cli_simulate(argv):
     ):
         raise ValueError("Not possible to provide both prior-idx and prior-record-id")
 
+    if args.resume and args.output is None:
+        raise ValueError("Resuming a simulation is only possible with --output.")
+
     with contextlib.ExitStack() as stack:
         if args.output is not None:
             # write all results to the project file
             fp_tmp_simulation = Path(args.output).with_suffix(".asreview.tmp")
 
-            project = Project.create(
-                fp_tmp_simulation,
-                project_id=Path(args.output).stem,
-                project_mode="simulate",
-                project_name=Path(args.output).stem,
-            )
-            stack.enter_context(project)
-            project.add_dataset(args.dataset, dataset_id=filename)
+            if args.resume and fp_tmp_simulation.exists():
+                project = Project(fp_tmp_simulation, project_id=Path(args.output).stem)
+                stack.enter_context(project)
+            else:
+                if fp_tmp_simulation.exists():
+                    raise ValueError(
+                        f"Unfinished simulation found at {fp_tmp_simulation}. Use "
+                        "--resume to continue it or remove it to start over."
+                    )
+
+                project = Project.create(
+                    fp_tmp_simulation,
+                    project_id=Path(args.output).stem,
+                    project_mode="simulate",
+                    project_name=Path(args.output).stem,
+                )
+                stack.enter_context(project)
+                project.add_dataset(args.dataset, dataset_id=filename)
             db = project.db
         else:
             db = load_dataset(args.dataset, dataset_id=filename)
@@ -175,6 +243,9 @@ def _cli_simulate(argv):
         else:
             cycle_meta = get_ai_config(args.ai.lower())["value"]
 
+        if args.incremental:
+            cycle_meta = replace(cycle_meta, incremental=True)
+
         cycles = [
             ActiveLearningCycle(
                 querier=TopDown(),
@@ -191,44 +262,50 @@ def _cli_simulate(argv):
             cycles,
             stopper=stopper,
             groups=groups,
+            feature_cache=_get_feature_cache(args.feature_cache),
+            checkpoint_fp=None if args.output is None else project.db_path,
+            checkpoint_every=args.checkpoint_every,
+            checkpoint_interval=args.checkpoint_interval,
         )
 
-        # select or sample prior knowledge and then label it
-        if len(prior_idx) > 0:
-            print("Selected prior knowledge via --prior-idx:\n")
-            for record in db.input.get_records(prior_idx):
-                _print_record(record)
-
-            sim.label(prior_idx)
-
-        if args.n_prior_included > 0:
-            r = check_random_state(args.prior_seed)
-
-            included_idx = np.where(db.input["included"] == 1)[0]
-            if len(included_idx) < args.n_prior_included:
-                raise ValueError(
-                    f"Number of included priors requested ({args.n_prior_included})"
-                    f" is bigger than number of included records "
-                    f"({len(included_idx)})."
-                )
-            sim.label(r.choice(included_idx, args.n_prior_included, replace=False))
-
-        if args.n_prior_excluded > 0:
-            r = check_random_state(args.prior_seed)
-
-            excluded_idx = np.where(db.input["included"] == 0)[0]
-            if len(excluded_idx) < args.n_prior_excluded:
-                raise ValueError(
-                    f"Number of excluded priors requested ({args.n_prior_excluded})"
-                    f" is bigger than number of excluded records "
-                    f"({len(excluded_idx)})."
-                )
-            sim.label(r.choice(excluded_idx, args.n_prior_excluded, replace=False))
+        finished = False
+        if args.resume and sim.load_checkpoint():
+            print(f"Resuming simulation with {len(sim._results)} labeled records.")
+        elif args.resume and len(db.get_results_table(columns=["record_id"])) > 0:
+            # the final checkpoint removes the state of the simulation, so results
+            # without a checkpoint are the results of a finished simulation
+            print("Simulation already finished, exporting the results.")
+            finished = True
+        else:
+            # select or sample prior knowledge and then label it
+            if len(prior_idx) > 0:
+                print("Selected prior knowledge via --prior-idx:\n")
+                for record in db.input.get_records(prior_idx):
+                    _print_record(record)
+
+                sim.label(prior_idx)
+
+            sampled_prior_idx = _sample_prior_idx(
+                db.input["included"],
+                args.n_prior_included,
+                args.n_prior_excluded,
+                args.prior_seed,
+            )
+            if len(sampled_prior_idx) > 0:
+                sim.label(sampled_prior_idx)
 
-        sim.review()
+        if not finished:
+            sim.review()
 
         if args.output is not None:
-            project.add_review(reviewer=sim, status="finished")
+            # the review is already added if the export of a finished simulation
+            # was interrupted
+            if project.review is None:
+                project.add_review(
+                    cycle=cycle_meta,
+                    reviewer=None if finished else sim,
+                    status="finished",
+                )
 
             project.export(args.output)
             shutil.rmtree(fp_tmp_simulation)
@@ -237,6 +314,55 @@ def _cli_simulate(argv):
             print("\nTo store the results, use the -o option. E.g. -o my_sim.asreview")
 
 
+def _cli_simulate_batch(argv):
+    # parse arguments
+    parser = _simulate_batch_parser()
+    args = parser.parse_args(argv)
+
+    # change the verbosity
+    _set_log_verbosity(args.verbose)
+
+    if args.output and Path(args.output).exists():
+        raise ValueError("Output path already exists.")
+
+    cycle_data = [
+        ActiveLearningCycleData(**_read_config_file(fp)) for fp in args.config_file
+    ]
+    cycle_data.extend(get_ai_config(ai.lower())["value"] for ai in args.ai)
+    if len(cycle_data) == 0:
+        cycle_data.append(get_ai_config()["value"])
+
+    with load_dataset(
+        args.dataset, dataset_id=_get_dataset_filename(args.dataset)
+    ) as db:
+        X = db.input.get_df()
+        labels = db.input["included"]
+
+    if args.n_prior_included > 0 or args.n_prior_excluded > 0:
+        priors = [
+            _sample_prior_idx(
+                labels, args.n_prior_included, args.n_prior_excluded, prior_seed
+            )
+            for prior_seed in args.prior_seed
+        ]
+    else:
+        priors = [[]]
+
+    summary = simulate_batch(
+        X,
+        labels,
+        cycle_data,
+        seeds=args.seed,
+        priors=priors,
+        stopper=args.n_stop,
+        output=args.output,
+        n_jobs=args.n_jobs,
+        feature_cache=_get_feature_cache(args.feature_cache),
+    )
+
+    print(summary.to_string(index=False))
+
+
 DESCRIPTION_SIMULATE = """
 ASReview for simulation.
 
@@ -348,12 +474,51 @@ def _simulate_parser(prog="simulate", description=DESCRIPTION_SIMULATE):
         help="The number of label actions to simulate. If not set, simulation stops "
         "after last relevant was found. Use -1 to simulate all label actions. Default: None.",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update the classifier with the new labels instead of fitting it from "
+        "scratch each iteration, if the classifier supports this (nb, logistic).",
+    )
     parser.add_argument(
         "--group-similar-records",
         action="store_true",
         help="Put identical records in groups and label these records at the same time.",
     )
 
+    parser.add_argument(
+        "--feature-cache",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="Reuse the feature matrix of earlier simulations with the same dataset "
+        "and feature extraction settings. The feature matrices are stored in PATH, "
+        "or in ASREVIEW_CACHE_PATH or ~/.cache/asreview if no path is given. The "
+        "least recently used feature matrices are removed when the cache exceeds "
+        "5 GiB. Default: no cache.",
+    )
+
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        help="Write the results and state of the simulation to the project file "
+        "every n queries. Only used with --output. Default: None.",
+    )
+    parser.add_argument(
+        "--checkpoint-interval",
+        default=300,
+        type=float,
+        help="Write the results and state of the simulation to the project file "
+        "every n seconds. Only used with --output. Default: 300.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted simulation from the last checkpoint in the "
+        "unfinished project file of --output. Use the same arguments as the "
+        "interrupted simulation.",
+    )
+
     # configuration file
     parser.add_argument(
         "--config-file",
@@ -373,3 +538,100 @@ def _simulate_parser(prog="simulate", description=DESCRIPTION_SIMULATE):
         "--verbose", "-v", default=0, type=int, help="Verbosity. Default: 0."
     )
     return parser
+
+
+DESCRIPTION_SIMULATE_BATCH = """
+ASReview for batch simulation.
+
+Simulate all combinations of the given model configurations, seeds and prior
+knowledge in parallel. The feature matrix is computed once for each feature
+extraction setting and shared between the simulations."""
+
+
+def _simulate_batch_parser(
+    prog="simulate-batch", description=DESCRIPTION_SIMULATE_BATCH
+):
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description=description,
+        formatter_class=argparse.RawTextHelpFormatter,
+    )
+    parser.add_argument(
+        "dataset",
+        type=str,
+        help="File path to the dataset or one of the benchmark datasets.",
+    )
+    parser.add_argument(
+        "--config-file",
+        default=[],
+        nargs="+",
+        type=Path,
+        help="Configuration files for the learning cycles to simulate.",
+    )
+    parser.add_argument(
+        "--ai",
+        default=[],
+        nargs="+",
+        type=str,
+        help="The AIs to simulate with. If no --config-file and --ai are given, "
+        f"'{get_ai_config()['name']}' is used.",
+    )
+    parser.add_argument(
+        "--seed",
+        default=[None],
+        nargs="+",
+        type=int,
+        help="Seeds for the model. Each seed is simulated with each configuration. "
+        "Default: None.",
+    )
+    parser.add_argument(
+        "--n-prior-included",
+        default=0,
+        type=int,
+        help="Sample n prior included records. Default: 0.",
+    )
+    parser.add_argument(
+        "--n-prior-excluded",
+        default=0,
+        type=int,
+        help="Sample n prior excluded records. Default: 0.",
+    )
+    parser.add_argument(
+        "--prior-seed",
+        default=[None],
+        nargs="+",
+        type=int,
+        help="Seeds for selecting prior records. Each seed gives a set of prior "
+        "records that is simulated with each configuration. Default: None.",
+    )
+    parser.add_argument(
+        "--n-stop",
+        type=int,
+        help="The number of label actions to simulate. If not set, simulations stop "
+        "after last relevant was found. Use -1 to simulate all label actions. Default: None.",
+    )
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        help="Number of simulations to run in parallel. Default: number of processors.",
+    )
+    parser.add_argument(
+        "--feature-cache",
+        nargs="?",
+        const="",
+        metavar="PATH",
+        help="Reuse the feature matrices of earlier simulations from the cache in "
+        "PATH, or in ASREVIEW_CACHE_PATH or ~/.cache/asreview if no path is given. "
+        "The cache is bounded to 5 GiB. Default: no cache.",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        type=str,
+        help="Directory to store the results of each simulation (run_<n>.csv) and "
+        "the summary table (summary.csv).",
+    )
+    parser.add_argument(
+        "--verbose", "-v", default=0, type=int, help="Verbosity. Default: 0."
+    )
+    return parser
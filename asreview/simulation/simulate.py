@@ -14,8 +14,10 @@
 
 __all__ = []
 
+import pickle
 import time
 from collections import defaultdict
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
@@ -149,6 +151,239 @@ def _assert_no_conflicts_in_groups(labels, groups):
         group_to_label[group_id] = label
 
 
+RESULTS_COLUMNS = [
+    "record_id",
+    "label",
+    "classifier",
+    "querier",
+    "balancer",
+    "feature_extractor",
+    "training_set",
+    "time",
+    "note",
+    "tags",
+    "user_id",
+]
+
+
+class _ResultsBuffer:
+    """Preallocated columnar store for the results of a simulation.
+
+    Appending a batch of labeled records costs O(batch size) (amortized), instead
+    of copying the full results table on every step. The pandas DataFrame with the
+    results is only constructed when requested with :meth:`to_frame`.
+
+    Parameters
+    ----------
+    labels: numpy.ndarray, pandas.Series, list
+        The labels of all records in the dataset.
+    """
+
+    def __init__(self, labels):
+        self._labels = pd.Series(labels).reset_index(drop=True)
+        self._label_values = self._labels.to_numpy()
+        if self._label_values.dtype == object:
+            self._label_values = self._labels.to_numpy(dtype="float64", na_value=np.nan)
+
+        n_records = len(self._labels)
+        self._n = 0
+        self._record_id = np.empty(n_records, dtype=np.int64)
+        self._label = np.empty(n_records, dtype=self._label_values.dtype)
+        self._training_set = np.empty(n_records, dtype=np.int64)
+        self._has_training_set = np.empty(n_records, dtype=bool)
+        self._time = np.empty(n_records, dtype=np.float64)
+        self._model_code = np.empty(n_records, dtype=np.int64)
+        self._models = []
+
+        self.labeled = np.zeros(n_records, dtype=bool)
+        self._pool = None
+        self._frame = None
+
+    def __len__(self):
+        return self._n
+
+    @property
+    def record_id(self):
+        return self._record_id[: self._n]
+
+    @property
+    def label(self):
+        return self._label[: self._n]
+
+    @property
+    def has_training_set(self):
+        return self._has_training_set[: self._n]
+
+    @property
+    def pool(self):
+        """Record ids of the unlabeled records in ascending order."""
+        if self._pool is None:
+            self._pool = np.flatnonzero(~self.labeled)
+        return self._pool
+
+    def _reserve(self, n_new):
+        capacity = len(self._record_id)
+        if self._n + n_new <= capacity:
+            return
+
+        new_capacity = max(2 * capacity, self._n + n_new)
+        for name in [
+            "_record_id",
+            "_label",
+            "_training_set",
+            "_has_training_set",
+            "_time",
+            "_model_code",
+        ]:
+            old = getattr(self, name)
+            new = np.empty(new_capacity, dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
+    def append(self, record_ids, models, training_set, labeling_time):
+        """Append a batch of labeled records to the buffer.
+
+        Parameters
+        ----------
+        record_ids: numpy.ndarray
+            The record ids of the labeled records.
+        models: tuple
+            The names of the classifier, querier, balancer and feature extractor.
+        training_set: int, None
+            The size of the training set for these records.
+        labeling_time: float
+            The time of labeling.
+        """
+        record_ids = np.asarray(record_ids, dtype=np.int64)
+        n_new = len(record_ids)
+        self._reserve(n_new)
+
+        try:
+            model_code = self._models.index(models)
+        except ValueError:
+            model_code = len(self._models)
+            self._models.append(models)
+
+        new = slice(self._n, self._n + n_new)
+        self._record_id[new] = record_ids
+        self._label[new] = self._label_values[record_ids]
+        self._training_set[new] = 0 if training_set is None else training_set
+        self._has_training_set[new] = training_set is not None
+        self._time[new] = labeling_time
+        self._model_code[new] = model_code
+        self._n += n_new
+
+        self.labeled[record_ids] = True
+        self._pool = None
+        self._frame = None
+
+    def view(self):
+        """Lightweight DataFrame with the record_id and label of the results."""
+        return pd.DataFrame(
+            {"record_id": self.record_id, "label": self.label}, copy=False
+        )
+
+    def to_frame(self, start=0):
+        """Materialize the results as a pandas DataFrame.
+
+        Parameters
+        ----------
+        start: int
+            Only return the results from this position onwards.
+
+        Returns
+        -------
+        pd.DataFrame
+            The results with the same columns and dtypes as the results table
+            built by pandas concatenation. The frame is a copy, changing it doesn't
+            change the buffer.
+        """
+        if start == 0 and self._frame is not None:
+            return self._frame.copy()
+
+        if self._n - start == 0:
+            return pd.DataFrame(columns=RESULTS_COLUMNS)
+
+        rows = slice(start, self._n)
+
+        training_set = self._training_set[rows]
+        has_training_set = self._has_training_set[rows]
+        if not has_training_set.all():
+            training_set = training_set.astype(object)
+            training_set[~has_training_set] = None
+
+        models = np.empty((len(self._models), 4), dtype=object)
+        models[:] = self._models
+        models = models[self._model_code[rows]]
+
+        n_rows = self._n - start
+        df = pd.DataFrame(
+            {
+                "record_id": self._record_id[rows].copy(),
+                "label": self._labels.array.take(self._record_id[rows]),
+                "classifier": models[:, 0],
+                "querier": models[:, 1],
+                "balancer": models[:, 2],
+                "feature_extractor": models[:, 3],
+                "training_set": training_set,
+                "time": self._time[rows].copy(),
+                "note": np.full(n_rows, None, dtype=object),
+                "tags": np.full(n_rows, None, dtype=object),
+                "user_id": np.full(n_rows, None, dtype=object),
+            }
+        )
+
+        if start == 0:
+            self._frame = df
+            return df.copy()
+        return df
+
+    @classmethod
+    def from_frame(cls, results, labels):
+        """Create a buffer from an existing results DataFrame.
+
+        Parameters
+        ----------
+        results: pd.DataFrame
+            The results table, for example as returned by :meth:`to_frame`.
+        labels: numpy.ndarray, pandas.Series, list
+            The labels of all records in the dataset.
+
+        Returns
+        -------
+        _ResultsBuffer
+            Buffer containing the results.
+        """
+        buffer = cls(labels)
+        n_rows = len(results)
+        buffer._reserve(n_rows)
+
+        record_ids = results["record_id"].to_numpy(dtype=np.int64)
+        training_set = pd.to_numeric(results["training_set"]).astype("Float64")
+
+        for row, models in enumerate(
+            results[["classifier", "querier", "balancer", "feature_extractor"]]
+            .astype(object)
+            .itertuples(index=False, name=None)
+        ):
+            models = tuple(None if pd.isna(m) else m for m in models)
+            try:
+                buffer._model_code[row] = buffer._models.index(models)
+            except ValueError:
+                buffer._model_code[row] = len(buffer._models)
+                buffer._models.append(models)
+
+        buffer._record_id[:n_rows] = record_ids
+        buffer._label[:n_rows] = buffer._label_values[record_ids]
+        buffer._training_set[:n_rows] = training_set.fillna(0).to_numpy(dtype=np.int64)
+        buffer._has_training_set[:n_rows] = training_set.notna().to_numpy()
+        buffer._time[:n_rows] = results["time"].to_numpy(dtype=np.float64)
+        buffer._n = n_rows
+
+        buffer.labeled[record_ids] = True
+        return buffer
+
+
 class Simulate:
     """ASReview simulation class.
 
@@ -185,6 +420,19 @@ class Simulate:
     groups: list[tuple[int, int]] | None
         List of tuples (group_id, record_id). If this is not None, records in the same
         group will be labeled at the same time in the simulation.
+    feature_cache: FeatureMatrixCache | None
+        Cache to get the feature matrix from or store it in. If None, the feature
+        matrix is always computed. Default is None.
+    checkpoint_fp: str, Path | None
+        Path of the database to write checkpoints of the simulation to. The new
+        results are appended to the results table and the state of the cycles and
+        the global random state are stored, see `load_checkpoint`. If None, no
+        checkpoints are written. Default is None.
+    checkpoint_every: int | None
+        Write a checkpoint every n queries. Default is None.
+    checkpoint_interval: float | None
+        Write a checkpoint when the last checkpoint is older than this number of
+        seconds. Default is 300.
     """
 
     def __init__(
@@ -196,6 +444,10 @@ class Simulate:
         skip_transform=False,
         print_progress=True,
         groups=None,
+        feature_cache=None,
+        checkpoint_fp=None,
+        checkpoint_every=None,
+        checkpoint_interval=300,
     ):
         self.X = X
         self.labels = labels
@@ -211,16 +463,22 @@ class Simulate:
                     f"Groups should not contain conflicting labels: {e}"
                 ) from e
         self.groups = groups
+        self.feature_cache = feature_cache
+        self.checkpoint_fp = checkpoint_fp
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self._n_checkpointed = 0
+        self._checkpoint_final = False
 
     @property
     def _results(self):
-        if not hasattr(self, "_Simulate__results"):
+        if not hasattr(self, "_results_buffer"):
             raise AttributeError("No results. Label records or call review.")
-        return self._Simulate__results
+        return self._results_buffer.to_frame()
 
     @_results.setter
     def _results(self, value):
-        self._Simulate__results = value
+        self._results_buffer = _ResultsBuffer.from_frame(value, self.labels)
 
     @property
     def _last_ranking(self):
@@ -235,31 +493,18 @@ class Simulate:
     def review(self):
         """Start the review process."""
 
-        if not hasattr(self, "_results"):
-            self._results = pd.DataFrame(
-                columns=[
-                    "record_id",
-                    "label",
-                    "classifier",
-                    "querier",
-                    "balancer",
-                    "feature_extractor",
-                    "training_set",
-                    "time",
-                    "note",
-                    "tags",
-                    "user_id",
-                ]
-            )
+        if not hasattr(self, "_results_buffer"):
+            self._results_buffer = _ResultsBuffer(self.labels)
+        results = self._results_buffer
 
         pbar_rel = tqdm(
-            initial=sum(self._results["label"]) if hasattr(self, "_results") else 0,
+            initial=results.label.sum(),
             total=sum(self.labels),
             desc="Relevant records found",
             disable=not self.print_progress,
         )
         pbar_total = tqdm(
-            initial=len(self._results) if hasattr(self, "_results") else 0,
+            initial=len(results),
             total=len(self.labels),
             desc="Records labeled       ",
             disable=not self.print_progress,
@@ -274,16 +519,24 @@ class Simulate:
 
         cycles = self.cycles if isinstance(self.cycles, list) else [self.cycles]
 
+        self._n_steps_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+
         for cycle in cycles:
             # first run the overall simulation until the default stopper is met
-            while not stopper.stop(self._results, self.labels) and not cycle.stop(
-                self._results, self.labels
+            while not stopper.stop(results.view(), self.labels) and not cycle.stop(
+                results.view(), self.labels
             ):
                 # compute the feature matrix for the labeled records if not in
                 # _X_features cache
                 if not hasattr(self, "_X_features"):
                     if not self.skip_transform and cycle.feature_extractor is not None:
-                        self._X_features = cycle.transform(self.X)
+                        if self.feature_cache is not None:
+                            self._X_features = self.feature_cache.fit_transform(
+                                cycle.feature_extractor, self.X
+                            )
+                        else:
+                            self._X_features = cycle.transform(self.X)
                     elif isinstance(self.X, pd.DataFrame):
                         self._X_features = self.X.values
                     else:
@@ -292,32 +545,36 @@ class Simulate:
                 # fit the estimator to the labeled records
                 if cycle.classifier is not None:
                     cycle.fit(
-                        self._X_features[self._results["record_id"].values],
-                        self._results["label"].values,
+                        self._X_features[results.record_id],
+                        results.label,
+                        record_ids=results.record_id,
                     )
 
                 # collect the records in the pool
-                pool_record_ids = np.setdiff1d(
-                    np.arange(len(self.labels)), self._results["record_id"].values
-                )
+                pool_record_ids = results.pool
 
-                # rank the pool and convert the ranked pool to record ids
-                ranked_pool = cycle.rank(self._X_features[pool_record_ids])
-                ranked_pool_record_ids = pool_record_ids[ranked_pool]
-
-                # label n_query records from the pool
-                n_query = cycle.get_n_query(self._results, self.labels)
+                # number of records to label from the pool
+                n_query = cycle.get_n_query(results.view(), self.labels)
                 if not isinstance(n_query, int) or n_query < 1:
                     raise ValueError(
                         f"Number of records to query should be an integer "
                         f"greater than 0, got {n_query}."
                     )
 
-                labeled = self.label(ranked_pool_record_ids[:n_query], cycle=cycle)
+                # rank the top of the pool and convert to record ids
+                ranked_pool = cycle.rank(self._X_features[pool_record_ids], n=n_query)
+                ranked_pool_record_ids = pool_record_ids[ranked_pool]
+
+                n_labeled = len(results)
+                self._label(ranked_pool_record_ids[:n_query], cycle=cycle)
 
-                pbar_rel.update(labeled["label"].sum())
+                pbar_rel.update(results.label[n_labeled:].sum())
                 pbar_total.update(n_query)
 
+                self._n_steps_since_checkpoint += 1
+                if self._is_checkpoint_due():
+                    self._checkpoint()
+
             else:
                 if hasattr(self, "_X_features"):
                     del self._X_features
@@ -326,9 +583,12 @@ class Simulate:
             pbar_rel.close()
             pbar_total.close()
 
-            padded_results = list(
-                self._results.dropna(axis=0, subset="training_set")["label"]
-            ) + [0] * (len(self.labels) - len(self._results["label"]))
+            if self.checkpoint_fp is not None:
+                self._checkpoint(final=True)
+
+            padded_results = list(results.label[results.has_training_set]) + [0] * (
+                len(self.labels) - len(results)
+            )
 
             if self.print_progress:
                 try:
@@ -340,72 +600,145 @@ class Simulate:
                         "Can't compute loss and gain for labels with only relevant or irrelevant records"
                     )
 
-    def label(self, record_ids, cycle=None):
-        """Label the records with the given record_ids.
+    def _label(self, record_ids, cycle=None):
+        """Append the labels of the records to the results buffer.
 
         Parameters
         ----------
         record_ids: list
             The record ids to label.
+        cycle: ActiveLearningCycle
+            The cycle that queried the records, None for prior knowledge.
 
+        Returns
+        -------
+        int
+            Position of the first new row in the results buffer.
         """
+        if not hasattr(self, "_results_buffer"):
+            self._results_buffer = _ResultsBuffer(self.labels)
+        results = self._results_buffer
 
         if cycle is None:
-            classifier = None
-            querier = None
-            balancer = None
-            feature_extractor = None
+            models = (None, None, None, None)
             training_set = None
         else:
-            classifier = _get_name_from_estimator(cycle.classifier)
-            querier = _get_name_from_estimator(cycle.querier)
-            balancer = _get_name_from_estimator(cycle.balancer)
-            feature_extractor = _get_name_from_estimator(cycle.feature_extractor)
-            training_set = len(self._results)
-
-        new_results = pd.DataFrame(
-            {
-                "record_id": record_ids,
-                "label": pd.Series(self.labels).iloc[record_ids],
-                "classifier": classifier,
-                "querier": querier,
-                "balancer": balancer,
-                "feature_extractor": feature_extractor,
-                "training_set": training_set,
-                "time": time.time(),
-                "note": None,
-                "tags": None,
-                "user_id": None,
-            }
-        )
+            models = (
+                _get_name_from_estimator(cycle.classifier),
+                _get_name_from_estimator(cycle.querier),
+                _get_name_from_estimator(cycle.balancer),
+                _get_name_from_estimator(cycle.feature_extractor),
+            )
+            training_set = len(results)
 
+        record_ids = np.asarray(record_ids, dtype=np.int64)
         if self.groups is not None:
-            record_info = list(new_results.itertuples(index=False, name=None))
-            group_record_info = _propagate_record_info(
-                record_info=record_info,
-                groups=self.groups,
-                return_only_new=True,
+            record_info = [(record_id,) for record_id in record_ids.tolist()]
+            group_record_ids = [
+                record_id
+                for record_id, *_ in _propagate_record_info(
+                    record_info=record_info,
+                    groups=self.groups,
+                    return_only_new=True,
+                )
+            ]
+            record_ids = np.concatenate(
+                [record_ids, np.asarray(group_record_ids, dtype=np.int64)]
             )
 
-            if group_record_info:
-                new_results = pd.concat(
-                    [
-                        new_results,
-                        pd.DataFrame(group_record_info, columns=new_results.columns),
-                    ],
-                    ignore_index=True,
-                )
+        start = len(results)
+        results.append(record_ids, models, training_set, time.time())
+        return start
 
-        if not hasattr(self, "_results") or self._results.empty:
-            self._results = new_results
-        else:
-            self._results = pd.concat(
-                [self._results, new_results],
-                ignore_index=True,
-            )
+    def label(self, record_ids, cycle=None):
+        """Label the records with the given record_ids.
 
+        Parameters
+        ----------
+        record_ids: list
+            The record ids to label.
+
+        Returns
+        -------
+        pd.DataFrame
+            The results of the newly labeled records.
+        """
+        start = self._label(record_ids, cycle=cycle)
+        new_results = self._results_buffer.to_frame(start=start)
+
+        # keep the record ids as index of the new results when no group records
+        # were added, as in previous versions of the simulation
+        if self.groups is None:
+            new_results.index = new_results["record_id"].to_numpy()
         return new_results
 
+    def _is_checkpoint_due(self):
+        if self.checkpoint_fp is None:
+            return False
+
+        if (
+            self.checkpoint_every is not None
+            and self._n_steps_since_checkpoint >= self.checkpoint_every
+        ):
+            return True
+
+        return (
+            self.checkpoint_interval is not None
+            and time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+        )
+
+    def _checkpoint(self, final=False):
+        """Write the new results and the state of the simulation to the database.
+
+        Parameters
+        ----------
+        final: bool
+            If True, the simulation is finished. The new results are written and
+            the state of the simulation is removed from the database.
+        """
+        new_results = self._results_buffer.to_frame(start=self._n_checkpointed)
+        state = pickle.dumps(
+            {"cycles": self.cycles, "random_state": np.random.get_state()}
+        )
+
+        with open_db(Path(self.checkpoint_fp)) as db:
+            db._add_checkpoint(new_results, state)
+            if final:
+                db._delete_checkpoint()
+
+        self._n_checkpointed = len(self._results_buffer)
+        self._n_steps_since_checkpoint = 0
+        self._last_checkpoint = time.monotonic()
+        self._checkpoint_final = final
+
+    def load_checkpoint(self):
+        """Restore the simulation from the last checkpoint.
+
+        Restores the results, the cycles and the global random state, so that
+        `review` continues the simulation as if it was never interrupted. The
+        simulation should have the same data and settings as the simulation that
+        wrote the checkpoint.
+
+        Returns
+        -------
+        bool
+            True if the simulation was restored, False if there is no checkpoint.
+        """
+        with open_db(Path(self.checkpoint_fp)) as db:
+            checkpoint = db._get_checkpoint()
+
+        if checkpoint is None:
+            return False
+
+        results, state = checkpoint
+        state = pickle.loads(state)
+
+        self._results = results
+        self._n_checkpointed = len(results)
+        self.cycles = state["cycles"]
+        np.random.set_state(state["random_state"])
+        return True
+
     def to_sql(self, fp):
         """Write the data a sql file.
 
@@ -415,5 +748,11 @@ class Simulate:
             The path to the sqlite file to write the results to. If there is no database
             yet at the location a new database will be created.
         """
+        if self.checkpoint_fp is not None and Path(fp) == Path(self.checkpoint_fp):
+            # the results are already in the database, only add the remaining ones
+            if not self._checkpoint_final:
+                self._checkpoint(final=True)
+            return
+
         with open_db(fp) as db:
             db._replace_results_from_df(self._results)
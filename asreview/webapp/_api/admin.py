@@ -25,6 +25,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.exc import SQLAlchemyError
 
+from asreview.database.connection import dispose
 from asreview.webapp import DB
 from asreview.webapp._authentication.decorators import admin_required
 from asreview.webapp._authentication.models import Project
@@ -673,6 +674,7 @@ def batch_delete_projects():
             try:
                 import shutil
 
+                dispose(project_path)
                 shutil.rmtree(project_path)
                 deleted_directories += 1
             except Exception as e:
@@ -27,6 +27,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.exc import SQLAlchemyError
 
+from asreview.database.connection import dispose
 from asreview.webapp import DB
 from asreview.webapp._authentication.decorators import login_remote_user
 from asreview.webapp._authentication.decorators import login_required
@@ -556,6 +557,7 @@ def delete_account():
         user_projects = Project.query.filter_by(owner_id=user.id).all()
         for project in user_projects:
             if project.project_path.exists():
+                dispose(project.project_path)
                 shutil.rmtree(project.project_path)
 
         # delete user plus records in projects table
@@ -18,6 +18,7 @@ import hmac
 import json
 import logging
 import math
+import mimetypes
 import secrets
 import shutil
 import socket
@@ -33,12 +34,14 @@ import datahugger
 import numpy as np
 import pandas as pd
 from flask import Blueprint
+from flask import Response
 from flask import abort
 from flask import current_app
 from flask import jsonify
 from flask import request
 from flask import after_this_request
 from flask import send_file
+from flask import stream_with_context
 from flask_login import current_user
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.naive_bayes import MultinomialNB
@@ -56,6 +59,7 @@ from asreview.data import TSVWriter
 from asreview.data.search import fuzzy_find
 from asreview.data.utils import convert_ris_list_columns_to_string
 from asreview.data.utils import duplicated
+from asreview.database.connection import dispose
 from asreview.datasets import DatasetManager
 from asreview.extensions import extensions
 from asreview.extensions import load_extension
@@ -122,6 +126,42 @@ def _fill_last_ranking(project, ranking):
         db.add_last_ranking(ranked_record_ids.values, None, ranking, None, None)
 
 
+def _send_task_manager_message(payload, reply=False):
+    """Send a message to the task manager.
+
+    Parameters
+    ----------
+    payload: dict
+        The message to send.
+    reply: bool
+        Wait for the response of the task manager. Default False.
+
+    Returns
+    -------
+    dict | None
+        The response of the task manager if reply is True, or None if there is no
+        response within a second.
+    """
+    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        client_socket.settimeout(1.0)
+        client_socket.connect(
+            (
+                current_app.config.get("TASK_MANAGER_HOST", DEFAULT_TASK_MANAGER_HOST),
+                current_app.config.get("TASK_MANAGER_PORT", DEFAULT_TASK_MANAGER_PORT),
+            )
+        )
+        client_socket.sendall(json.dumps(payload).encode("utf-8"))
+        if not reply:
+            return None
+        try:
+            return json.loads(client_socket.recv(1024).decode("utf-8"))
+        except (TimeoutError, json.JSONDecodeError):
+            return None
+    finally:
+        client_socket.close()
+
+
 def _run_model(project):
     # if there is a socket, it means we would like to delegate
     # training / simulation to the queue manager,
@@ -130,28 +170,15 @@ def _run_model(project):
 
     if not current_app.testing:
         try:
-            client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            client_socket.connect(
-                (
-                    current_app.config.get(
-                        "TASK_MANAGER_HOST", DEFAULT_TASK_MANAGER_HOST
-                    ),
-                    current_app.config.get(
-                        "TASK_MANAGER_PORT", DEFAULT_TASK_MANAGER_PORT
-                    ),
-                )
+            _send_task_manager_message(
+                {
+                    "action": "insert",
+                    "project_id": project.config["id"],
+                    "simulation": simulation,
+                }
             )
-            payload = {
-                "action": "insert",
-                "project_id": project.config["id"],
-                "simulation": simulation,
-            }
-            # send
-            client_socket.sendall(json.dumps(payload).encode("utf-8"))
-        except socket.error:
+        except OSError:
             raise RuntimeError("Queue manager is not alive.")
-        finally:
-            client_socket.close()
 
     else:
         if simulation:
@@ -160,6 +187,33 @@ def _run_model(project):
             run_model(project)
 
 
+def _get_training_generations(project):
+    """Get the training generations of the project from the task manager.
+
+    Each request to train the model of a project increments the requested
+    generation. The trained generation is the requested generation at the start of
+    the last successful training task: the ranking of the project includes the
+    labels of all requests up to that generation.
+
+    Returns
+    -------
+    dict | None
+        Dictionary {"requested": int, "trained": int}, or None if the task manager
+        doesn't respond.
+    """
+    try:
+        response = _send_task_manager_message(
+            {"action": "generation_query", "project_id": project.config["id"]},
+            reply=True,
+        )
+    except OSError:
+        return None
+
+    if response is None:
+        return None
+    return {"requested": response["requested"], "trained": response["trained"]}
+
+
 def generate_invitation_token(project):
     """Generate an encoded invitation token from a project.
 
@@ -296,6 +350,7 @@ def api_create_project():  # noqa: F401
 
         except Exception as err:
             try:
+                dispose(get_project_path(project_id))
                 shutil.rmtree(get_project_path(project_id))
             except Exception:
                 pass
@@ -520,18 +575,20 @@ def api_search_data(project):  # noqa: F401
     if not q:
         return jsonify({"result": []})
 
-    search_data = project.db.input[["title", "authors", "keywords", "group_id"]]
-
     with project.db as db:
-        labeled_record_ids = db.get_results_table()["record_id"].to_list()
+        labeled_record_ids = db.get_results_table("record_id")["record_id"].to_list()
 
     record_ids = fuzzy_find(
-        search_data,
+        project.db.input,
         q,
         max_return=max_results,
         exclude=labeled_record_ids,
     )
-    group_ids = search_data.iloc[record_ids]["group_id"].unique().tolist()
+    group_ids = list(
+        dict.fromkeys(
+            record.group_id for record in project.db.input.get_records(record_ids)
+        )
+    )
 
     result = []
     records = project.db.input.get_records(group_ids)
@@ -555,52 +612,53 @@ def api_get_labeled(project):  # noqa: F401
     subset = request.args.get("subset", default="all", type=str)
     filters = request.args.getlist("filter", type=str)
     latest_first = request.args.get("latest_first", default=1, type=int)
+    # position of the last record of the previous page, see next_cursor
+    cursor = request.args.get("cursor", default=None, type=int)
 
-    with project.db as db:
-        if "is_prior" in filters:
-            state_data = db.get_priors()
-        else:
-            state_data = db.get_results_table()
-
-    if subset == "relevant":
-        state_data = state_data[state_data["label"] == 1]
-    elif subset == "irrelevant":
-        state_data = state_data[state_data["label"] == 0]
+    if page is not None:
+        # with a cursor, the page starts after the cursor instead of at an offset
+        page_kwargs = {
+            "limit": per_page,
+            "offset": 0 if cursor is not None else (page - 1) * per_page,
+            "after": cursor,
+        }
     else:
-        state_data = state_data[~state_data["label"].isnull()]
-
-    if "has_note" in filters:
-        state_data = state_data[~state_data["note"].isnull()]
+        page_kwargs = {}
 
-    if latest_first == 1:
-        state_data = state_data.iloc[::-1]
+    with project.db as db:
+        state_data, count = db.get_labeled_results(
+            label={"relevant": 1, "irrelevant": 0}.get(subset),
+            priors_only="is_prior" in filters,
+            has_note="has_note" in filters,
+            latest_first=latest_first == 1,
+            **page_kwargs,
+        )
 
     # count labeled records and max pages
-    if len(state_data) == 0:
+    if count == 0:
         payload = {
             "count": 0,
             "next_page": None,
             "previous_page": None,
+            "next_cursor": None,
             "result": [],
         }
         return jsonify(payload)
 
-    max_page = math.ceil(len(state_data) / per_page)
+    max_page = math.ceil(count / per_page)
 
     if page is not None:
         if page > max_page:
             return abort(404)
 
-        idx_start = (page - 1) * per_page
-        idx_end = page * per_page
-        state_data = state_data.iloc[idx_start:idx_end].copy()
-
         next_page = page + 1 if page < max_page else None
         previous_page = page - 1 if page > 1 else None
     else:
         next_page = None
         previous_page = None
 
+    next_cursor = int(state_data.index[-1]) if next_page and len(state_data) else None
+
     if current_app.config.get("AUTHENTICATION", True):
         project_entry = Project.query.filter(
             Project.project_id == project.project_id
@@ -618,11 +676,12 @@ def api_get_labeled(project):  # noqa: F401
         }
 
     records = project.db.input.get_records(state_data["record_id"].to_list())
+    tags_form = read_tags_data(project)
     result = []
     for (_, state), record in zip(state_data.iterrows(), records):
         record_d = asdict(record)
         record_d["state"] = state.to_dict()
-        record_d["tags_form"] = read_tags_data(project)
+        record_d["tags_form"] = tags_form
 
         if current_app.config.get("AUTHENTICATION", True):
             record_d["state"]["user"] = users.get(record_d["state"]["user_id"], None)
@@ -637,6 +696,7 @@ def api_get_labeled(project):  # noqa: F401
             "count": len(state_data),
             "next_page": next_page,
             "previous_page": previous_page,
+            "next_cursor": next_cursor,
             "result": result,
         }
     )
@@ -648,41 +708,31 @@ def api_get_labeled(project):  # noqa: F401
 def api_get_labeled_stats(project):  # noqa: F401
     """Get all records classified as prior documents"""
 
-    # Retrieve the include_priors parameter from the request's query.
-    include_priors = request.args.get("priors", True, type=bool)
-
     try:
         with project.db as db:
-            data = db.get_results_table(["label", "querier"])
-        data_prior = data[data["querier"].isnull()]
-
-        # If the 'include_priors' flag is set to False, filter out records that have a
-        # query strategy marked as prior.
-        if not include_priors:
-            data = data[data["querier"] != "prior"]
-
-        return jsonify(
-            {
-                "n": len(data),
-                "n_inclusions": int(sum(data["label"] == 1)),
-                "n_exclusions": int(sum(data["label"] == 0)),
-                "n_prior": len(data_prior),
-                "n_prior_inclusions": int(sum(data_prior["label"] == 1)),
-                "n_prior_exclusions": int(sum(data_prior["label"] == 0)),
-            }
-        )
+            stats = db.get_results_stats()
     except FileNotFoundError:
-        return jsonify(
-            {
-                "n": 0,
-                "n_inclusions": 0,
-                "n_exclusions": 0,
-                "n_prior": 0,
-                "n_prior_inclusions": 0,
-                "n_prior_exclusions": 0,
-            }
+        stats = dict.fromkeys(
+            ["n_included", "n_excluded", "n_prior_included", "n_prior_excluded"], 0
         )
 
+    # the numbers of inclusions and exclusions include the priors
+    n_prior_inclusions = stats["n_prior_included"]
+    n_prior_exclusions = stats["n_prior_excluded"]
+    n_inclusions = stats["n_included"] + n_prior_inclusions
+    n_exclusions = stats["n_excluded"] + n_prior_exclusions
+
+    return jsonify(
+        {
+            "n": n_inclusions + n_exclusions,
+            "n_inclusions": n_inclusions,
+            "n_exclusions": n_exclusions,
+            "n_prior": n_prior_inclusions + n_prior_exclusions,
+            "n_prior_inclusions": n_prior_inclusions,
+            "n_prior_exclusions": n_prior_exclusions,
+        }
+    )
+
 
 @bp.route("/learners", methods=["GET"])
 @login_required
@@ -799,6 +849,18 @@ def api_get_status(project):  # noqa: F401
     return jsonify({"status": project.review["status"]})
 
 
+@bp.route("/projects/<project_id>/generations", methods=["GET"])
+@login_required
+@project_authorization
+def api_get_generations(project):  # noqa: F401
+    """Get the training generations of the project from the task manager"""
+
+    if generations := _get_training_generations(project):
+        return jsonify(generations)
+
+    return jsonify(message="Task manager is not available."), 503
+
+
 @bp.route("/projects/<project_id>/review", methods=["GET"])
 @login_required
 @project_authorization
@@ -964,6 +1026,7 @@ def api_import_project():
     except Exception:
         if authenticated:
             DB.session.rollback()
+        dispose(project.project_path)
         shutil.rmtree(project.project_path, ignore_errors=True)
         raise
 
@@ -1078,6 +1141,11 @@ def update_tag_group(project, group_id):
         return jsonify(message="Failed to update tag group."), 500
 
 
+# Number of records per chunk of a dataset export. The export is streamed to the
+# client while the chunks are written.
+_EXPORT_CHUNK_SIZE = 10000
+
+
 def _flatten_tags(results, tags_config):
     if tags_config is None:
         del results["tags"]
@@ -1175,51 +1243,77 @@ def api_export_dataset(project):
 
     del df_results["user_id"]
 
-    df_user_input_data = project.read_input_data()
-
-    df_user_input_data = df_user_input_data.loc[
-        :, ~df_user_input_data.columns.str.startswith("asreview_")
-    ]
+    # Join the results to the group ids of all records first, so the data types of
+    # the columns are the same in all chunks of the export.
+    df_results = df_groups.join(
+        df_results.add_prefix("asreview_"), on="group_id", how="left"
+    )
+    if export_groups:
+        df_results = df_results.rename(columns={"group_id": "asreview_group_id"})
+    else:
+        df_results = df_results.drop(columns=["group_id"])
 
-    df_user_input_data = df_user_input_data.join(df_groups)
     # If the input is RIS and the output is CSV or Excel, we need to convert list
     # columns to strings to avoid too long lists being truncated and leading to corrupt
     # files.
     input_reader = project.get_input_data_reader()
     writer = load_extension("writers", f".{file_format}")
-    if issubclass(input_reader, RISReader) and issubclass(
+    convert_lists = issubclass(input_reader, RISReader) and issubclass(
         writer, (CSVWriter, TSVWriter, ExcelWriter)
-    ):
-        df_user_input_data = convert_ris_list_columns_to_string(df_user_input_data)
+    )
 
-    df_export = df_user_input_data.join(
-        df_results.add_prefix("asreview_"), on="group_id", how="left"
-    ).loc[export_order]
+    # Read the input data before the response is created, so an error gives an
+    # error response instead of a truncated file.
+    df_user_input_data = project.read_input_data()
+    columns = df_user_input_data.columns[
+        ~df_user_input_data.columns.str.startswith("asreview_")
+    ]
+    df_results.index.name = df_user_input_data.index.name
+
+    def iter_export_chunks():
+        # Build the export in ranking order, one chunk at a time. An export without
+        # records has one empty chunk, for the header.
+        for start in range(0, max(len(export_order), 1), _EXPORT_CHUNK_SIZE):
+            order = export_order[start : start + _EXPORT_CHUNK_SIZE]
+            df_chunk = df_user_input_data.loc[order, columns].copy()
+            if convert_lists:
+                df_chunk = convert_ris_list_columns_to_string(df_chunk)
+            yield pd.concat([df_chunk, df_results.loc[order]], axis=1)
+
+    download_name = (
+        f"asreview_{'_'.join(collections)}_"
+        f"{secure_filename(project.config['name'])}.{file_format}"
+    )
 
-    if export_groups:
-        df_export = df_export.rename(columns={"group_id": "asreview_group_id"})
-    else:
-        df_export = df_export.drop(columns=["group_id"])
+    if not hasattr(writer, "write_data_chunks"):
+        # Writers of file formats that can't be written in parts, like Excel,
+        # write the whole export to a temporary file first.
+        tmp_path = tempfile.mkdtemp()
+        tmp_path_dataset = Path(tmp_path, f"export_dataset.{file_format}")
 
-    tmp_path = tempfile.mkdtemp()
-    tmp_path_dataset = Path(tmp_path, f"export_dataset.{file_format}")
+        writer.write_data(pd.concat(iter_export_chunks()), tmp_path_dataset)
 
-    writer.write_data(df_export, tmp_path_dataset)
+        @after_this_request
+        def cleanup(response):
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            return response
 
-    @after_this_request
-    def cleanup(response):
-        shutil.rmtree(tmp_path, ignore_errors=True)
-        return response
+        return send_file(
+            tmp_path_dataset,
+            as_attachment=True,
+            max_age=0,
+            download_name=download_name,
+        )
 
-    return send_file(
-        tmp_path_dataset,
-        as_attachment=True,
-        max_age=0,
-        download_name=(
-            f"asreview_{'_'.join(collections)}_"
-            f"{secure_filename(project.config['name'])}.{file_format}"
-        ),
+    # Stream the export while it is written.
+    response = Response(
+        stream_with_context(writer.write_data_chunks(iter_export_chunks())),
+        mimetype=mimetypes.guess_type(download_name)[0] or "application/octet-stream",
     )
+    response.headers.set("Content-Disposition", "attachment", filename=download_name)
+    response.cache_control.no_cache = True
+    response.cache_control.max_age = 0
+    return response
 
 
 @bp.route("/projects/<project_id>/export_project", methods=["GET"])
@@ -1264,27 +1358,37 @@ def api_get_progress_info(project):  # noqa: F401
 
     try:
         with project.db as db:
-            labels = db.get_results_table(priors=include_priors)["label"]
-            labels_without_priors = db.get_results_table(priors=False)["label"]
+            stats = db.get_results_stats()
             n_records = len(project.db.input)
-        n_priors = len(labels) - len(labels_without_priors)
 
     except (FileNotFoundError, ValueError, ProjectError):
-        labels = np.array([])
-        labels_without_priors = np.array([])
+        stats = dict.fromkeys(
+            ["n_included", "n_excluded", "n_prior_included", "n_prior_excluded"], 0
+        )
         n_records = 0
 
+    n_included_no_priors = stats["n_included"]
+    n_excluded_no_priors = stats["n_excluded"]
+    if include_priors:
+        n_priors = stats["n_prior_included"] + stats["n_prior_excluded"]
+        n_included = n_included_no_priors + stats["n_prior_included"]
+        n_excluded = n_excluded_no_priors + stats["n_prior_excluded"]
+    else:
+        n_priors = 0
+        n_included = n_included_no_priors
+        n_excluded = n_excluded_no_priors
+    n_labeled = n_included + n_excluded
+
     if (
         project.config.get("mode") == asr.Project.MODE_SIMULATE
-        and project.db.input["included"].sum() == labels.sum()
+        and project.db.input["included"].sum() == n_included
     ):
         return jsonify(
             {
-                "n_included": int(sum(labels == 1)),
-                "n_excluded": n_records - int(sum(labels == 1)),
-                "n_included_no_priors": int(sum(labels_without_priors == 1)),
-                "n_excluded_no_priors": int(sum(labels_without_priors == 0))
-                + (n_records - len(labels)),
+                "n_included": n_included,
+                "n_excluded": n_records - n_included,
+                "n_included_no_priors": n_included_no_priors,
+                "n_excluded_no_priors": n_excluded_no_priors + (n_records - n_labeled),
                 "n_records": n_records,
                 "n_records_no_priors": n_records - n_priors,
                 "n_pool": 0,
@@ -1293,13 +1397,13 @@ def api_get_progress_info(project):  # noqa: F401
 
     return jsonify(
         {
-            "n_included": int(sum(labels == 1)),
-            "n_excluded": int(sum(labels == 0)),
-            "n_included_no_priors": int(sum(labels_without_priors == 1)),
-            "n_excluded_no_priors": int(sum(labels_without_priors == 0)),
+            "n_included": n_included,
+            "n_excluded": n_excluded,
+            "n_included_no_priors": n_included_no_priors,
+            "n_excluded_no_priors": n_excluded_no_priors,
             "n_records": n_records,
             "n_records_no_priors": n_records - n_priors,
-            "n_pool": n_records - len(labels),
+            "n_pool": n_records - n_labeled,
         }
     )
 
@@ -1316,8 +1420,9 @@ def api_get_metrics(project):
     n_records = len(project.db.input)
 
     with project.db as db:
-        labels_no_priors = db.get_results_table(priors=False)["label"]
-        n_priors = len(db.get_priors())
+        labels_no_priors = db.get_results_table("label", priors=False)["label"]
+        stats = db.get_results_stats()
+    n_priors = stats["n_prior_included"] + stats["n_prior_excluded"]
 
     labels_padded = list(labels_no_priors) + [0] * (
         n_records - n_priors - len(labels_no_priors)
@@ -1345,16 +1450,7 @@ def api_get_stopper(project):  # noqa: F401
     with project.db as db:
         results = db.get_results_table(priors=False)
         data = db.input[["record_id"]]
-    labels = results["label"]
-
-    if len(labels) > 0:
-        if int(sum(labels == 1)) > 0:
-            last_relevant_index = len(labels) - 1 - np.argmax(labels[::-1] == 1)
-            n_since_last_relevant = int(sum(labels[last_relevant_index + 1 :] == 0))
-        else:
-            n_since_last_relevant = int(sum(labels == 0))
-    else:
-        n_since_last_relevant = 0
+        n_since_last_relevant = db.get_results_stats()["n_since_last_relevant"]
 
     return jsonify(
         {
@@ -1390,11 +1486,12 @@ def api_get_progress_data(project):  # Consolidated endpoint
 
     with project.db as db:
         labels = db.get_results_table("label", priors=include_priors)
-        labels_with_priors = db.get_results_table("label", priors=True)
+        stats = db.get_results_stats()
 
     if (
         project.config.get("mode") == asr.Project.MODE_SIMULATE
-        and project.db.input["included"].sum() == labels_with_priors["label"].sum()
+        and project.db.input["included"].sum()
+        == stats["n_included"] + stats["n_prior_included"]
     ):
         labels = pd.DataFrame(
             {
@@ -1552,6 +1649,7 @@ def api_delete_project(project):  # noqa: F401
                         ), 403
 
             # and remove the folder
+            dispose(project.project_path)
             shutil.rmtree(project.project_path)
 
         except Exception as err:
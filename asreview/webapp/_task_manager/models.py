@@ -20,3 +20,13 @@ class ProjectQueueModel(Base):
     created_at = Column(
         DateTime, nullable=False, default=lambda: datetime.now(timezone.utc)
     )
+
+
+class ProjectGenerationModel(Base):
+    """Training generations model"""
+
+    __tablename__ = "generations"
+    id = Column(Integer, primary_key=True)
+    project_id = Column(String(250), nullable=False, unique=True)
+    requested = Column(Integer, nullable=False, default=0)
+    trained = Column(Integer, nullable=False, default=0)
@@ -2,24 +2,33 @@ import json
 import logging
 import multiprocessing as mp
 import socket
-import threading
 import signal
-import errno
+from collections import OrderedDict
 from collections import deque
+from functools import partial
+from multiprocessing.connection import wait
 
 from sqlalchemy import create_engine
 from sqlalchemy import text
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker
 
+from asreview.database.connection import dispose
 from asreview.webapp import asreview_path
 from asreview.webapp._task_manager.models import Base
+from asreview.webapp._task_manager.models import ProjectGenerationModel
 from asreview.webapp._task_manager.models import ProjectQueueModel
 from asreview.webapp._tasks import run_task
 
 DEFAULT_TASK_MANAGER_HOST = "localhost"
 DEFAULT_TASK_MANAGER_PORT = 5101
 DEFAULT_TASK_MANAGER_WORKERS = 2
+# Number of jobs after which a worker process is replaced by a new one, to release the
+# memory the worker has built up.
+DEFAULT_WORKER_MAX_JOBS = 100
+# Number of seconds between checks of the shutdown event. The other events of the task
+# manager wake it up directly.
+SHUTDOWN_CHECK_INTERVAL = 1.0
 
 # Set up a module-level logger for the task manager
 logger = logging.getLogger("asreview.task_manager")
@@ -52,58 +61,115 @@ def _setup_logging(verbose=0):
     logger.addHandler(handler)
 
 
-class RunModelProcess(mp.Process):
-    def __init__(
-        self,
-        func,
-        args=(),
-        host=DEFAULT_TASK_MANAGER_HOST,
-        port=DEFAULT_TASK_MANAGER_PORT,
-    ):
+class TaskWorker(mp.Process):
+    """Worker process running the tasks of the task manager.
+
+    The worker runs the jobs it receives over its pipe one by one, until it receives
+    None or the task manager stops. The imports and caches of the worker are kept
+    between the jobs, so only the first job of a worker pays for them. The worker
+    reports the end of each job over the same pipe.
+    """
+
+    def __init__(self, func):
         super().__init__()
         self.func = func
-        self.args = args
-        self.host = host
-        self.port = port
+        # The task manager sends jobs and receives results over its end of the pipe.
+        self.conn, self._worker_conn = mp.Pipe()
+        # Number of jobs sent to the worker, kept by the task manager.
+        self.n_jobs = 0
+
+    def start(self):
+        super().start()
+        # The end of the worker is only used by the worker process.
+        self._worker_conn.close()
+
+    def _get_job(self):
+        """Wait for the next job, or return None if the task manager stopped."""
+        wait([self._worker_conn, mp.parent_process().sentinel])
+        if not self._worker_conn.poll():
+            return None
+        try:
+            return self._worker_conn.recv()
+        except EOFError:
+            return None
 
     def run(self):
         _setup_logging(verbose=1)
-        payload = {"action": "remove", "project_id": self.args[0]}
-        try:
-            self.func(*self.args)
-        except Exception:
-            logger.exception(f"Exception in task for project {self.args[0]}")
-            payload["action"] = "failure"
-        finally:
-            if self.host and self.port:
-                self._send_payload(payload)
-
-    def _send_payload(self, payload):
-        """Send a payload to the task manager via socket."""
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as client_socket:
+        # A forked worker inherits the signal handlers of the task manager. The task
+        # manager stops its workers itself, and terminates them on a reset.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        while (args := self._get_job()) is not None:
+            payload = {"action": "remove", "project_id": args[0]}
             try:
-                client_socket.connect((self.host, self.port))
-                client_socket.sendall(json.dumps(payload).encode("utf-8"))
-            except Exception as e:
+                self.func(*args)
+            except Exception:
+                logger.exception(f"Exception in task for project {args[0]}")
+                payload["action"] = "failure"
+            finally:
+                # Close the connections to the project database, so that the project
+                # can be removed while the worker waits for the next job.
+                dispose()
+
+            try:
+                self._worker_conn.send(payload)
+            except OSError as e:
                 logger.error(f"Failed to send payload: {e}")
+                return
 
 
 class TaskManager:
+    """Manager of the training tasks of the projects.
+
+    The manager runs an event loop on a single thread. It waits for new connections
+    and messages of clients, results and exits of worker processes, and shutdown
+    requests, and schedules the waiting tasks after each event. The waiting queue is
+    kept in memory. The queue table in the database is a log of the waiting queue,
+    written before the queue in memory is changed, from which the queue is restored
+    when the manager starts.
+    """
+
     def __init__(
         self,
         max_workers=DEFAULT_TASK_MANAGER_WORKERS,
         host=DEFAULT_TASK_MANAGER_HOST,
         port=DEFAULT_TASK_MANAGER_PORT,
+        worker_max_jobs=DEFAULT_WORKER_MAX_JOBS,
     ):
-        self.running_processes = {}  # project_id -> Process object
+        self.running_processes = {}  # project_id -> TaskWorker object
         self.max_workers = int(max_workers)
 
+        # pool of worker processes, started when there are no idle workers
+        self.workers = []
+        # used up workers, which stop after receiving None
+        self.retired_workers = []
+        self.worker_max_jobs = int(worker_max_jobs)
+
+        # Training generations per project. Each insert of a project increments the
+        # requested generation. A task covers the labels of all inserts before it
+        # started, so the trained generation is the requested generation at the
+        # start of the last successful task. The ranking reflects all inserts when
+        # the trained generation equals the requested generation. The generations
+        # are kept in the generations table, so they continue after a restart of
+        # the manager.
+        self.generations = {}  # project_id -> {"requested": int, "trained": int}
+        self.running_generations = {}  # project_id -> generation of running task
+        # Projects with inserts since the start of their running task, which need
+        # one follow-up task: project_id -> simulation
+        self.dirty_projects = {}
+
         # set up parameters for socket endpoint
         self.host = host
         self.port = int(port)
+        self.server_socket = None
+        self.clients = {}  # client socket -> buffer of incomplete messages
         self.message_buffer = deque()
         self.receive_bytes = 1024  # bytes read when receiving messages
-        self.timeout = 0.1  # wait for 0.1 seconds for incoming messages
+        self.client_timeout = 1.0  # wait 1 second for a client to receive a response
+
+        # The signal handler wakes up the event loop via this pipe.
+        self._wakeup_reader, self._wakeup_writer = mp.Pipe(duplex=False)
+        self._stopping = False
 
         # set up database
         database_url = f"sqlite:///{asreview_path()}/queue.sqlite"
@@ -116,8 +182,10 @@ class TaskManager:
         # Handle migration for created_at column
         self._migrate_created_at_column()
 
-        self.client_thread = None
-        self.client_conn = None
+        # project_id -> simulation, in order of insertion
+        self.waiting_queue = OrderedDict()
+        self._load_waiting_queue()
+        self._load_generations()
 
     def _migrate_created_at_column(self):
         """Add created_at column if it doesn't exist (for existing deployments)."""
@@ -142,12 +210,71 @@ class TaskManager:
             logger.error(f"Failed to migrate created_at column: {e}")
             self.session.rollback()
 
+    def _load_waiting_queue(self):
+        """Restore the waiting queue from the queue table."""
+        try:
+            records = (
+                self.session.query(ProjectQueueModel)
+                .order_by(ProjectQueueModel.id)
+                .all()
+            )
+            self.waiting_queue = OrderedDict(
+                (record.project_id, record.simulation) for record in records
+            )
+            self.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to load waiting queue: {e}")
+            self.session.rollback()
+            self.waiting_queue = OrderedDict()
+
+        logger.info(f"Loaded {len(self.waiting_queue)} tasks from the queue table")
+
+    def _load_generations(self):
+        """Restore the training generations from the generations table."""
+        try:
+            records = self.session.query(ProjectGenerationModel).all()
+            self.generations = {
+                record.project_id: {
+                    "requested": record.requested,
+                    "trained": record.trained,
+                }
+                for record in records
+            }
+            self.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to load training generations: {e}")
+            self.session.rollback()
+            self.generations = {}
+
+    def _save_generations(self, project_id):
+        """Write the training generations of a project to the generations table."""
+        generations = self._get_generations(project_id)
+        try:
+            record = (
+                self.session.query(ProjectGenerationModel)
+                .filter_by(project_id=project_id)
+                .first()
+            )
+            if record is None:
+                record = ProjectGenerationModel(project_id=str(project_id))
+                self.session.add(record)
+            record.requested = generations["requested"]
+            record.trained = generations["trained"]
+            self.session.commit()
+        except Exception:
+            # The generations in memory are still valid until the manager restarts.
+            logger.error(f"Failed to save generations of project {project_id}")
+            self.session.rollback()
+
     @property
     def waiting(self):
-        records = self.session.query(ProjectQueueModel).all()
-        return [r.project_id for r in records]
+        return list(self.waiting_queue)
 
     def insert_in_waiting(self, project_id, simulation):
+        if project_id in self.waiting_queue:
+            logger.info(f"Task for project {project_id} already in queue")
+            return
+
         try:
             new_record = ProjectQueueModel(
                 project_id=str(project_id), simulation=bool(simulation)
@@ -156,36 +283,48 @@ class TaskManager:
             self.session.add(new_record)
             self.session.commit()
         except IntegrityError:
-            logger.info(f"Task for project {project_id} already in queue")
+            # The task is in the queue table, but not in the waiting queue.
+            logger.info(f"Task for project {project_id} already in queue table")
             self.session.rollback()
         except Exception:
             logger.error(f"Failed to add task for project {project_id} queue")
             self.session.rollback()
-        else:
-            logger.info(f"Task for project {project_id} inserted into queue")
+            return
+
+        self.waiting_queue[project_id] = simulation
+        logger.info(f"Task for project {project_id} inserted into queue")
 
     def is_waiting(self, project_id):
-        return (
-            self.session.query(ProjectQueueModel)
-            .filter_by(project_id=project_id)
-            .first()
-            or False
-        )
+        return project_id in self.waiting_queue
 
     def is_pending(self, project_id):
         return project_id in self.running_processes
 
-    def remove_pending(self, project_id):
+    def remove_pending(self, project_id, success=False):
         if project_id in self.running_processes:
             del self.running_processes[project_id]
+            generation = self.running_generations.pop(project_id, 0)
+            if success:
+                generations = self._get_generations(project_id)
+                generations["trained"] = max(generations["trained"], generation)
+                self._save_generations(project_id)
             logger.info(f"Task for project {project_id} removed from pending area")
+
+            # Coalesce the inserts received while the task was running into a
+            # single follow-up task.
+            if project_id in self.dirty_projects:
+                self.insert_in_waiting(project_id, self.dirty_projects.pop(project_id))
         else:
             logger.error(
                 f"Failed to find task for project {project_id} in pending area"
             )
 
     def reset_pending_tasks(self):
-        """Reset all pending tasks - terminates running subprocesses."""
+        """Reset all pending tasks - terminates running subprocesses.
+
+        The waiting queue is restored from the queue table afterwards, as the table
+        can be cleared by the admin at the same time.
+        """
         if self.running_processes:
             logger.info(f"Resetting {len(self.running_processes)} pending tasks")
 
@@ -208,46 +347,152 @@ class TaskManager:
                         f"Failed to terminate process for project {project_id}: {e}"
                     )
 
+                # the terminated worker leaves the pool
+                if process in self.workers and not process.is_alive():
+                    self.workers.remove(process)
+                    process.conn.close()
+
             self.running_processes.clear()
+            self.running_generations.clear()
+            self.dirty_projects.clear()
             logger.info("All pending tasks terminated and cleared")
         else:
             logger.info("No pending tasks to reset")
 
+        self._load_waiting_queue()
+
     def move_from_waiting_to_pending(self, project_id, process):
-        record = self.is_waiting(project_id)
-        if record:
+        if project_id in self.waiting_queue:
+            # add to pending
+            self.add_pending(project_id, process)
+            del self.waiting_queue[project_id]
+            logger.info(f"Task for project {project_id} moved to pending area")
+
             try:
-                # add to pending
-                self.add_pending(project_id, process)
-                # delete
                 self.session.execute(text("BEGIN TRANSACTION"))
-                self.session.delete(record)
+                self.session.query(ProjectQueueModel).filter_by(
+                    project_id=project_id
+                ).delete()
                 self.session.commit()
-                logger.info(f"Task for project {project_id} moved to pending area")
             except Exception:
+                # The task runs again when the manager restarts.
                 self.session.rollback()
-                # remove from pending
-                self.remove_pending(project_id)
                 logger.error(
-                    f"Failed to move task for project {project_id} to pending area"
+                    f"Failed to remove task for project {project_id} from queue table"
                 )
 
     def add_pending(self, project_id, process):
         if project_id not in self.running_processes:
             self.running_processes[project_id] = process
+            self.running_generations[project_id] = self._get_generations(project_id)[
+                "requested"
+            ]
+
+    def _get_generations(self, project_id):
+        return self.generations.setdefault(project_id, {"requested": 0, "trained": 0})
+
+    def _request_generation(self, project_id):
+        """Increment and return the requested generation of a project."""
+        generations = self._get_generations(project_id)
+        generations["requested"] += 1
+        self._save_generations(project_id)
+        return generations["requested"]
+
+    def _get_idle_worker(self):
+        """Get an idle worker, or start a new worker if there is none."""
+        busy_workers = list(self.running_processes.values())
+        for worker in self.workers:
+            if worker.is_alive() and worker not in busy_workers:
+                return worker
+
+        worker = TaskWorker(func=run_task)
+        worker.start()
+        self.workers.append(worker)
+        logger.info(f"Worker process {worker.pid} started")
+        return worker
+
+    def _retire_workers(self):
+        """Stop the idle workers that are used up, to release their memory."""
+        busy_workers = list(self.running_processes.values())
+        for worker in list(self.workers):
+            if worker not in busy_workers and worker.n_jobs >= self.worker_max_jobs:
+                self.workers.remove(worker)
+                self.retired_workers.append(worker)
+                try:
+                    worker.conn.send(None)
+                except OSError:
+                    pass
+                logger.info(
+                    f"Worker process {worker.pid} stopped after {worker.n_jobs} jobs"
+                )
+
+    def _remove_worker(self, worker):
+        """Remove a worker process that stopped.
+
+        The task of a worker that stopped while running it, for example because it
+        ran out of memory, fails.
+        """
+        if worker in self.retired_workers:
+            self.retired_workers.remove(worker)
+        elif worker in self.workers:
+            self.workers.remove(worker)
+        else:
+            return
+
+        # results sent by the worker before it stopped
+        try:
+            while worker.conn.poll():
+                self.message_buffer.append(worker.conn.recv())
+        except (EOFError, OSError):
+            pass
+        worker.join()
+        worker.conn.close()
+
+        # Apply the results first, the task of a result is not lost.
+        self._process_buffer()
+
+        for project_id, process in list(self.running_processes.items()):
+            if process is worker:
+                logger.error(
+                    f"Worker process {worker.pid} stopped while running "
+                    f"the task for project {project_id}"
+                )
+                self.remove_pending(project_id)
+
+    def _receive_worker_message(self, worker):
+        """Queue the result of a job of a worker."""
+        try:
+            self.message_buffer.append(worker.conn.recv())
+        except (EOFError, OSError):
+            # the worker stopped
+            self._remove_worker(worker)
+
+    def _stop_workers(self):
+        """Stop the worker processes, after they finish their current job."""
+        for worker in self.workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self.workers + self.retired_workers:
+            worker.join(timeout=5.0)
+            if worker.is_alive():
+                worker.terminate()
+                worker.join()
+            worker.conn.close()
+        self.workers.clear()
+        self.retired_workers.clear()
 
     def __execute_job(self, project_id, simulation):
         try:
             # run the simulation / train task
-            p = RunModelProcess(
-                func=run_task,
-                args=(project_id, simulation),
-                host=self.host,
-                port=self.port,
+            worker = self._get_idle_worker()
+            worker.conn.send((project_id, simulation))
+            worker.n_jobs += 1
+            logger.info(
+                f"Task for project {project_id} started in worker process {worker.pid}"
             )
-            p.start()
-            logger.info(f"Task for project {project_id} started in a subprocess")
-            return p  # Return the process object
+            return worker  # Return the process object
         except Exception as _:
             message = f"Failed to spin up training process for project: {project_id}"
             logger.error(message)
@@ -257,48 +502,25 @@ class TaskManager:
         return self.max_workers - len(self.running_processes)
 
     def pop_waiting_queue(self):
-        """Moves tasks from the database and executes them in subprocess."""
-        # Do we have available slots?
-        if self._count_available_slots() > 0:
-            # select first #max_workers records to ensure we
-            # have new projects that can start training (note that
-            # we can have only one record per project in the waiting
-            # table, and that the same project may exist in pending).
-            # If I have 3 slots available out of 8, selecting 8 records
-            # ensures I will have 3 non-pending projects in the selection.
-            try:
-                records = (
-                    self.session.query(ProjectQueueModel)
-                    .order_by(ProjectQueueModel.id)
-                    .limit(self.max_workers)
-                    .all()
-                )
-            except Exception as e:
-                logger.error(f"Failed to select waiting project ids: {e}")
-                # just wait until the next tick
-                records = []
-
-            # loop over records
-            for record in records:
-                project_id = record.project_id
-                simulation = record.simulation
+        """Moves tasks from the waiting queue and executes them in a worker."""
+        # The waiting queue holds one task per project, but the same project may
+        # be in pending.
+        for project_id, simulation in list(self.waiting_queue.items()):
+            if self._count_available_slots() <= 0:
+                # break if we have no more slots
+                break
+            elif project_id in self.running_processes:
+                # continue if this project is already in pending
+                continue
 
-                if project_id in self.running_processes:
-                    # continue if this project is already in pending
-                    continue
-                elif self._count_available_slots() == 0:
-                    # break if we have no more slots
-                    break
-                else:
-                    # we have a slot and a new project,
-                    # execute job:
-                    process = self.__execute_job(project_id, simulation)
-                    if process:
-                        # move out of waiting and put into pending
-                        self.move_from_waiting_to_pending(project_id, process)
+            # we have a slot and a new project, execute job:
+            process = self.__execute_job(project_id, simulation)
+            if process:
+                # move out of waiting and put into pending
+                self.move_from_waiting_to_pending(project_id, process)
 
     def _process_buffer(self):
-        """Injects messages in the database."""
+        """Applies the received messages to the queue."""
         while self.message_buffer:
             message = self.message_buffer.popleft()
             action = message.get("action", False)
@@ -306,47 +528,60 @@ class TaskManager:
             simulation = message.get("simulation", False)
 
             if action == "insert" and project_id:
-                # This will insert into the waiting database if
-                # the project isn't there, it will fail gracefully
-                # if the project is already waiting
-                self.insert_in_waiting(project_id, simulation)
+                if project_id in self.running_processes:
+                    # The running task doesn't cover inserts that were received
+                    # after it started, run a follow-up task when it finishes.
+                    generation = message.get("generation", 0)
+                    if generation > self.running_generations.get(project_id, 0):
+                        self.dirty_projects[project_id] = simulation
+                else:
+                    # This will insert into the waiting queue if the project
+                    # isn't there, it will fail gracefully if the project is
+                    # already waiting
+                    self.insert_in_waiting(project_id, simulation)
 
             elif action in ["remove", "failure"] and project_id:
                 if action == "failure":
                     logger.error(f"Failed to train model for project {project_id}")
-                self.remove_pending(project_id)
+                self.remove_pending(project_id, success=action == "remove")
 
             elif action == "reset_pending":
                 self.reset_pending_tasks()
 
-    def _handle_incoming_messages(self, conn):
-        """Handles incoming traffic."""
-        client_buffer = ""
-        while True:
-            try:
-                data = conn.recv(self.receive_bytes)
-                logger.debug(f"{data}")
-                if not data:
-                    # Process any remaining buffered messages on disconnect
-                    if client_buffer.strip():
-                        client_buffer = self._process_complete_messages(
-                            client_buffer, conn
-                        )
-                    # client disconnected
-                    break
-
-                else:
-                    message = data.decode("utf-8")
-                    client_buffer += message
+    def _accept_client(self):
+        """Accept a new client connection."""
+        try:
+            conn, _ = self.server_socket.accept()
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"Socket error occurred: {e}")
+            return
 
-                    # Try to process complete JSON messages immediately
-                    client_buffer = self._process_complete_messages(client_buffer, conn)
+        conn.settimeout(self.client_timeout)
+        self.clients[conn] = ""
 
-            except Exception as e:
-                logger.info(f"Error while receiving message:\n{e}\n")
-                break
+    def _receive_client_message(self, conn):
+        """Receive a message of a client, or close the connection on disconnect."""
+        try:
+            data = conn.recv(self.receive_bytes)
+            logger.debug(f"{data}")
+        except Exception as e:
+            logger.info(f"Error while receiving message:\n{e}\n")
+            self.clients.pop(conn)
+            conn.close()
+            return
 
-        conn.close()
+        if data:
+            self.clients[conn] = self._process_complete_messages(
+                self.clients[conn] + data.decode("utf-8"), conn
+            )
+        else:
+            # Process any remaining buffered messages on disconnect
+            client_buffer = self.clients.pop(conn)
+            if client_buffer.strip():
+                self._process_complete_messages(client_buffer, conn)
+            conn.close()
 
     def _process_complete_messages(self, client_buffer, conn):
         """Process complete JSON messages immediately, return remaining buffer."""
@@ -363,10 +598,17 @@ class TaskManager:
 
             # Process status queries immediately, queue others
             for message in messages:
-                if message.get("action") == "status_query":
+                action = message.get("action")
+                if action == "status_query":
                     logger.debug(f"Processing immediate status query: {message}")
                     self._send_status_response(conn)
+                elif action == "generation_query":
+                    self._send_generation_response(conn, message.get("project_id"))
                 else:
+                    if action == "insert" and message.get("project_id"):
+                        message["generation"] = self._request_generation(
+                            message["project_id"]
+                        )
                     # Queue non-status messages for later processing
                     self.message_buffer.append(message)
 
@@ -392,6 +634,17 @@ class TaskManager:
         except Exception as e:
             logger.error(f"Failed to send status response: {e}")
 
+    def _send_generation_response(self, conn, project_id):
+        """Send the training generations of a project back to the client."""
+        try:
+            response = {
+                "project_id": project_id,
+                **self.generations.get(project_id, {"requested": 0, "trained": 0}),
+            }
+            conn.sendall(json.dumps(response).encode("utf-8"))
+        except Exception as e:
+            logger.error(f"Failed to send generation response: {e}")
+
     def _bind_server_socket(self, mp_start_event=None):
         """Bind the server socket to the configured host and port."""
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -418,6 +671,33 @@ class TaskManager:
         logger.info(f"Socket bound to {self.host}:{self.port}")
         return True
 
+    def _clear_wakeup(self):
+        self._wakeup_reader.recv_bytes()
+
+    def _get_event_handlers(self):
+        """Get the objects to wait for, mapped to the handlers of their events.
+
+        The handlers are called in order: the results of the workers are handled
+        before the exits of the workers.
+        """
+        handlers = {
+            self.server_socket: self._accept_client,
+            self._wakeup_reader: self._clear_wakeup,
+        }
+        for conn in self.clients:
+            handlers[conn] = partial(self._receive_client_message, conn)
+
+        workers = self.workers + self.retired_workers
+        for worker in workers:
+            handlers[worker.conn] = partial(self._receive_worker_message, worker)
+        for worker in workers:
+            handlers[worker.sentinel] = partial(self._remove_worker, worker)
+
+        parent = mp.parent_process()
+        if parent is not None:
+            handlers[parent.sentinel] = self.stop_manager
+        return handlers
+
     def start_manager(self, mp_start_event=None, mp_shutdown_event=None):
         """Start the task manager.
 
@@ -435,12 +715,11 @@ class TaskManager:
             return
 
         self.server_socket.listen()
+        self.server_socket.setblocking(False)
 
         if mp_start_event is not None:
             mp_start_event.set()
 
-        self.server_socket.settimeout(1.0)
-
         def _signal_handler(signum, frame):
             logger.info(f"Shutting down task manager due to signal {signum}")
             self.stop_manager(mp_shutdown_event)
@@ -448,49 +727,45 @@ class TaskManager:
         signal.signal(signal.SIGINT, _signal_handler)
         signal.signal(signal.SIGTERM, _signal_handler)
 
-        while mp_shutdown_event is None or not mp_shutdown_event.is_set():
-            try:
-                # Accept incoming connections with a timeout
-                conn, _ = self.server_socket.accept()
-                # Start a new thread to handle the client connection
-                client_thread = threading.Thread(
-                    target=self._handle_incoming_messages, args=(conn,)
-                )
-                # client_thread.daemon = True
-                client_thread.start()
-                # Store the latest client thread and conn
-                self.client_thread = client_thread
-                self.client_conn = conn
-
-            except socket.timeout:
-                # No incoming connections => perform handling queue
-                self._process_buffer()
-                # Pop tasks from database into 'pending'
-                self.pop_waiting_queue()
-                # continue to check for shutdown conditions
-                continue
+        # The shutdown event can't be waited for together with the other events,
+        # it is checked at an interval.
+        timeout = None if mp_shutdown_event is None else SHUTDOWN_CHECK_INTERVAL
 
-            except OSError as e:
-                if e.errno == errno.EBADF:
-                    # Socket was closed, exit loop silently
-                    break
-                logger.error(f"Socket error occurred: {e}")
-                break  # Exit the loop if the socket is closed
-
-        # After exiting main loop, clean up client thread
-        if self.client_thread and self.client_conn:
-            try:
-                self.client_conn.shutdown(socket.SHUT_RDWR)
-            except Exception:
-                pass
-            try:
-                self.client_conn.close()
-            except Exception:
-                pass
-            self.client_thread.join(timeout=1.0)
+        while not self._stopping:
+            if mp_shutdown_event is not None and mp_shutdown_event.is_set():
+                break
+
+            self._run_once(timeout)
+
+        self._stop_workers()
+        self._close()
+
+    def _run_once(self, timeout=None):
+        """Run one iteration of the event loop.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            Maximum number of seconds to wait for an event. Default is None, which
+            waits until an event happens.
+        """
+        # Apply the received messages and start the waiting tasks
+        self._process_buffer()
+        self._retire_workers()
+        self.pop_waiting_queue()
+
+        handlers = self._get_event_handlers()
+        ready = set(wait(list(handlers), timeout=timeout))
+        for obj, handler in handlers.items():
+            if obj in ready:
+                handler()
 
     def stop_manager(self, mp_shutdown_event=None):
-        """Gracefully stop the manager and close the socket."""
+        """Gracefully stop the manager.
+
+        The manager stops its workers, and closes the socket and the database
+        session when it leaves its event loop.
+        """
 
         # Signal to the main process that the manager is shutting down
         # and set the shutdown event if provided
@@ -498,6 +773,21 @@ class TaskManager:
             logger.info("Shutting down task manager...")
             mp_shutdown_event.set()
 
+        self._stopping = True
+        try:
+            self._wakeup_writer.send_bytes(b"")
+        except OSError:
+            pass
+
+    def _close(self):
+        """Close the client connections, the server socket and the database session."""
+        for conn in self.clients:
+            try:
+                conn.close()
+            except OSError:
+                pass
+        self.clients.clear()
+
         # Close the server socket
         if self.server_socket:
             try:
@@ -509,7 +799,6 @@ class TaskManager:
         logger.info("Task manager has been stopped.")
 
         # Close the database session
-
         if self.session:
             try:
                 self.session.close()
@@ -517,18 +806,6 @@ class TaskManager:
                 logger.error(f"Failed to close database session: {e}")
             self.session = None
 
-        # After closing server socket and DB session, also clean up client thread
-        if getattr(self, "client_thread", None) and getattr(self, "client_conn", None):
-            try:
-                self.client_conn.shutdown(socket.SHUT_RDWR)
-            except Exception:
-                pass
-            try:
-                self.client_conn.close()
-            except Exception:
-                pass
-            self.client_thread.join(timeout=1.0)
-
 
 def run_task_manager(
     max_workers=None,
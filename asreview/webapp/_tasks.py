@@ -13,6 +13,8 @@
 # limitations under the License.
 
 import asreview as asr
+from asreview.models.feature_cache import FeatureMatrixCache
+from asreview.models.feature_cache import get_feature_extractor_key
 from asreview.models.queriers import TopDown
 from asreview.models.stoppers import IsFittable
 from asreview.simulation.simulate import Simulate
@@ -48,18 +50,18 @@ def run_model(project):
     try:
         cycle_data = _read_cycle_data(project)
 
-        if cycle_data.feature_extractor:
+        cycle = asr.ActiveLearningCycle.from_meta(cycle_data)
+
+        if cycle.feature_extractor is not None:
+            key = get_feature_extractor_key(cycle.feature_extractor)
             try:
-                fm = project.get_feature_matrix(cycle_data.feature_extractor)
-                cycle = asr.ActiveLearningCycle.from_meta(
-                    cycle_data, skip_feature_extraction=True
-                )
+                fm = project.get_feature_matrix(cycle.feature_extractor.name, key=key)
             except ValueError:
-                cycle = asr.ActiveLearningCycle.from_meta(cycle_data)
+                # the project keeps its own copy of the feature matrix, storing it
+                # in the shared cache as well would double the disk use
                 fm = cycle.transform(project.db.input.get_df())
-                project.add_feature_matrix(fm, cycle.feature_extractor.name)
+                project.add_feature_matrix(fm, cycle.feature_extractor.name, key=key)
         else:
-            cycle = asr.ActiveLearningCycle.from_meta(cycle_data)
             fm = project.db.input.get_df().values
 
         if cycle.classifier is not None:
@@ -107,6 +109,7 @@ def run_simulation(project):
         cycles,
         print_progress=False,
         groups=project.db.input.get_groups(),
+        feature_cache=FeatureMatrixCache(),
     )
     try:
         sim.label(priors)
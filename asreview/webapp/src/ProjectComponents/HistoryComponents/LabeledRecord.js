@@ -41,7 +41,10 @@ const LabeledRecord = ({ project_id, label, filterQuery, mode = "oracle" }) => {
     ],
     ProjectAPI.fetchLabeledRecord,
     {
-      getNextPageParam: (lastPage) => lastPage.next_page ?? false,
+      getNextPageParam: (lastPage) =>
+        lastPage.next_page
+          ? { page: lastPage.next_page, cursor: lastPage.next_cursor }
+          : false,
     },
   );
 
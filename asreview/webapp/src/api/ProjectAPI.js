@@ -272,14 +272,19 @@ class ProjectAPI {
     });
   }
 
-  static fetchLabeledRecord({ pageParam = 1, queryKey }) {
+  static fetchLabeledRecord({ pageParam = { page: 1 }, queryKey }) {
     const { project_id, subset, filter } = queryKey[1];
 
     const url = api_url + `projects/${project_id}/labeled`;
     return new Promise((resolve, reject) => {
       axios
         .get(url, {
-          params: { subset: subset, filter: filter, page: pageParam },
+          params: {
+            subset: subset,
+            filter: filter,
+            page: pageParam.page,
+            cursor: pageParam.cursor,
+          },
           paramsSerializer: (params) => {
             return qs.stringify(params, { arrayFormat: "repeat" });
           },
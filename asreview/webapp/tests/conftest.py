@@ -43,7 +43,7 @@ PROJECTS = [
 def _get_app(app_type="auth-basic", path=None):
     """Create and returns test flask app based on app_type"""
     # set asreview path
-    os.environ.update({"ASREVIEW_PATH": path})
+    os.environ.update({"ASREVIEW_PATH": path, "ASREVIEW_CACHE_PATH": path})
     # get path of appropriate flask config
     base_dir = Path(__file__).resolve().parent / "config"
     if app_type == "auth-basic":
@@ -1,4 +1,6 @@
 import json
+import socket
+import threading
 import time
 import csv
 from io import BytesIO, StringIO
@@ -12,7 +14,9 @@ import asreview as asr
 import asreview.webapp.tests.utils.api_utils as au
 import asreview.webapp.tests.utils.crud as crud
 import asreview.webapp.tests.utils.misc as misc
+from asreview.extensions import load_extension
 from asreview.webapp import DB
+from asreview.webapp._api import projects as projects_api
 from asreview.webapp._authentication.models import Project
 from asreview.webapp.utils import asreview_path
 from asreview.webapp.utils import get_projects
@@ -379,6 +383,60 @@ def test_get_labeled_project_data(client, project):
     assert len(r.json["result"]) == 1
 
 
+def _get_labeled_pages(client, project, query_string, use_cursor):
+    pages = []
+    page, cursor = 1, None
+    while page is not None:
+        query = {**query_string, "page": page, "per_page": 3}
+        if use_cursor and cursor is not None:
+            query["cursor"] = cursor
+        r = client.get(
+            f"/api/projects/{au.get_project_id(project)}/labeled", query_string=query
+        )
+        assert r.status_code == 200
+        pages.append(r.json)
+        page, cursor = r.json["next_page"], r.json["next_cursor"]
+    return pages
+
+
+# Test paging through the labeled records with a cursor
+@pytest.mark.parametrize("latest_first", [0, 1])
+@pytest.mark.parametrize("filters", [[], ["is_prior"], ["has_note"]])
+def test_get_labeled_project_data_cursor(client, project, latest_first, filters):
+    asr_project = asr.Project(project.project_path)
+    record_ids = asr_project.db.input["record_id"].to_list()
+    with asr_project.db as db:
+        # label 4 priors and 9 records from the ranking, some with a note
+        for i, record_id in enumerate(record_ids[:4]):
+            db.label_record(record_id, i % 2)
+        db.update_note(record_ids[0], "note")
+        db.add_last_ranking(record_ids, "nb", "max", "double", "tfidf", 4)
+        for i in range(9):
+            record_id = int(db.query_top_ranked()["record_id"].iloc[0])
+            db.label_record(record_id, int(i % 3 == 0))
+            if i % 2 == 0:
+                db.update_note(record_id, "note")
+
+    query_string = {"latest_first": latest_first, "filter": filters}
+    pages_offset = _get_labeled_pages(client, project, query_string, False)
+    pages_cursor = _get_labeled_pages(client, project, query_string, True)
+
+    r = client.get(
+        f"/api/projects/{au.get_project_id(project)}/labeled",
+        query_string=query_string,
+    )
+    expected = [x["record_id"] for x in r.json["result"]]
+    # more than one page
+    assert len(expected) > 3
+
+    for pages in [pages_offset, pages_cursor]:
+        assert [x["record_id"] for page in pages for x in page["result"]] == expected
+
+    assert [(p["count"], p["next_page"]) for p in pages_cursor] == [
+        (p["count"], p["next_page"]) for p in pages_offset
+    ]
+
+
 # Test getting labeled records stats
 def test_get_labeled_stats(client, project):
     # label 2 random records
@@ -395,6 +453,25 @@ def test_get_labeled_stats(client, project):
     assert r.json["n_prior"] == 2
 
 
+# Test that the labeled records stats always include the priors
+@pytest.mark.parametrize("priors", [None, "", "false", "true"])
+def test_get_labeled_stats_priors(client, project, priors):
+    au.label_random_project_data_record(client, project, 1)
+    au.label_random_project_data_record(client, project, 0)
+
+    query_string = {} if priors is None else {"priors": priors}
+    r = client.get(
+        f"/api/projects/{au.get_project_id(project)}/labeled_stats",
+        query_string=query_string,
+    )
+
+    assert r.status_code == 200
+    assert r.json["n"] == 2
+    assert r.json["n_inclusions"] == 1
+    assert r.json["n_exclusions"] == 1
+    assert r.json["n_prior"] == 2
+
+
 # Test listing the available algorithms
 def test_list_learners(client, user):
     r = au.get_project_algorithms_options(client)
@@ -551,6 +628,47 @@ def test_export_all_records(client, project):
         assert len(csv_rows) == size + 1
 
 
+# Test that the streamed export is equal to the export written in one piece.
+@pytest.mark.parametrize("file_format", ["csv", "tsv", "ris"])
+def test_export_streamed(client, user, monkeypatch, file_format):
+    tests_folder = Path(__file__).parent.parent
+    with open(tests_folder / "data" / "scopus.ris", "rb") as f:
+        au.create_project(client, file=(f, "scopus.ris"))
+    project = user.projects[0] if user is not None else get_projects()[0]
+    au.label_random_project_data_record(client, project, 1)
+    au.label_random_project_data_record(client, project, 0)
+
+    asr_project = asr.Project(project.project_path)
+    record_ids = asr_project.db.input["record_id"].to_list()
+    with asr_project.db as db:
+        db.add_last_ranking(record_ids, "nb", "max", "double", "tfidf", 2)
+
+    # record the chunks of the export while they are written
+    writer = load_extension("writers", f".{file_format}")
+    write_data_chunks = writer.write_data_chunks
+    chunks = []
+
+    def write_data_chunks_spy(data_chunks, *args, **kwargs):
+        def iter_chunks():
+            for chunk in data_chunks:
+                chunks.append(chunk)
+                yield chunk
+
+        return write_data_chunks(iter_chunks(), *args, **kwargs)
+
+    monkeypatch.setattr(writer, "write_data_chunks", write_data_chunks_spy)
+    monkeypatch.setattr(projects_api, "_EXPORT_CHUNK_SIZE", 2)
+
+    collections = ["relevant", "not_seen", "irrelevant"]
+    r = au.export_project_dataset(client, project, file_format, collections)
+    assert r.status_code == 200
+    assert r.is_streamed
+    streamed = r.data.decode("utf-8")
+    assert len(chunks) > 1
+
+    assert streamed == writer.write_data(pd.concat(list(chunks)), None)
+
+
 # Test uploading a RIS file with many authors, exporting it and importing it again.
 # This checks https://github.com/asreview/asreview/issues/2252 is fixed.
 def test_export_project_many_authors(client, user):
@@ -667,6 +785,116 @@ def test_update_label_of_document_with_running_model(client, project):
     time.sleep(10)
 
 
+def _stub_task_manager(client, monkeypatch, generations=None):
+    """Delegate training to a stub task manager, return the sent messages."""
+    messages = []
+
+    def send_message(payload, reply=False):
+        messages.append((payload, reply))
+        if not reply or generations is None:
+            return None
+        return {"project_id": payload["project_id"], **generations}
+
+    monkeypatch.setattr(client.application, "testing", False)
+    monkeypatch.setattr(projects_api, "_send_task_manager_message", send_message)
+    return messages
+
+
+# Test that labeling doesn't wait for the task manager
+def test_label_and_train_task_manager(client, project, monkeypatch):
+    messages = _stub_task_manager(
+        client, monkeypatch, generations={"requested": 3, "trained": 2}
+    )
+
+    r = client.post(
+        f"/api/projects/{au.get_project_id(project)}/record/1",
+        data={"record_id": 1, "label": 1, "retrain_model": 1},
+    )
+    assert r.status_code == 200
+    assert r.json == {"success": True}
+    assert messages == [
+        (
+            {
+                "action": "insert",
+                "project_id": au.get_project_id(project),
+                "simulation": False,
+            },
+            False,
+        )
+    ]
+
+    # the status doesn't contact the task manager
+    r = au.get_project_status(client, project)
+    assert r.status_code == 200
+    assert "generations" not in r.json
+    assert len(messages) == 1
+
+
+# Test the training generations of the task manager
+def test_get_generations(client, project, monkeypatch):
+    messages = _stub_task_manager(
+        client, monkeypatch, generations={"requested": 3, "trained": 2}
+    )
+
+    r = client.get(f"/api/projects/{au.get_project_id(project)}/generations")
+    assert r.status_code == 200
+    assert r.json == {"requested": 3, "trained": 2}
+    assert messages == [
+        (
+            {"action": "generation_query", "project_id": au.get_project_id(project)},
+            True,
+        )
+    ]
+
+
+# Test the training generations without a response of the task manager
+def test_get_generations_no_response(client, project, monkeypatch):
+    _stub_task_manager(client, monkeypatch)
+
+    r = client.get(f"/api/projects/{au.get_project_id(project)}/generations")
+    assert r.status_code == 503
+
+
+def _serve_task_manager(server_socket, response):
+    """Accept one client and send the response to its message."""
+    conn, _ = server_socket.accept()
+    with conn:
+        conn.recv(1024)
+        conn.sendall(json.dumps(response).encode("utf-8"))
+
+
+@pytest.mark.parametrize(
+    ("reply", "response"),
+    [(False, None), (True, None), (True, {"project_id": "a", "trained": 1})],
+)
+def test_send_task_manager_message(client, reply, response):
+    with socket.create_server(("localhost", 0)) as server_socket:
+        client.application.config["TASK_MANAGER_PORT"] = server_socket.getsockname()[1]
+        if response is not None:
+            server = threading.Thread(
+                target=_serve_task_manager, args=(server_socket, response)
+            )
+            server.start()
+
+        start = time.monotonic()
+        with client.application.app_context():
+            result = projects_api._send_task_manager_message(
+                {"action": "generation_query", "project_id": "a"}, reply=reply
+            )
+        elapsed = time.monotonic() - start
+
+        if response is not None:
+            server.join()
+
+    assert result == response
+    if not reply:
+        # the message is sent without waiting for a response
+        assert elapsed < 1.0
+    elif response is None:
+        # the client waits up to 1 second for a response
+        assert 1.0 <= elapsed < 5.0
+
+
 # Test deleting a project
 def test_delete_project(client, project):
     r = au.delete_project(client, project)
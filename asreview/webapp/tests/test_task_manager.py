@@ -0,0 +1,384 @@
+import json
+import multiprocessing as mp
+import os
+import socket
+import threading
+import time
+from multiprocessing.connection import wait
+from pathlib import Path
+
+import pytest
+
+import asreview.webapp._task_manager.task_manager as tm
+from asreview.webapp._task_manager.task_manager import TaskManager
+from asreview.webapp._task_manager.task_manager import run_task_manager
+
+TIMEOUT = 10
+
+
+def _log_task(project_id):
+    """Write the process id and project id of a task to the task log."""
+    with open(Path(os.environ["ASREVIEW_PATH"], "tasks.log"), "a") as f:
+        f.write(f"{os.getpid()} {project_id}\n")
+
+
+def _read_task_log():
+    fp = Path(os.environ["ASREVIEW_PATH"], "tasks.log")
+    if not fp.exists():
+        return []
+    return [line.split() for line in fp.read_text().splitlines()]
+
+
+def run_task_stub(project_id, simulation):
+    """Run a task, depending on the project id.
+
+    - "fail": raise an exception.
+    - "crash": stop the worker process while running the task.
+    - "block": wait until the file "release" exists.
+    """
+    if project_id.startswith("block"):
+        while not Path(os.environ["ASREVIEW_PATH"], "release").exists():
+            time.sleep(0.01)
+    elif project_id.startswith("crash"):
+        os._exit(1)
+
+    _log_task(project_id)
+
+    if project_id.startswith("fail"):
+        raise ValueError("Task failed")
+
+
+@pytest.fixture(autouse=True)
+def asreview_path(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASREVIEW_PATH", str(tmp_path))
+    monkeypatch.setattr(tm, "run_task", run_task_stub)
+    return tmp_path
+
+
+@pytest.fixture
+def manager():
+    """Task manager with a server socket, driven with `_run_until`."""
+    manager = TaskManager(max_workers=2, port=0)
+    manager._bind_server_socket()
+    manager.server_socket.listen()
+    manager.server_socket.setblocking(False)
+    yield manager
+    manager._stop_workers()
+    manager._close()
+
+
+def _run_until(manager, condition):
+    """Run the event loop of the manager until the condition is met."""
+    end = time.monotonic() + TIMEOUT
+    while not condition():
+        if time.monotonic() > end:
+            raise TimeoutError("Condition not met")
+        manager._run_once(timeout=0.05)
+
+
+def _insert(manager, project_id, simulation=False):
+    """Insert a task, as a client message."""
+    message = {"action": "insert", "project_id": project_id, "simulation": simulation}
+    manager._process_complete_messages(json.dumps(message), None)
+    manager._process_buffer()
+
+
+def _is_idle(manager):
+    return not manager.waiting_queue and not manager.running_processes
+
+
+def test_load_waiting_queue():
+    manager = TaskManager()
+    manager.insert_in_waiting("a", False)
+    manager.insert_in_waiting("b", True)
+    manager.move_from_waiting_to_pending("a", None)
+    manager._close()
+
+    # the queue table is the log of the waiting queue
+    manager = TaskManager()
+    assert list(manager.waiting_queue.items()) == [("b", True)]
+    manager._close()
+
+
+def test_run_tasks(manager):
+    _insert(manager, "a")
+    _insert(manager, "b", simulation=True)
+    assert manager.waiting == ["a", "b"]
+
+    _run_until(manager, lambda: _is_idle(manager))
+
+    assert sorted(project_id for _, project_id in _read_task_log()) == ["a", "b"]
+    assert manager.generations["a"] == {"requested": 1, "trained": 1}
+    assert manager.generations["b"] == {"requested": 1, "trained": 1}
+
+
+def test_worker_reused(manager):
+    _insert(manager, "a")
+    _run_until(manager, lambda: _is_idle(manager))
+    _insert(manager, "b")
+    _run_until(manager, lambda: _is_idle(manager))
+
+    # both tasks ran in the same worker process
+    assert len(manager.workers) == 1
+    assert manager.workers[0].n_jobs == 2
+    pid = str(manager.workers[0].pid)
+    assert _read_task_log() == [[pid, "a"], [pid, "b"]]
+
+
+def test_worker_retired_after_max_jobs(manager):
+    manager.worker_max_jobs = 2
+
+    _insert(manager, "a")
+    manager.pop_waiting_queue()
+    worker = manager.running_processes["a"]
+    _run_until(manager, lambda: _is_idle(manager))
+    _insert(manager, "b")
+    _run_until(manager, lambda: _is_idle(manager))
+    _insert(manager, "c")
+    _run_until(manager, lambda: _is_idle(manager) and not manager.retired_workers)
+
+    # the used up worker stopped, the next task ran in a new worker
+    assert not worker.is_alive()
+    assert worker not in manager.workers
+    assert len(manager.workers) == 1
+    assert _read_task_log() == [
+        [str(worker.pid), "a"],
+        [str(worker.pid), "b"],
+        [str(manager.workers[0].pid), "c"],
+    ]
+
+
+def test_task_failure(manager):
+    _insert(manager, "fail")
+    _run_until(manager, lambda: _is_idle(manager))
+
+    # the failed task isn't trained, and the worker stays in the pool
+    assert manager.generations["fail"] == {"requested": 1, "trained": 0}
+    assert len(manager.workers) == 1
+    assert manager.workers[0].is_alive()
+
+    _insert(manager, "a")
+    _run_until(manager, lambda: _is_idle(manager))
+    pid = str(manager.workers[0].pid)
+    assert _read_task_log() == [[pid, "fail"], [pid, "a"]]
+    assert manager.generations["a"] == {"requested": 1, "trained": 1}
+
+
+def test_failure_payload(asreview_path):
+    worker = tm.TaskWorker(func=run_task_stub)
+    worker.start()
+    try:
+        worker.conn.send(("fail", False))
+        assert worker.conn.poll(TIMEOUT)
+        assert worker.conn.recv() == {"action": "failure", "project_id": "fail"}
+
+        worker.conn.send(("a", False))
+        assert worker.conn.poll(TIMEOUT)
+        assert worker.conn.recv() == {"action": "remove", "project_id": "a"}
+    finally:
+        worker.conn.send(None)
+        worker.join(TIMEOUT)
+    assert worker.exitcode == 0
+
+
+def test_coalesce_inserts(manager):
+    _insert(manager, "block")
+    manager.pop_waiting_queue()
+
+    # inserts while the task is running wait for one follow-up task
+    for _ in range(3):
+        _insert(manager, "block")
+    assert manager.waiting == []
+    assert manager.generations["block"] == {"requested": 4, "trained": 0}
+
+    Path(os.environ["ASREVIEW_PATH"], "release").touch()
+    _run_until(manager, lambda: _is_idle(manager))
+
+    assert [project_id for _, project_id in _read_task_log()] == ["block"] * 2
+    assert manager.generations["block"] == {"requested": 4, "trained": 4}
+
+
+def test_insert_before_task_starts(manager):
+    # inserts before the task starts are covered by the task
+    for _ in range(3):
+        _insert(manager, "a")
+    _run_until(manager, lambda: _is_idle(manager))
+
+    assert [project_id for _, project_id in _read_task_log()] == ["a"]
+    assert manager.generations["a"] == {"requested": 3, "trained": 3}
+
+
+def test_generations_persisted(manager):
+    _insert(manager, "a")
+    _run_until(manager, lambda: _is_idle(manager))
+    _insert(manager, "a")
+    _insert(manager, "fail")
+    _run_until(manager, lambda: _is_idle(manager))
+    manager._close()
+
+    # the generations table keeps the generations over restarts
+    manager = TaskManager()
+    assert manager.generations == {
+        "a": {"requested": 2, "trained": 2},
+        "fail": {"requested": 1, "trained": 0},
+    }
+    _insert(manager, "a")
+    assert manager.generations["a"] == {"requested": 3, "trained": 2}
+    manager._close()
+
+
+def test_worker_dies_while_running(manager):
+    _insert(manager, "crash")
+    manager.pop_waiting_queue()
+    worker = manager.running_processes["crash"]
+
+    _run_until(manager, lambda: _is_idle(manager))
+
+    assert worker not in manager.workers
+    assert not worker.is_alive()
+    assert manager.generations["crash"] == {"requested": 1, "trained": 0}
+
+    # the next task gets a new worker
+    _insert(manager, "a")
+    _run_until(manager, lambda: _is_idle(manager))
+    assert _read_task_log() == [[str(manager.workers[0].pid), "a"]]
+
+
+def test_worker_stops_after_result(manager):
+    _insert(manager, "a")
+    manager.pop_waiting_queue()
+    worker = manager.running_processes["a"]
+
+    # the worker stops after sending its result, before the manager reads it
+    assert worker.conn.poll(TIMEOUT)
+    worker.conn.send(None)
+    worker.join(TIMEOUT)
+    assert not worker.is_alive()
+
+    manager._remove_worker(worker)
+
+    # the result of the task is applied
+    assert _is_idle(manager)
+    assert worker not in manager.workers
+    assert manager.generations["a"] == {"requested": 1, "trained": 1}
+
+
+def test_reset_pending(manager):
+    _insert(manager, "block")
+    manager.pop_waiting_queue()
+    worker = manager.running_processes["block"]
+
+    manager.message_buffer.append({"action": "reset_pending"})
+    manager._process_buffer()
+
+    assert not worker.is_alive()
+    assert worker not in manager.workers
+    assert _is_idle(manager)
+
+    # the manager keeps running tasks after the reset
+    _insert(manager, "a")
+    _run_until(manager, lambda: _is_idle(manager))
+    assert [project_id for _, project_id in _read_task_log()] == ["a"]
+
+
+def _query(manager, message):
+    """Send a message to the manager and return its response."""
+    host, port = manager.server_socket.getsockname()
+    with socket.create_connection((host, port), timeout=TIMEOUT) as client:
+        client.sendall(json.dumps(message).encode("utf-8"))
+        _run_until(manager, lambda: wait([client], timeout=0))
+        return json.loads(client.recv(1024).decode("utf-8"))
+
+
+def test_status_query(manager):
+    _insert(manager, "block")
+    manager.pop_waiting_queue()
+
+    assert _query(manager, {"action": "status_query"}) == {
+        "max_workers": 2,
+        "currently_running": 1,
+        "available_slots": 1,
+        "running_project_ids": ["block"],
+    }
+
+    Path(os.environ["ASREVIEW_PATH"], "release").touch()
+    _run_until(manager, lambda: _is_idle(manager))
+
+
+def test_generation_query(manager):
+    _insert(manager, "block")
+    manager.pop_waiting_queue()
+
+    query = {"action": "generation_query", "project_id": "block"}
+    assert _query(manager, query) == {
+        "project_id": "block",
+        "requested": 1,
+        "trained": 0,
+    }
+
+    Path(os.environ["ASREVIEW_PATH"], "release").touch()
+    _run_until(manager, lambda: _is_idle(manager))
+    assert _query(manager, query) == {
+        "project_id": "block",
+        "requested": 1,
+        "trained": 1,
+    }
+
+
+def test_stop_manager(monkeypatch):
+    # signal handlers can only be set on the main thread
+    monkeypatch.setattr(tm.signal, "signal", lambda *args: None)
+
+    manager = TaskManager(port=0)
+    started = threading.Event()
+    thread = threading.Thread(
+        target=manager.start_manager, kwargs={"mp_start_event": started}
+    )
+    thread.start()
+    assert started.wait(TIMEOUT)
+
+    # the manager waits for events without a timeout, stop_manager wakes it up
+    manager.stop_manager()
+    thread.join(TIMEOUT)
+    assert not thread.is_alive()
+    assert manager.server_socket is None
+    assert manager.session is None
+
+
+def _get_free_port():
+    with socket.socket() as s:
+        s.bind((tm.DEFAULT_TASK_MANAGER_HOST, 0))
+        return s.getsockname()[1]
+
+
+def _start_manager_and_exit(port, started):
+    """Start a task manager in a child process and exit without stopping it."""
+    process = mp.Process(
+        target=run_task_manager, kwargs={"port": port, "mp_start_event": started}
+    )
+    process.start()
+    started.wait(TIMEOUT)
+    os._exit(0)
+
+
+def _is_listening(port):
+    try:
+        with socket.create_connection((tm.DEFAULT_TASK_MANAGER_HOST, port), 1):
+            return True
+    except OSError:
+        return False
+
+
+def test_stop_manager_parent_exit():
+    port = _get_free_port()
+    started = mp.Event()
+    parent = mp.Process(target=_start_manager_and_exit, args=(port, started))
+    parent.start()
+    parent.join(TIMEOUT)
+    assert started.is_set()
+
+    # the manager stops when its parent process exits
+    end = time.monotonic() + TIMEOUT
+    while _is_listening(port):
+        assert time.monotonic() < end, "Task manager didn't stop"
+        time.sleep(0.1)
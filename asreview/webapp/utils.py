@@ -48,6 +48,11 @@ def get_projects(project_paths=None):
         Projects at the given project paths.
     """
     if project_paths is None:
-        project_paths = [path for path in asreview_path().iterdir() if path.is_dir()]
+        # hidden folders are projects that are being imported
+        project_paths = [
+            path
+            for path in asreview_path().iterdir()
+            if path.is_dir() and not path.name.startswith(".")
+        ]
 
     return [Project(project_path) for project_path in project_paths]
@@ -31,6 +31,13 @@ def osf_fg93a_path():
     return cache_file
 
 
+@pytest.fixture(autouse=True)
+def feature_cache_path(tmp_path, monkeypatch):
+    """Store cached feature matrices in a temporary directory."""
+    monkeypatch.setenv("ASREVIEW_CACHE_PATH", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
 @pytest.fixture
 def demo_data(render_data=False):
     """Get a demo dataset.
@@ -1,12 +1,21 @@
 import urllib
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
+import pytest
 from pytest import mark
 
 import asreview as asr
+from asreview.data.record import Record
 from asreview.data.search import fuzzy_find
+from asreview.data.utils import convert_series_to_int
+from asreview.data.utils import convert_series_to_list
+from asreview.data.utils import convert_value_to_int
+from asreview.data.utils import convert_value_to_list
 from asreview.data.utils import duplicated
+from asreview.data.utils import standardize_included_label
+from asreview.data.utils import standardize_included_labels
 from asreview.datasets import DatasetManager
 
 
@@ -34,6 +43,31 @@ def test_fuzzy_finder(keywords, record_id):
         assert fuzzy_find(db.input, keywords)[0] == record_id
 
 
+def test_fuzzy_finder_search_index():
+    fp = Path("tests", "demo_data", "embase.csv")
+    with asr.load_dataset(fp) as db:
+        df = db.input[["title", "authors", "keywords"]]
+        assert fuzzy_find(db.input, "cyst embryogenesis", max_return=3) == (
+            fuzzy_find(df, "cyst embryogenesis", max_return=3)
+        )
+
+        # records added after the index is built are indexed on the next search
+        db.input.add_records(
+            [
+                Record(
+                    dataset_row=0,
+                    dataset_id="new",
+                    title="Müller's analysis",
+                    authors=["Þórsson, Á."],
+                )
+            ]
+        )
+        record_id = len(db.input) - 1
+        assert fuzzy_find(db.input, "Müller's")[0] == record_id
+        assert fuzzy_find(db.input, "þórson")[0] == record_id
+        assert record_id not in fuzzy_find(db.input, "Müller's", exclude=[record_id])
+
+
 @mark.internet_required
 @mark.parametrize(
     "data_name",
@@ -106,6 +140,24 @@ def test_duplicated():
     assert result.equals(pd.Series([False, False, True, True, True, True, True, True]))
 
 
+def test_duplicated_similarity_threshold():
+    data = pd.DataFrame(
+        {
+            "title": [
+                "Active learning for systematic reviews",
+                "Machine learning in medicine",
+                "Active learning for systematic review",
+            ],
+            "abstract": ["", "", ""],
+        }
+    )
+
+    assert not duplicated(data, pid=None).any()
+    assert duplicated(data, pid=None, similarity_threshold=0.8).equals(
+        pd.Series([False, False, True])
+    )
+
+
 def test_duplicated_empty_pid():
     data = pd.DataFrame(
         {
@@ -130,3 +182,52 @@ def test_duplicated_all_empty():
 
     result = duplicated(data)
     assert result.equals(pd.Series([False, False, False, False, False, False]))
+
+
+@mark.parametrize(
+    "values",
+    [
+        ["Foo;Bar", None, np.nan, "Baz"],
+        [None, np.nan],
+        [["Foo", "Bar"], "Baz", None],
+        [np.array(["Foo"]), ["Bar"]],
+    ],
+)
+def test_convert_series_to_list(values):
+    s = pd.Series(values, index=range(10, 10 + len(values)))
+    expected = s.apply(convert_value_to_list)
+    result = convert_series_to_list(s)
+    assert result.index.equals(s.index)
+    assert result.tolist() == expected.tolist()
+
+
+@mark.parametrize(
+    "values",
+    [
+        [2000, 2001],
+        [2000.0, np.nan],
+        ["2000", " 1999 ", None],
+        ["2000", 2001.0, None],
+    ],
+)
+def test_convert_series_to_int(values):
+    s = pd.Series(values)
+    expected = [None if pd.isna(v) else v for v in s.apply(convert_value_to_int)]
+    result = convert_series_to_int(s)
+    assert result.tolist() == expected
+    assert all(v is None or type(v) is int for v in result)
+
+
+@mark.parametrize("values", [["2000.0"], ["10 15", "2000"], [1.5]])
+def test_convert_series_to_int_error(values):
+    with pytest.raises(ValueError):
+        convert_series_to_int(pd.Series(values))
+
+
+def test_standardize_included_labels():
+    s = pd.Series(["yes", "no", "y", "n", "1", "0", "", None, np.nan, 1, 0, "maybe"])
+    expected = [
+        None if not isinstance(v, str) and pd.isna(v) else v
+        for v in s.apply(standardize_included_label)
+    ]
+    assert standardize_included_labels(s).tolist() == expected
@@ -1,6 +1,7 @@
 import sqlite3
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import pytest
 from sqlalchemy.exc import IntegrityError
@@ -11,8 +12,11 @@ from asreview.data.loader import load_records
 from asreview.data.record import Base
 from asreview.data.record import Record
 from asreview.data.utils import _clean_text
+from asreview.data.utils import EMPTY_SIGNATURE
 from asreview.data.utils import identify_groups
+from asreview.data.utils import identify_near_duplicate_groups
 from asreview.data.utils import identify_record_groups
+from asreview.data.utils import minhash_signatures
 from asreview.database.store import SQLITE_MAX_VARIABLE_NUMBER
 from asreview.database.store import DataStore
 from asreview.project.api import Project
@@ -167,6 +171,40 @@ def test_label_validation(store):
         store.add_records([Record(dataset_id="foo", dataset_row=4, included="1")])
 
 
+def test_add_dataframe(store, tmpdir, records):
+    columns = ["title", "abstract", "authors", "keywords", "year", "doi", "url"]
+    df = pd.DataFrame(
+        {column: [getattr(r, column) for r in records] for column in columns},
+        index=[r.dataset_row for r in records],
+    )
+    df["extra_column"] = "foo"
+    record_ids = store.add_dataframe(df, dataset_id="foo")
+    assert record_ids == list(range(len(records)))
+    assert store.add_dataframe(df.iloc[:1], dataset_id="bar") == [len(records)]
+
+    expected_store = DataStore(tmpdir / "expected.db")
+    expected_store.create_tables()
+    expected_store.add_records(records)
+    pd.testing.assert_frame_equal(store.get_df().iloc[:-1], expected_store.get_df())
+
+
+@pytest.mark.parametrize(
+    "column,value",
+    [
+        ("authors", "Foo;Bar"),
+        ("keywords", ["Foo", 1]),
+        ("included", "1"),
+        ("year", "10 15"),
+        ("title", 1),
+    ],
+)
+def test_add_dataframe_validation(store, column, value):
+    df = pd.DataFrame({"title": ["Foo", "Bar"], column: [None, value]})
+    with pytest.raises(ValueError, match="row 1"):
+        store.add_dataframe(df, dataset_id="foo")
+    assert store.is_empty()
+
+
 def test_delete_record(store):
     record = Record(dataset_id="foo", dataset_row=1)
     store.add_records([record])
@@ -437,6 +475,70 @@ def test_identify_record_groups_default_extractors():
     assert set(result) == {(0, 0), (0, 1), (0, 2), (3, 3), (3, 4), (5, 5)}
 
 
+def test_minhash_signatures():
+    text = "activelearningforsystematicreviewsofthemedicalliterature"
+    signatures = minhash_signatures([text, text, text[::-1], "abc", ""])
+
+    assert signatures.shape == (5, 64)
+    assert signatures.dtype == np.uint32
+    assert (signatures[0] == signatures[1]).all()
+    assert (signatures[0] == signatures[2]).mean() < 0.5
+    assert (signatures[3] != EMPTY_SIGNATURE).all()
+    assert (signatures[4] == EMPTY_SIGNATURE).all()
+
+    with pytest.raises(ValueError):
+        minhash_signatures([text], num_perm=60)
+
+
+def test_identify_near_duplicate_groups():
+    abstract = (
+        "background active learning reduces the screening workload of systematic "
+        "reviews we simulate the screening process on twenty labeled datasets and "
+        "compare the performance of several models"
+    )
+    texts = [
+        abstract,
+        "an unrelated abstract about the measurement of air quality in cities",
+        abstract.replace("twenty", "twentysix"),
+        "",
+        "",
+    ]
+    signatures = minhash_signatures(texts)
+
+    assert identify_near_duplicate_groups(signatures, 0.8) == [
+        (0, 0),
+        (1, 1),
+        (0, 2),
+        (3, 3),
+        (4, 4),
+    ]
+    assert identify_near_duplicate_groups(signatures, 0.8, groups=[(3, 4)]) == [
+        (0, 0),
+        (1, 1),
+        (0, 2),
+        (3, 3),
+        (3, 4),
+    ]
+    assert identify_near_duplicate_groups(signatures, 1.0)[2] == (2, 2)
+
+
+def test_identify_record_groups_near_duplicates():
+    records = [
+        Record("ds1", 0, title="Active learning for systematic reviews"),
+        Record("ds1", 1, title="Active learning for systematic review"),
+        Record("ds1", 2, title="Machine learning in medicine"),
+    ]
+    for i, record in enumerate(records):
+        record.record_id = i + 10
+
+    assert set(identify_record_groups(records)) == {(10, 10), (11, 11), (12, 12)}
+    assert set(identify_record_groups(records, similarity_threshold=0.8)) == {
+        (10, 10),
+        (10, 11),
+        (12, 12),
+    }
+
+
 @pytest.fixture
 def large_store(tmpdir):
     n = SQLITE_MAX_VARIABLE_NUMBER + 100
@@ -509,3 +611,45 @@ def test_get_df_sorted_by_record_id_with_duplicates(store):
     df = store.get_df()
     assert df["record_id"].is_monotonic_increasing
     assert df["record_id"].to_list() == list(range(6))
+
+
+def test_column_cache(store_with_data, records):
+    titles = store_with_data[["title", "abstract"]]
+    other_store = DataStore(store_with_data.fp)
+    other_titles = other_store[["title", "abstract"]]
+
+    # the columns are shared with the other store and can't be changed
+    assert np.shares_memory(titles["title"].values, other_titles["title"].values)
+    with pytest.raises(ValueError, match="read-only"):
+        titles.loc[0, "title"] = "Foo"
+    assert other_store["title"][0] == records[0].title
+
+    # the columns are read again after each write
+    store_with_data.add_records([Record(dataset_id="bar", dataset_row=0)])
+    assert len(other_store["title"]) == len(records) + 1
+    store_with_data.add_dataframe(pd.DataFrame({"title": ["Foo"]}), dataset_id="baz")
+    assert other_store["title"].iloc[-1] == "Foo"
+    store_with_data.set_groups([(0, 0), (0, 1)])
+    assert other_store["duplicate_of"][1] == 0
+    store_with_data.delete_record(len(records) + 1)
+    assert len(other_store["title"]) == len(records) + 1
+
+
+def test_column_cache_without_version(store_with_data, records):
+    with sqlite3.connect(store_with_data.fp) as con:
+        con.execute("DROP TABLE record_version")
+        con.execute("UPDATE record SET title = 'Foo' WHERE record_id = 0")
+    con.close()
+
+    read_only_store = DataStore(store_with_data.fp, read_only=True)
+    assert read_only_store["title"][0] == "Foo"
+    assert store_with_data["title"][0] == "Foo"
+    titles = store_with_data["title"]
+    assert np.shares_memory(titles.values, store_with_data["title"].values)
+
+
+def test_column_cache_disabled(store_with_data):
+    store = DataStore(store_with_data.fp, column_cache=False)
+    titles = store["title"]
+    titles[0] = "Foo"
+    assert not np.shares_memory(titles.values, store["title"].values)
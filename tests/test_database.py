@@ -1,4 +1,6 @@
+import shutil
 import sqlite3
+import threading
 from pathlib import Path
 
 import pandas as pd
@@ -6,8 +8,10 @@ import pytest
 
 import asreview as asr
 from asreview.data.loader import load_records
+from asreview.database.connection import dispose
 from asreview.database.database import CURRENT_DATABASE_VERSION
 from asreview.database.database import REQUIRED_TABLES
+from asreview.database.database import RESULTS_INDEXES
 from asreview.data.record import Record
 
 
@@ -94,12 +98,84 @@ def test_results_manual_close(tmpdir):
     db.create_tables()
     conn = db._conn
     db.close()
+
+    # the connection is returned to the connection pool of the database file
+    with asr.Database(fp) as db2:
+        assert db2._conn is conn
+
+    dispose(fp)
     with pytest.raises(
         sqlite3.ProgrammingError, match="Cannot operate on a closed database"
     ):
         conn.execute("SELECT 1")
 
 
+def test_wal_mode(tmpdir):
+    fp = Path(tmpdir, "test.db")
+    with asr.Database(fp) as db:
+        db.create_tables()
+        assert db._conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert db._conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+
+    with asr.Database(fp, pragmas={"synchronous": "FULL"}) as db:
+        assert db._conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+
+def test_concurrent_readers(tmpdir):
+    fp = Path(tmpdir, "test.db")
+    with asr.Database(fp) as db:
+        db.create_tables()
+        db.input.add_records([Record(i, "foo", title=f"title {i}") for i in range(100)])
+
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        try:
+            while not stop.is_set():
+                with asr.Database(fp) as db:
+                    db.get_results_table()
+                    db.input["title"]
+        except Exception as err:
+            errors.append(err)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+
+    try:
+        with asr.Database(fp) as db:
+            for record_id in range(100):
+                db.label_record(record_id, record_id % 2)
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+
+    assert errors == []
+    with asr.Database(fp) as db:
+        assert len(db.get_results_table()) == 100
+
+
+def test_replace_database_file(tmpdir):
+    fp = Path(tmpdir, "project", "test.db")
+    fp.parent.mkdir()
+    with asr.Database(fp) as db:
+        db.create_tables()
+        db.input.add_records([Record(0, "foo")])
+
+    # pooled connections to the removed file are not reused
+    shutil.rmtree(fp.parent)
+    fp.parent.mkdir()
+    with asr.Database(fp) as db:
+        db.create_tables()
+        assert len(db.input) == 0
+        db.input.add_records([Record(0, "foo"), Record(1, "foo")])
+
+    with asr.Database(fp) as db:
+        assert len(db.input) == 2
+
+
 def test_results_close_before_conn_created(tmpdir):
     fp = Path(tmpdir, "test.db")
     db = asr.Database(fp)
@@ -107,30 +183,27 @@ def test_results_close_before_conn_created(tmpdir):
 
 
 def test_results_closes_connection_on_exit(tmpdir):
-    """Test that results closes the SQLite connection when exiting context."""
+    """Test that results releases the SQLite connection when exiting context."""
     fp = Path(tmpdir, "test.db")
     with asr.Database(fp) as db:
         db.create_tables()
-        conn = db._conn
-    with pytest.raises(
-        sqlite3.ProgrammingError, match="Cannot operate on a closed database"
-    ):
-        conn.execute("SELECT 1")
+        db._conn
+        assert db.input.engine.pool.checkedout() == 1
+    assert "_conn" not in db.__dict__
+    assert db.input.engine.pool.checkedout() == 0
 
 
 def test_results_closes_on_exception(tmpdir):
-    """Test that Database closes connection even when exception occurs."""
+    """Test that Database releases connection even when exception occurs."""
     fp = Path(tmpdir, "test.db")
 
     with pytest.raises(ValueError):
         with asr.Database(fp) as db:
             db.create_tables()
-            conn = db._conn
+            db._conn
             raise ValueError("Something went wrong")
-    with pytest.raises(
-        sqlite3.ProgrammingError, match="Cannot operate on a closed database"
-    ):
-        conn.execute("SELECT 1")
+    assert "_conn" not in db.__dict__
+    assert db.input.engine.pool.checkedout() == 0
 
 
 def test_read_only(tmpdir, asreview_test_project):
@@ -556,6 +629,233 @@ def test_get_pending(db_with_data):
     assert db_with_data.get_pending(user_id=3)["record_id"].to_list() == []
 
 
+def _get_index_names(con):
+    return {
+        row[0]
+        for row in con.execute("SELECT name FROM sqlite_master WHERE type='index'")
+    }
+
+
+def test_add_last_ranking_keeps_indexes(db_with_data):
+    db_with_data.add_last_ranking([9, 10, 11], "nb", "max", "balanced", "tfidf", 5)
+    assert set(RESULTS_INDEXES).issubset(_get_index_names(db_with_data._conn))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        db_with_data.add_last_ranking([9, 9], "nb", "max", "balanced", "tfidf", 5)
+    # the failed replacement is rolled back
+    assert db_with_data.get_last_ranking_table()["record_id"].tolist() == [9, 10, 11]
+
+
+def test_replace_last_ranking_doesnt_block(db_with_data):
+    db_with_data.add_last_ranking([9, 10, 11], "nb", "max", "balanced", "tfidf", 5)
+    seen = []
+
+    def rows():
+        # other connections can label records and read the old ranking while the
+        # new ranking is written
+        with asr.Database(db_with_data.fp, pragmas={"busy_timeout": 100}) as other:
+            other.label_record(11, 1)
+            seen.extend(other.get_last_ranking_table()["record_id"])
+        for ranking, record_id in enumerate([8, 7, 6]):
+            yield record_id, ranking, "nb", "max", "balanced", "tfidf", 6, 0.0
+
+    db_with_data._replace_last_ranking(rows())
+
+    assert seen == [9, 10, 11]
+    assert db_with_data.get_last_ranking_table()["record_id"].tolist() == [8, 7, 6]
+    assert 11 in db_with_data.get_results_table()["record_id"].tolist()
+    # the temporary table is removed
+    assert (
+        db_with_data._conn.execute(
+            "SELECT name FROM sqlite_temp_master WHERE type='table'"
+        ).fetchall()
+        == []
+    )
+
+
+@pytest.mark.parametrize(
+    "method,kwargs",
+    [
+        ("get_pool", {}),
+        ("get_unlabeled", {}),
+        ("get_unlabeled", {"groups": True}),
+        ("get_pending", {}),
+        ("get_priors", {}),
+        ("get_results_table", {"priors": False}),
+        ("query_top_ranked", {}),
+    ],
+)
+def test_query_plans(db_with_data, method, kwargs):
+    """The queries don't sort and don't scan the record table."""
+    statements = []
+    db_with_data._conn.set_trace_callback(statements.append)
+    getattr(db_with_data, method)(**kwargs)
+    db_with_data._conn.set_trace_callback(None)
+
+    plans = [
+        row[3]
+        for statement in statements
+        if statement.split()[0].upper() in ("SELECT", "INSERT")
+        for row in db_with_data._conn.execute(f"EXPLAIN QUERY PLAN {statement}")
+    ]
+    assert plans
+    assert not any("TEMP B-TREE" in plan for plan in plans)
+    assert not any(plan.startswith("SCAN record") for plan in plans)
+    if method in ("get_pool", "get_unlabeled", "query_top_ranked"):
+        assert any("idx_last_ranking_ranking" in plan for plan in plans)
+
+
+def test_upgrade_v3_v4(tmpdir):
+    fp = Path(tmpdir, "test.db")
+    with asr.Database(fp) as db:
+        db.create_tables()
+        db.input.add_records([Record(i, "foo") for i in range(3)])
+        db.label_record(1, 1)
+
+    # a version 3 database, where the last ranking was replaced by pandas
+    with sqlite3.connect(fp) as con:
+        for index in RESULTS_INDEXES:
+            con.execute(f"DROP INDEX {index}")
+        pd.DataFrame(
+            {
+                "record_id": [2, 0, 1],
+                "ranking": [0, 1, 2],
+                "classifier": "nb",
+                "querier": "max",
+                "balancer": "balanced",
+                "feature_extractor": "tfidf",
+                "training_set": 1,
+                "time": 0.0,
+            }
+        ).to_sql("last_ranking", con, if_exists="replace", index=False)
+        con.execute("PRAGMA user_version = 3")
+    con.close()
+
+    with asr.Database(fp, read_only=True) as db:
+        assert db.user_version == 3
+        db._is_valid()
+
+    with asr.Database(fp) as db:
+        assert db.user_version == CURRENT_DATABASE_VERSION
+        db._is_valid()
+        assert set(RESULTS_INDEXES).issubset(_get_index_names(db._conn))
+        assert db.get_last_ranking_table()["record_id"].tolist() == [2, 0, 1]
+        assert db.get_pool().tolist() == [2, 0]
+        with pytest.raises(sqlite3.IntegrityError):
+            db._conn.execute("INSERT INTO last_ranking (record_id) VALUES (2)")
+
+
+def test_get_results_stats(db_with_data):
+    assert db_with_data.get_results_stats() == {
+        "n_included": 1,
+        "n_excluded": 1,
+        "n_prior_included": 1,
+        "n_prior_excluded": 1,
+        "n_pending": 2,
+        "n_since_last_relevant": 0,
+    }
+
+    db_with_data.label_record(6, 0)
+    db_with_data.label_record(8, 0)
+    stats = db_with_data.get_results_stats()
+    assert (stats["n_excluded"], stats["n_pending"]) == (3, 0)
+    assert stats["n_since_last_relevant"] == 2
+
+    db_with_data.update_result(3, label=0)
+    db_with_data.delete_result(6)
+    stats = db_with_data.get_results_stats()
+    assert (stats["n_included"], stats["n_excluded"]) == (0, 3)
+    assert stats["n_since_last_relevant"] == 3
+
+    # the counts are computed again if the groups change
+    db_with_data.input.set_groups([(2, 2), (2, 5)])
+    stats = db_with_data.get_results_stats()
+    assert (stats["n_excluded"], stats["n_prior_included"]) == (2, 1)
+    assert stats["n_since_last_relevant"] == 2
+
+
+def test_results_stats_match_results_table(db_with_data):
+    """The counts kept by the triggers match the results table."""
+    db_with_data.get_results_stats()
+    db_with_data.label_record(11, 1)
+    db_with_data.update_result(5, label=1)
+    db_with_data.delete_result(0)
+
+    stats = db_with_data.get_results_stats()
+    results = db_with_data.get_results_table(["label", "querier"], pending=True)
+    priors = results["querier"].isna()
+    assert stats["n_included"] == (results["label"][~priors] == 1).sum()
+    assert stats["n_excluded"] == (results["label"][~priors] == 0).sum()
+    assert stats["n_prior_included"] == (results["label"][priors] == 1).sum()
+    assert stats["n_prior_excluded"] == (results["label"][priors] == 0).sum()
+    assert stats["n_pending"] == results["label"].isna().sum()
+
+
+@pytest.mark.parametrize(
+    "kwargs,expected,count",
+    [
+        ({}, [0, 2, 5, 3], 4),
+        ({"latest_first": True}, [3, 5, 2, 0], 4),
+        ({"label": 1}, [2, 3], 2),
+        ({"label": 0, "priors_only": True}, [0], 1),
+        ({"limit": 2}, [0, 2], 4),
+        ({"limit": 2, "offset": 2}, [5, 3], 4),
+        ({"latest_first": True, "limit": 1, "offset": 1}, [5], 4),
+        ({"has_note": True, "limit": 1}, [5], 1),
+    ],
+)
+def test_get_labeled_results(db_with_data, kwargs, expected, count):
+    db_with_data.update_note(5, "note")
+    df, n = db_with_data.get_labeled_results(**kwargs)
+    assert df["record_id"].to_list() == expected
+    assert n == count
+
+
+@pytest.mark.parametrize("latest_first", [False, True])
+def test_get_labeled_results_after(db_with_data, latest_first):
+    """Paging with the last position gives the same pages as paging by offset."""
+    pages = []
+    page, _ = db_with_data.get_labeled_results(latest_first=latest_first, limit=3)
+    while len(page):
+        pages.append(page)
+        page, _ = db_with_data.get_labeled_results(
+            latest_first=latest_first, limit=3, after=page.index[-1]
+        )
+
+    assert len(pages) == 2
+    for i, page in enumerate(pages):
+        expected, _ = db_with_data.get_labeled_results(
+            latest_first=latest_first, limit=3, offset=3 * i
+        )
+        pd.testing.assert_frame_equal(page, expected)
+
+
+def test_upgrade_v4_v5(tmpdir):
+    fp = Path(tmpdir, "test.db")
+    with asr.Database(fp) as db:
+        db.create_tables()
+        db.input.add_records([Record(i, "foo") for i in range(3)])
+        db.label_record(1, 1)
+
+    # a version 4 database, without the results_stats table
+    with sqlite3.connect(fp) as con:
+        con.execute("DROP TABLE results_stats")
+        for trigger in ["insert", "update", "delete"]:
+            con.execute(f"DROP TRIGGER trg_results_stats_{trigger}")
+        con.execute("PRAGMA user_version = 4")
+    con.close()
+
+    with asr.Database(fp, read_only=True) as db:
+        assert db.get_results_stats()["n_prior_included"] == 1
+
+    with asr.Database(fp) as db:
+        assert db.user_version == CURRENT_DATABASE_VERSION
+        db.label_record(2, 0)
+        assert db.get_results_stats()["n_prior_excluded"] == 1
+        db.label_record(0, 0)
+        assert db.get_results_stats()["n_prior_excluded"] == 2
+
+
 def test_exist_new_labeled_records(db):
     records = [
         Record(0, "foo"),
@@ -1,10 +1,16 @@
 import os
+from pathlib import Path
 
+import numpy as np
 import pytest
+from sklearn.random_projection import GaussianRandomProjection
 
 import asreview as asr
 from asreview.extensions import extensions
 from asreview.extensions import load_extension
+from asreview.models.feature_cache import FeatureMatrixCache
+from asreview.models.feature_cache import load_feature_matrix
+from asreview.models.feature_cache import save_feature_matrix
 
 REQUIRES_AI_MODEL_DEP = ["doc2vec", "embedding-idf", "sbert"]
 
@@ -36,3 +42,75 @@ def test_features(tmpdir, feature_extractor):
 
     assert X.shape[0] == len(db.input)
     assert X.shape[1] > 0
+
+
+def test_feature_cache(tmpdir, demo_data):
+    cache = FeatureMatrixCache(tmpdir)
+    model = load_extension("models.feature_extractors", "tfidf")()
+
+    key = cache.key(model, demo_data)
+    assert cache.get(key) is None
+
+    X = cache.fit_transform(model, demo_data)
+    X_cached = cache.get(key)
+    assert (X != X_cached).nnz == 0
+
+    # changed parameters or data give a different key
+    model_bigram = load_extension("models.feature_extractors", "tfidf")(
+        ngram_range=(1, 2)
+    )
+    assert cache.key(model_bigram, demo_data) != key
+    assert cache.key(model, demo_data.iloc[1:]) != key
+    assert cache.key(model, demo_data.drop(columns="label_included")) == key
+
+
+def test_feature_cache_evict(tmpdir):
+    cache = FeatureMatrixCache(tmpdir, max_size=1000)
+
+    cache.put("a", np.zeros(100))
+    cache.get("a")
+    cache.put("b", np.zeros(100))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+
+
+def test_feature_matrix_mmap(tmpdir, demo_data):
+    model = load_extension("models.feature_extractors", "tfidf")()
+    X = model.fit_transform(demo_data)
+
+    fp = save_feature_matrix(X, Path(tmpdir, "tfidf"))
+    assert fp.suffix == ".csr"
+    X_mmap = load_feature_matrix(fp)
+    assert not X_mmap.data.flags.writeable
+    assert (X != X_mmap).nnz == 0
+
+    fp = save_feature_matrix(X.toarray(), Path(tmpdir, "dense"))
+    assert fp.suffix == ".npy"
+    X_mmap = load_feature_matrix(fp)
+    assert isinstance(X_mmap, np.memmap)
+    assert not X_mmap.flags.writeable
+    np.testing.assert_array_equal(X.toarray(), X_mmap)
+
+
+def test_save_feature_matrix_overwrite(tmpdir, demo_data):
+    model = load_extension("models.feature_extractors", "tfidf")()
+    X = model.fit_transform(demo_data)
+
+    for fm in [X, X.toarray()]:
+        save_feature_matrix(fm[:10], Path(tmpdir, "fm"))
+        fp = save_feature_matrix(fm, Path(tmpdir, "fm"))
+        assert load_feature_matrix(fp).shape == X.shape
+
+    assert sorted(fp.name for fp in Path(tmpdir).iterdir()) == ["fm.csr", "fm.npy"]
+
+
+def test_feature_cache_random_state(tmpdir):
+    cache = FeatureMatrixCache(tmpdir)
+    X = np.random.rand(10, 20)
+
+    cache.fit_transform(GaussianRandomProjection(n_components=2), X)
+    assert cache._list() == []
+
+    model = GaussianRandomProjection(n_components=2, random_state=42)
+    cache.fit_transform(model, X)
+    assert cache.get(cache.key(model, X)) is not None
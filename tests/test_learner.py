@@ -1,6 +1,7 @@
 from itertools import product
 from pathlib import Path
 
+import numpy as np
 import pytest
 
 import asreview as asr
@@ -182,3 +183,49 @@ def test_alc_to_and_from_file(tmpdir, classifier, feature_extractor):
         == alc1_from_file.querier.get_params()
         == alc2_from_meta.querier.get_params()
     ), "Querier parameters do not match"
+
+
+@pytest.mark.parametrize("classifier", ["nb", "logistic"])
+def test_alc_fit_incremental(demo_data, classifier):
+    fm = asr.load_extension("models.feature_extractors", "tfidf")().fit_transform(
+        demo_data
+    )
+    y = demo_data["label_included"].values
+    record_ids = np.random.RandomState(535).permutation(len(y))
+
+    def _cycle(incremental):
+        return asr.ActiveLearningCycle(
+            querier=Max(),
+            classifier=asr.load_extension("models.classifiers", classifier)(),
+            balancer=Balanced(ratio=5),
+            incremental=incremental,
+        )
+
+    cycle = _cycle(incremental=True)
+    for n in [20, 21, 30, 50]:
+        cycle.fit(fm[record_ids[:n]], y[record_ids[:n]], record_ids=record_ids[:n])
+        cycle_full = _cycle(incremental=False).fit(
+            fm[record_ids[:n]], y[record_ids[:n]]
+        )
+
+        np.testing.assert_allclose(
+            cycle.classifier.predict_proba(fm),
+            cycle_full.classifier.predict_proba(fm),
+            atol=1e-3,
+        )
+        np.testing.assert_array_equal(cycle.rank(fm, n=5), cycle_full.rank(fm, n=5))
+
+
+def test_alc_incremental_meta(tmpdir):
+    cycle = asr.ActiveLearningCycle(querier=Max(), incremental=True)
+    assert cycle.to_meta().incremental
+
+    fp = Path(tmpdir, "cycle.json")
+    cycle.to_file(fp)
+    assert asr.ActiveLearningCycle.from_file(fp).incremental
+
+    cycle_meta = asr.ActiveLearningCycleData(querier="max", incremental=True)
+    assert asr.ActiveLearningCycle.from_meta(cycle_meta).incremental
+    assert not asr.ActiveLearningCycle.from_meta(
+        asr.ActiveLearningCycleData(querier="max")
+    ).incremental
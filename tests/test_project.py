@@ -1,10 +1,13 @@
 import os
 import sqlite3
+import zipfile
 
+import pandas as pd
 import pytest
 from pathlib import Path
 
 import asreview as asr
+from asreview.database.connection import dispose
 from asreview.models.balancers import Balanced
 from asreview.models.classifiers import SVM
 
@@ -35,6 +38,45 @@ def test_project_load(asreview_test_project_path, tmpdir):
     project.db._is_valid()
 
 
+def test_project_export_load(asreview_test_project, tmpdir):
+    project = asreview_test_project
+    with project.db as db:
+        results = db.get_results_table()
+    Path(project.project_path, "tmp").mkdir()
+    Path(project.project_path, "tmp", "file.txt").write_text("tmp")
+
+    export_fp = Path(tmpdir, "export.asreview")
+    project.export(export_fp)
+
+    with zipfile.ZipFile(export_fp) as zip_obj:
+        names = zip_obj.namelist()
+    assert project.PATH_CONFIG in names
+    assert project.PATH_DB in names
+    assert not any(name.startswith("tmp") for name in names)
+    assert not any(name.endswith((".lock", ".db-wal", ".db-shm")) for name in names)
+
+    project_path = Path(tmpdir, "projects")
+    loaded = asr.Project.load(export_fp, project_path, safe_import=True)
+
+    assert loaded.config["id"] != project.config["id"]
+    assert loaded.project_path == Path(project_path, loaded.config["id"])
+    assert os.listdir(project_path) == [loaded.config["id"]]
+    with loaded.db as db:
+        pd.testing.assert_frame_equal(db.get_results_table(), results)
+
+
+def test_project_load_invalid_file(tmpdir):
+    project_fp = Path(tmpdir, "invalid.asreview")
+    project_fp.write_text("invalid")
+
+    project_path = Path(tmpdir, "projects")
+    with pytest.raises(ValueError):
+        asr.Project.load(project_fp, project_path)
+
+    # the extracted files are removed
+    assert os.listdir(project_path) == []
+
+
 def test_project_load_unknown_classifier(tmpdir):
     project_fp = Path(
         "tests", "asreview_files", "asreview-demo-project-invalid-classifier.asreview"
@@ -72,7 +114,9 @@ def test_project_closes_db_on_exception(tmpdir):
             conn = project.db._conn
             raise RuntimeError("simulated failure")
 
-    # connection should be closed
+    # connection should be returned to the pool and closed on dispose
+    assert project.db.input.engine.pool.checkedout() == 0
+    dispose(project.project_path)
     with pytest.raises(
         sqlite3.ProgrammingError, match="Cannot operate on a closed database"
     ):
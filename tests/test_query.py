@@ -1,8 +1,11 @@
 import numpy as np
 import pytest
+import scipy.sparse as sp
 
 from asreview.extensions import extensions
 from asreview.extensions import load_extension
+from asreview.models.queriers import TopDown
+from asreview.models.queriers import _mix_indices
 
 
 def test_classifiers():
@@ -35,3 +38,99 @@ def test_query(query):
     query_idx = querier.query(proba[:, 1])
     assert len(query_idx) == len(np.unique(query_idx))
     assert len(query_idx) == X.shape[0]
+
+
+@pytest.mark.parametrize("query", extensions("models.queriers"))
+@pytest.mark.parametrize("k", [1, 5, 100, 150])
+def test_query_top(query, k):
+    p = np.random.rand(100)
+    # add ties to check the tie breaking
+    p[10:20] = p[0]
+
+    querier = load_extension("models.queriers", query.name)()
+    if "random_state" in querier.get_params():
+        querier.set_params(random_state=42)
+
+    np.testing.assert_array_equal(querier.query_top(p, k), querier.query(p)[:k])
+
+
+@pytest.mark.parametrize("query", ["random", "max_random", "max_uncertainty"])
+@pytest.mark.parametrize("k", [1, 5, 100])
+def test_query_top_random_stream(query, k):
+    p = np.random.rand(100)
+
+    # the top k draws the same random numbers as the full ranking
+    querier = load_extension("models.queriers", query)
+    random_state_top = np.random.RandomState(535)
+    random_state_full = np.random.RandomState(535)
+    top = querier(random_state=random_state_top).query_top(p, k)
+    full = querier(random_state=random_state_full).query(p)
+
+    np.testing.assert_array_equal(top, full[:k])
+    assert random_state_top.rand() == random_state_full.rand()
+
+    # the same holds for the global random state
+    np.random.seed(535)
+    querier().query_top(p, k)
+    x_top = np.random.rand()
+    np.random.seed(535)
+    querier().query(p)
+    assert np.random.rand() == x_top
+
+
+def _mix_indices_loop(query_idx_1, query_idx_2, mix_probability, random_state):
+    query_idx_mix = []
+    i = 0
+    j = 0
+
+    while i < len(query_idx_1) and j < len(query_idx_2):
+        if random_state.rand() < mix_probability:
+            query_idx_mix.append(query_idx_1[i])
+            i = i + 1
+        else:
+            query_idx_mix.append(query_idx_2[j])
+            j = j + 1
+
+    indexes = np.unique(query_idx_mix, return_index=True)[1]
+    return [query_idx_mix[i] for i in sorted(indexes)]
+
+
+def test_top_down_feature_matrix():
+    X = sp.random(10, 5, density=0.5, format="csr", random_state=535)
+
+    np.testing.assert_array_equal(TopDown().query(X), np.arange(10))
+    np.testing.assert_array_equal(TopDown().query_top(X, 3), np.arange(3))
+
+
+@pytest.mark.parametrize("mix_probability", [0, 0.5, 0.95, 1])
+def test_mix_indices(mix_probability):
+    query_idx_1 = np.random.permutation(1000)
+    query_idx_2 = np.random.permutation(1000)
+
+    expected = _mix_indices_loop(
+        query_idx_1, query_idx_2, mix_probability, np.random.RandomState(535)
+    )
+    mixed = _mix_indices(query_idx_1, query_idx_2, mix_probability, 535)
+
+    np.testing.assert_array_equal(mixed, expected)
+    np.testing.assert_array_equal(
+        _mix_indices(query_idx_1, query_idx_2, mix_probability, 535, n=10),
+        expected[:10],
+    )
+
+
+@pytest.mark.parametrize("mix_probability", [0, 0.5, 0.95, 1])
+def test_mix_indices_random_stream(mix_probability):
+    query_idx_1 = np.random.permutation(1000)
+    query_idx_2 = np.random.permutation(1000)
+
+    # the mixing draws as many random numbers as drawing them one by one
+    random_state_loop = np.random.RandomState(535)
+    expected = _mix_indices_loop(
+        query_idx_1, query_idx_2, mix_probability, random_state_loop
+    )
+    random_state = np.random.RandomState(535)
+    mixed = _mix_indices(query_idx_1, query_idx_2, mix_probability, random_state)
+
+    np.testing.assert_array_equal(mixed, expected)
+    assert random_state.rand() == random_state_loop.rand()
@@ -1,6 +1,7 @@
 from pathlib import Path
 from urllib.request import urlretrieve
 
+import pandas as pd
 import pytest
 import rispy
 from pytest import mark
@@ -9,6 +10,8 @@ import asreview as asr
 from asreview.data.loader import _from_file
 from asreview.data.loader import load_records
 from asreview.data.ris import RISReader
+from asreview.data.ris import _iter_ris_entries
+from asreview.data.tabular import CSVReader
 
 
 def test_default_reader_loading():
@@ -124,6 +127,49 @@ def test_multiline_tags_ris():
     assert entries[0]["notes"] == ["Notes 1", "Notes 2"]
 
 
+@mark.parametrize(
+    "test_file",
+    [
+        "_baseline.ris",
+        "baseline_empty_values.ris",
+        "baseline_tag-notes_labels.ris",
+        "baseline_tag-notes_zotero.ris",
+        "baseline_tag_and_field_definitions_lists.ris",
+        "embase.ris",
+        "ovid_zotero.ris",
+        "proquest.ris",
+        "pubmed_zotero.ris",
+        "scopus.ris",
+    ],
+)
+def test_iter_ris_entries(test_file):
+    # the entries are parsed one by one, as rispy parses the whole file
+    fp = Path("tests", "demo_data", test_file)
+    parser = rispy.RisParser(skip_unknown_tags=True)
+    with open(fp, encoding="utf-8") as f:
+        expected = parser.parse_lines(f)
+    with open(fp, encoding="utf-8") as f:
+        assert list(_iter_ris_entries(f)) == expected
+
+
+def test_ris_reader_not_utf8_after_sample(tmp_path):
+    # the head of the file is valid UTF-8, the last entry is ISO-8859-1
+    fp = tmp_path / "latin1.ris"
+    n_entries = 30000
+    with open(fp, "wb") as f:
+        for i in range(n_entries):
+            f.write(f"TY  - JOUR\nTI  - Title of record {i:08d}\nER  - \n\n".encode())
+        f.write("TY  - JOUR\nTI  - café\nER  - \n".encode("ISO-8859-1"))
+    assert fp.stat().st_size > 2**20
+
+    df = RISReader.read_data(fp)
+    assert len(df) == n_entries + 1
+    assert df["title"].iloc[-1] == "café"
+
+    chunks = list(RISReader.read_data_chunks(fp, chunksize=5000))
+    pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+
 def test_nan_values_ris():
     fp = Path("tests", "demo_data", "baseline_empty_values.ris")
     records = _from_file(fp)
@@ -174,6 +220,85 @@ def test_nan_values_csv():
     assert records[2].doi is None
 
 
+@mark.parametrize(
+    "test_file",
+    [
+        "embase.csv",
+        "generic_labels.csv",
+        "generic_semicolon.csv",
+        "generic_tab.tsv",
+        "missing_values.csv",
+    ],
+)
+def test_csv_reader_chunks(monkeypatch, test_file):
+    fp = Path("tests", "demo_data", test_file)
+    records = _from_file(fp)
+
+    monkeypatch.setattr(CSVReader, "__chunksize__", 2)
+    chunks = list(CSVReader.iter_records(fp, dataset_id="test"))
+    assert len(chunks) == (len(records) + 1) // 2
+    columns = ["dataset_row", "title", "abstract", "authors", "doi", "included"]
+    assert [[getattr(r, col) for col in columns] for r in records] == [
+        [getattr(r, col) for col in columns] for chunk in chunks for r in chunk
+    ]
+
+
+@mark.parametrize(
+    "test_file",
+    [
+        "baseline_tag-notes_labels.ris",
+        "baseline_empty_values.ris",
+        "pubmed_zotero.ris",
+    ],
+)
+def test_ris_reader_chunks(monkeypatch, test_file):
+    fp = Path("tests", "demo_data", test_file)
+    records = _from_file(fp)
+
+    monkeypatch.setattr(RISReader, "__chunksize__", 2)
+    chunks = list(RISReader.iter_records(fp, dataset_id="test"))
+    assert len(chunks) == (len(records) + 1) // 2
+    columns = ["dataset_row", "title", "abstract", "authors", "included"]
+    assert [[getattr(r, col) for col in columns] for r in records] == [
+        [getattr(r, col) for col in columns] for chunk in chunks for r in chunk
+    ]
+
+
+@mark.parametrize(
+    "test_file",
+    [
+        "embase.csv",
+        "generic_labels.csv",
+        "generic_semicolon.csv",
+        "generic_tab.tsv",
+        "missing_values.csv",
+    ],
+)
+def test_csv_reader_chunks_equal_read_data(test_file):
+    fp = Path("tests", "demo_data", test_file)
+    chunks = list(CSVReader.read_data_chunks(fp, chunksize=2))
+    pd.testing.assert_frame_equal(pd.concat(chunks), CSVReader.read_data(fp))
+
+
+def test_csv_reader_not_utf8_after_sample(tmp_path):
+    # the head of the file is valid UTF-8, the last row is ISO-8859-1
+    fp = tmp_path / "latin1.csv"
+    n_rows = 30000
+    with open(fp, "wb") as f:
+        f.write(b"title,abstract\n")
+        for i in range(n_rows):
+            f.write(f"Title {i},Abstract of the record number {i:08d}\n".encode())
+        f.write("café,résumé\n".encode("ISO-8859-1"))
+    assert fp.stat().st_size > 2**20
+
+    df = CSVReader.read_data(fp)
+    assert len(df) == n_rows + 1
+    assert df.iloc[-1].tolist() == ["café", "résumé"]
+
+    chunks = list(CSVReader.read_data_chunks(fp, chunksize=5000))
+    pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+
 @mark.internet_required
 def test_load_records_from_url(tmpdir):
     url = "https://zenodo.org/api/records/1162952/files/Hall.csv/content"
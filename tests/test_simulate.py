@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
 import pytest
 
 import asreview as asr
+from asreview.database.database import open_db
 from asreview.models.queriers import Random
 from asreview.models.queriers import TopDown
 from asreview.models.stoppers import IsFittable
@@ -261,3 +263,124 @@ def test_simulate_cli_vs_api(demo_data, demo_data_path, tmp_project, tmpdir):
 
     for col in ["record_id", "label"]:
         assert (api_dataframe[col] == cli_dataframe[col]).all()
+
+
+def test_simulate_results_buffer(demo_data):
+    cycles = [
+        asr.ActiveLearningCycle(querier=TopDown(), stopper=IsFittable()),
+        asr.ActiveLearningCycle(
+            querier=asr.load_extension("models.queriers", "max")(),
+            classifier=asr.load_extension("models.classifiers", "nb")(),
+            feature_extractor=asr.load_extension(
+                "models.feature_extractors", "tfidf"
+            )(),
+        ),
+    ]
+
+    sim = asr.Simulate(demo_data, demo_data["label_included"], cycles)
+    sim.label([0, 9])
+    sim.review()
+
+    results = sim._results
+    assert list(results.columns) == [
+        "record_id",
+        "label",
+        "classifier",
+        "querier",
+        "balancer",
+        "feature_extractor",
+        "training_set",
+        "time",
+        "note",
+        "tags",
+        "user_id",
+    ]
+    assert results["record_id"].is_unique
+    assert results["training_set"].iloc[:2].isna().all()
+    assert results["training_set"].iloc[2:].to_list() == list(range(2, len(results)))
+    assert (
+        results["label"].to_list()
+        == demo_data["label_included"].iloc[results["record_id"]].to_list()
+    )
+
+    # the results survive a round trip through the results setter
+    sim._results = results
+    pd.testing.assert_frame_equal(sim._results, results)
+    assert len(sim._results_buffer.pool) == len(demo_data) - len(results)
+
+    # changing the returned results doesn't change the buffer
+    results = sim._results
+    expected = results.copy()
+    results.loc[0, "label"] = 1 - results.loc[0, "label"]
+    results.drop(columns="note", inplace=True)
+    pd.testing.assert_frame_equal(sim._results, expected)
+    pd.testing.assert_frame_equal(sim._results_buffer.to_frame(), expected)
+
+
+class _Interrupt:
+    def __init__(self, n):
+        self.n = n
+
+    def stop(self, results, data):
+        if len(results) >= self.n:
+            raise KeyboardInterrupt()
+        return False
+
+
+def test_simulate_checkpoint_resume(tmp_path, demo_data):
+    def get_simulate(fp, stopper=None):
+        cycles = [
+            asr.ActiveLearningCycle(
+                querier=Random(random_state=165), stopper=IsFittable()
+            ),
+            asr.ActiveLearningCycle(
+                querier=asr.load_extension("models.queriers", "max_random")(
+                    random_state=535
+                ),
+                classifier=asr.load_extension("models.classifiers", "rf")(),
+                feature_extractor=asr.load_extension(
+                    "models.feature_extractors", "tfidf"
+                )(),
+            ),
+        ]
+        return asr.Simulate(
+            demo_data,
+            demo_data["label_included"],
+            cycles,
+            stopper=stopper,
+            print_progress=False,
+            checkpoint_fp=fp,
+            checkpoint_every=1,
+        )
+
+    # uninterrupted simulation
+    np.random.seed(42)
+    sim = get_simulate(tmp_path / "full.db")
+    sim.label([0, 9])
+    sim.review()
+
+    # interrupted simulation, resumed from the checkpoint
+    fp = tmp_path / "resume.db"
+    np.random.seed(42)
+    sim_interrupted = get_simulate(fp, stopper=_Interrupt(20))
+    sim_interrupted.label([0, 9])
+    with pytest.raises(KeyboardInterrupt):
+        sim_interrupted.review()
+
+    np.random.seed(0)
+    sim_resumed = get_simulate(fp)
+    assert sim_resumed.load_checkpoint()
+    assert len(sim_resumed._results) == 20
+    sim_resumed.review()
+
+    columns = ["record_id", "label", "querier", "training_set"]
+    with open_db(tmp_path / "full.db") as db:
+        results_full = db.get_results_table(columns, groups=True)
+    with open_db(fp) as db:
+        results_resumed = db.get_results_table(columns, groups=True)
+        assert db._get_checkpoint() is None
+
+    pd.testing.assert_frame_equal(results_resumed, results_full)
+    pd.testing.assert_frame_equal(
+        results_full, sim._results[columns].astype(results_full.dtypes)
+    )
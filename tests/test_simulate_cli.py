@@ -7,7 +7,10 @@ import pytest
 from pandas.testing import assert_frame_equal
 
 import asreview as asr
+from asreview.models.stoppers import LastRelevant
 from asreview.simulation.cli import _cli_simulate
+from asreview.simulation.cli import _cli_simulate_batch
+from asreview.simulation.simulate import Simulate
 
 
 def test_dataset_not_found(tmp_project):
@@ -223,6 +226,33 @@ def test_cycle_config(tmpdir, demo_data_path, tmp_project):
     # todo save and test for params in simulation
 
 
+@pytest.mark.parametrize("incremental", [False, True])
+def test_incremental(tmpdir, demo_data_path, tmp_project, incremental):
+    argv = f"{demo_data_path} -o {tmp_project} --ai elas_u3 --n-stop 20".split()
+    if incremental:
+        argv.append("--incremental")
+    _cli_simulate(argv)
+
+    # the cycle is saved in the project, so the simulation can be replayed
+    project = asr.Project.load(tmp_project, tmpdir)
+    cycle_meta = asr.ActiveLearningCycleData(
+        **project.config["review"]["model"]["current_value"]
+    )
+    assert cycle_meta.incremental == incremental
+    assert asr.ActiveLearningCycle.from_meta(cycle_meta).incremental == incremental
+
+
+def test_feature_cache(tmp_path, demo_data_path, feature_cache_path):
+    _cli_simulate([str(demo_data_path)])
+    assert not feature_cache_path.exists()
+
+    _cli_simulate(f"{demo_data_path} --feature-cache".split())
+    assert len(list(feature_cache_path.iterdir())) == 1
+
+    _cli_simulate(f"{demo_data_path} --feature-cache {tmp_path / 'other'}".split())
+    assert len(list(Path(tmp_path, "other").iterdir())) == 1
+
+
 def test_grouped_records(tmp_path, demo_data, tmp_project, tmpdir):
     data_path = tmp_path / "duplicate_data.csv"
     duplicate_demo_data = pd.concat([demo_data, demo_data])
@@ -242,3 +272,106 @@ def test_grouped_records(tmp_path, demo_data, tmp_project, tmpdir):
         ids = sorted(pair["record_id"].to_list())
         assert ids[1] == ids[0] + 100
         assert pair["label"].iloc[0] == pair["label"].iloc[1]
+
+
+def test_simulate_batch(tmpdir, demo_data_path):
+    output = Path(tmpdir, "batch")
+    _cli_simulate_batch(
+        f"{demo_data_path} -o {output} --ai elas_u4 elas_u3 --seed 535 165"
+        f" --prior-seed 535 --n-prior-excluded 1 --n-prior-included 1"
+        f" --n-jobs 2".split()
+    )
+
+    summary = pd.read_csv(Path(output, "summary.csv"))
+    assert len(summary) == 4
+    assert summary["classifier"].tolist() == ["svm", "svm", "nb", "nb"]
+    assert summary[["loss", "ndcg"]].notnull().all(axis=None)
+
+    # the runs are the same as single simulations
+    project_fp = Path(tmpdir, "tmp_state.asreview")
+    _cli_simulate(
+        f"{demo_data_path} -o {project_fp} --ai elas_u3 --prior-seed 535"
+        f" --seed 165 --n-prior-excluded 1 --n-prior-included 1".split()
+    )
+    with asr.Project.load(project_fp, tmpdir).db as db:
+        results = db.get_results_table()
+
+    results_batch = pd.read_csv(Path(output, summary["results"][3]))
+    assert results_batch["record_id"].tolist() == results["record_id"].tolist()
+
+
+def test_simulate_batch_feature_cache(tmp_path, demo_data_path, feature_cache_path):
+    argv = f"{demo_data_path} --seed 535 --n-jobs 1".split()
+    _cli_simulate_batch(argv)
+    assert not feature_cache_path.exists()
+
+    _cli_simulate_batch(argv + ["--feature-cache"])
+    assert len(list(feature_cache_path.iterdir())) == 1
+
+
+def test_resume(tmpdir, demo_data_path, monkeypatch):
+    project_fp = Path(tmpdir, "full.asreview")
+    argv = f"{demo_data_path} -c rf -e tfidf -q max --seed 535 --prior-idx 0 9"
+    _cli_simulate(f"{argv} -o {project_fp}".split())
+
+    def stop_interrupt(self, results, data):
+        if len(results) >= 20:
+            raise KeyboardInterrupt()
+        return False
+
+    project_resume_fp = Path(tmpdir, "resume.asreview")
+    with monkeypatch.context() as m:
+        m.setattr(LastRelevant, "stop", stop_interrupt)
+        with pytest.raises(KeyboardInterrupt):
+            _cli_simulate(f"{argv} -o {project_resume_fp} --checkpoint-every 1".split())
+
+    # an unfinished simulation is not overwritten
+    with pytest.raises(ValueError):
+        _cli_simulate(f"{argv} -o {project_resume_fp}".split())
+
+    _cli_simulate(f"{argv} -o {project_resume_fp} --resume".split())
+
+    with asr.Project.load(project_fp, Path(tmpdir, "full")).db as db:
+        results = db.get_results_table().drop("time", axis=1)
+    with asr.Project.load(project_resume_fp, Path(tmpdir, "resume")).db as db:
+        results_resume = db.get_results_table().drop("time", axis=1)
+
+    assert_frame_equal(results_resume, results)
+
+
+def test_resume_finished(tmpdir, demo_data_path, monkeypatch):
+    project_fp = Path(tmpdir, "full.asreview")
+    argv = f"{demo_data_path} -c rf -e tfidf -q max --seed 535 --prior-idx 0 9"
+    _cli_simulate(f"{argv} -o {project_fp}".split())
+
+    def export_interrupt(self, *args, **kwargs):
+        raise KeyboardInterrupt()
+
+    checkpoints = []
+    checkpoint = Simulate._checkpoint
+
+    def checkpoint_spy(self, final=False):
+        checkpoints.append(final)
+        return checkpoint(self, final=final)
+
+    # interrupt the simulation after the final checkpoint
+    project_resume_fp = Path(tmpdir, "resume.asreview")
+    with monkeypatch.context() as m:
+        m.setattr(asr.Project, "export", export_interrupt)
+        m.setattr(Simulate, "_checkpoint", checkpoint_spy)
+        with pytest.raises(KeyboardInterrupt):
+            _cli_simulate(f"{argv} -o {project_resume_fp} --checkpoint-every 1".split())
+
+    # the final checkpoint is written once
+    assert checkpoints.count(True) == 1
+    assert project_resume_fp.with_suffix(".asreview.tmp").exists()
+
+    _cli_simulate(f"{argv} -o {project_resume_fp} --resume".split())
+    assert not project_resume_fp.with_suffix(".asreview.tmp").exists()
+
+    with asr.Project.load(project_fp, Path(tmpdir, "full")).db as db:
+        results = db.get_results_table().drop("time", axis=1)
+    with asr.Project.load(project_resume_fp, Path(tmpdir, "resume")).db as db:
+        results_resume = db.get_results_table().drop("time", axis=1)
+
+    assert_frame_equal(results_resume, results)
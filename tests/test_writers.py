@@ -28,3 +28,41 @@ def test_asreview_ris(test_file, columns, tmpdir):
 
     for col in columns:
         pd.testing.assert_series_equal(data[col], written_data[col])
+
+
+def test_ris_writer_keeps_data(tmpdir):
+    fp_in = Path("tests", "demo_data", "baseline_tag-notes_labels.ris")
+    data = _get_reader(fp_in).read_data(fp_in)
+    data["asreview_label"] = data["included"]
+    notes = data["notes"].copy(deep=True)
+
+    tmp_ris_fp_out = Path(tmpdir, "tmp.ris")
+    writer = _get_writer(tmp_ris_fp_out)
+    writer.write_data(data, tmp_ris_fp_out)
+
+    # the notes of the exported data are not changed by the writer
+    assert data["notes"].tolist() == notes.tolist()
+    assert writer.write_data(data, None) == tmp_ris_fp_out.read_text(encoding="utf8")
+
+
+@pytest.mark.parametrize(
+    "test_file,fp_out",
+    [
+        ("generic_labels.csv", "tmp.csv"),
+        ("generic_labels.csv", "tmp.tsv"),
+        ("baseline_tag-notes_labels.ris", "tmp.ris"),
+    ],
+)
+def test_write_data_chunks(test_file, fp_out, tmpdir):
+    fp_in = Path("tests", "demo_data", test_file)
+    data = _get_reader(fp_in).read_data(fp_in)
+    if "included" in data:
+        data["asreview_label"] = data["included"]
+
+    writer = _get_writer(Path(tmpdir, fp_out))
+    chunks = [data.iloc[:3], data.iloc[3:3], data.iloc[3:]]
+    assert "".join(writer.write_data_chunks(chunks)) == writer.write_data(data, None)
+
+    writer.write_data_chunks(chunks, Path(tmpdir, fp_out))
+    text = Path(tmpdir, fp_out).read_text(encoding="utf8")
+    assert text == writer.write_data(data, None)